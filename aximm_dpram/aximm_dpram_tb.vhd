@@ -12,6 +12,35 @@
 --OR CONDITIONS OF ANY KIND, either express or implied. See the License for
 --the specific language governing permissions and limitations under the License.
 ----------------------------------------------------------------------------------
+--aximm_dpram with its stdblocks RAM swapped for ram_backdoor, for the tests
+--that preload and dump the RAM through ram_image. The core is not changed.
+library stdblocks;
+    use stdblocks.ram_lib.all;
+
+configuration aximm_dpram_backdoor of aximm_dpram is
+    for rtl
+        for ram_u : tdp_ram
+            use entity work.ram_backdoor
+                generic map(
+                    mem_size  => mem_size,
+                    port_size => port_size
+                )
+                port map(
+                    clka_i  => clka_i,
+                    clkb_i  => clkb_i,
+                    addra_i => addra_i,
+                    addrb_i => addrb_i,
+                    dataa_i => dataa_i,
+                    datab_i => datab_i,
+                    dataa_o => dataa_o,
+                    datab_o => datab_o,
+                    wea_i   => wea_i,
+                    web_i   => web_i
+                );
+        end for;
+    end for;
+end configuration;
+
 library IEEE;
     use IEEE.std_logic_1164.all;
     use IEEE.numeric_std.all;
@@ -27,11 +56,13 @@ library vunit_lib;
     context vunit_lib.vc_context;
 
 use work.aximm_dpram_pkg.all;
+use work.ram_backdoor_pkg.all;
 
 entity aximm_dpram_tb is
     generic (
         runner_cfg : string;
-        run_time   : integer := 100
+        run_time   : integer := 100;
+        backdoor   : boolean := false
     );
     --port (
     --port_declaration_tag
@@ -44,6 +75,11 @@ architecture simulation of aximm_dpram_tb is
     constant C_S_AXI_DATA_WIDTH : integer := 32;
     constant BYTE_NUM           : integer := C_S_AXI_DATA_WIDTH/8;
     constant MAX_ADDR           : integer := (2**C_S_AXI_ADDR_WIDTH)/BYTE_NUM;
+    constant RAM_IMAGE          : string  := output_path(runner_cfg) & "ram_image.hex";
+    constant RAM_DUMP           : string  := output_path(runner_cfg) & "ram_dump.hex";
+    --words under test of "Backdoor Preload and Dump", see tools/memimage.py.
+    constant TESTED_WORDS       : integer := 4;
+    constant TESTED_STEP        : integer := (2**C_S_AXI_ADDR_WIDTH)/TESTED_WORDS;
 
     constant a_axi_handle       : bus_master_t := new_bus(data_length => C_S_AXI_DATA_WIDTH, address_length => C_S_AXI_ADDR_WIDTH);
     constant b_axi_handle       : bus_master_t := new_bus(data_length => C_S_AXI_DATA_WIDTH, address_length => C_S_AXI_ADDR_WIDTH);
@@ -100,6 +136,7 @@ begin
         variable prbs    : prbs_t;
         variable wdata_v : std_logic_vector(C_S_AXI_DATA_WIDTH - 1 downto 0) := (others => '0');
         variable rdata_v : std_logic_vector(C_S_AXI_DATA_WIDTH - 1 downto 0) := (others => '0');
+        variable image_v : ram_image_t(0 to 2**C_S_AXI_ADDR_WIDTH-1)(C_S_AXI_DATA_WIDTH - 1 downto 0);
     begin
         test_runner_setup(runner, runner_cfg);
         rst_i <= '0';
@@ -180,6 +217,22 @@ begin
                 end loop;
                 check_passed(result("Test Full Write then Full Read Random Values: Pass."));
 
+            elsif run("Backdoor Preload and Dump") then
+                --only the words under test go over AXI: read back through
+                --port B, then inverted through port A. The whole RAM is
+                --checked from the dump, by tools/memimage.py.
+                check_true(backdoor, result("Backdoor Preload and Dump: needs the backdoor generic."));
+                ram_image.load(RAM_IMAGE);
+                image_v := ram_load(RAM_IMAGE, 2**C_S_AXI_ADDR_WIDTH, C_S_AXI_DATA_WIDTH);
+                for j in 0 to TESTED_WORDS-1 loop
+                    read_bus(net, b_axi_handle, TESTED_STEP*j, rdata_v);
+                    check_equal(rdata_v, image_v(TESTED_STEP*j), result("Backdoor Preload and Dump"));
+                    write_bus(net, a_axi_handle, TESTED_STEP*j, not rdata_v, "1111");
+                end loop;
+                wait_until_idle(net, a_axi_handle);
+                ram_image.dump(RAM_DUMP);
+                check_passed(result("Backdoor Preload and Dump: Pass."));
+
             end if;
         end loop;
         test_runner_cleanup(runner); -- Simulation ends here
@@ -241,55 +294,108 @@ begin
             rready   => B_AXI_RREADY
         );
 
-    dut_u : aximm_dpram
-        generic map(
-            C_S_AXI_ADDR_WIDTH => C_S_AXI_ADDR_WIDTH,
-            C_S_AXI_DATA_WIDTH => C_S_AXI_DATA_WIDTH
-        )
-        port map(
-            A_AXI_ARESETN => rst_i,
-            A_AXI_ACLK    => mclk_i,
-            A_AXI_AWADDR  => A_AXI_AWADDR,
-            A_AXI_AWPROT  => A_AXI_AWPROT,
-            A_AXI_AWVALID => A_AXI_AWVALID,
-            A_AXI_AWREADY => A_AXI_AWREADY,
-            A_AXI_WDATA   => A_AXI_WDATA,
-            A_AXI_WSTRB   => A_AXI_WSTRB,
-            A_AXI_WVALID  => A_AXI_WVALID,
-            A_AXI_WREADY  => A_AXI_WREADY,
-            A_AXI_BRESP   => A_AXI_BRESP,
-            A_AXI_BVALID  => A_AXI_BVALID,
-            A_AXI_BREADY  => A_AXI_BREADY,
-            A_AXI_ARADDR  => A_AXI_ARADDR,
-            A_AXI_ARPROT  => A_AXI_ARPROT,
-            A_AXI_ARVALID => A_AXI_ARVALID,
-            A_AXI_ARREADY => A_AXI_ARREADY,
-            A_AXI_RDATA   => A_AXI_RDATA,
-            A_AXI_RRESP   => A_AXI_RRESP,
-            A_AXI_RVALID  => A_AXI_RVALID,
-            A_AXI_RREADY  => A_AXI_RREADY,
-
-            B_AXI_ARESETN => rst_i,
-            B_AXI_ACLK    => mclk_i,
-            B_AXI_AWADDR  => B_AXI_AWADDR,
-            B_AXI_AWPROT  => B_AXI_AWPROT,
-            B_AXI_AWVALID => B_AXI_AWVALID,
-            B_AXI_AWREADY => B_AXI_AWREADY,
-            B_AXI_WDATA   => B_AXI_WDATA,
-            B_AXI_WSTRB   => B_AXI_WSTRB,
-            B_AXI_WVALID  => B_AXI_WVALID,
-            B_AXI_WREADY  => B_AXI_WREADY,
-            B_AXI_BRESP   => B_AXI_BRESP,
-            B_AXI_BVALID  => B_AXI_BVALID,
-            B_AXI_BREADY  => B_AXI_BREADY,
-            B_AXI_ARADDR  => B_AXI_ARADDR,
-            B_AXI_ARPROT  => B_AXI_ARPROT,
-            B_AXI_ARVALID => B_AXI_ARVALID,
-            B_AXI_ARREADY => B_AXI_ARREADY,
-            B_AXI_RDATA   => B_AXI_RDATA,
-            B_AXI_RRESP   => B_AXI_RRESP,
-            B_AXI_RVALID  => B_AXI_RVALID,
-            B_AXI_RREADY  => B_AXI_RREADY
-        );
+    dut_g : if backdoor generate
+        dut_u : configuration work.aximm_dpram_backdoor
+            generic map(
+                C_S_AXI_ADDR_WIDTH => C_S_AXI_ADDR_WIDTH,
+                C_S_AXI_DATA_WIDTH => C_S_AXI_DATA_WIDTH
+            )
+            port map(
+                A_AXI_ARESETN => rst_i,
+                A_AXI_ACLK    => mclk_i,
+                A_AXI_AWADDR  => A_AXI_AWADDR,
+                A_AXI_AWPROT  => A_AXI_AWPROT,
+                A_AXI_AWVALID => A_AXI_AWVALID,
+                A_AXI_AWREADY => A_AXI_AWREADY,
+                A_AXI_WDATA   => A_AXI_WDATA,
+                A_AXI_WSTRB   => A_AXI_WSTRB,
+                A_AXI_WVALID  => A_AXI_WVALID,
+                A_AXI_WREADY  => A_AXI_WREADY,
+                A_AXI_BRESP   => A_AXI_BRESP,
+                A_AXI_BVALID  => A_AXI_BVALID,
+                A_AXI_BREADY  => A_AXI_BREADY,
+                A_AXI_ARADDR  => A_AXI_ARADDR,
+                A_AXI_ARPROT  => A_AXI_ARPROT,
+                A_AXI_ARVALID => A_AXI_ARVALID,
+                A_AXI_ARREADY => A_AXI_ARREADY,
+                A_AXI_RDATA   => A_AXI_RDATA,
+                A_AXI_RRESP   => A_AXI_RRESP,
+                A_AXI_RVALID  => A_AXI_RVALID,
+                A_AXI_RREADY  => A_AXI_RREADY,
+
+                B_AXI_ARESETN => rst_i,
+                B_AXI_ACLK    => mclk_i,
+                B_AXI_AWADDR  => B_AXI_AWADDR,
+                B_AXI_AWPROT  => B_AXI_AWPROT,
+                B_AXI_AWVALID => B_AXI_AWVALID,
+                B_AXI_AWREADY => B_AXI_AWREADY,
+                B_AXI_WDATA   => B_AXI_WDATA,
+                B_AXI_WSTRB   => B_AXI_WSTRB,
+                B_AXI_WVALID  => B_AXI_WVALID,
+                B_AXI_WREADY  => B_AXI_WREADY,
+                B_AXI_BRESP   => B_AXI_BRESP,
+                B_AXI_BVALID  => B_AXI_BVALID,
+                B_AXI_BREADY  => B_AXI_BREADY,
+                B_AXI_ARADDR  => B_AXI_ARADDR,
+                B_AXI_ARPROT  => B_AXI_ARPROT,
+                B_AXI_ARVALID => B_AXI_ARVALID,
+                B_AXI_ARREADY => B_AXI_ARREADY,
+                B_AXI_RDATA   => B_AXI_RDATA,
+                B_AXI_RRESP   => B_AXI_RRESP,
+                B_AXI_RVALID  => B_AXI_RVALID,
+                B_AXI_RREADY  => B_AXI_RREADY
+            );
+    else generate
+        dut_u : aximm_dpram
+            generic map(
+                C_S_AXI_ADDR_WIDTH => C_S_AXI_ADDR_WIDTH,
+                C_S_AXI_DATA_WIDTH => C_S_AXI_DATA_WIDTH
+            )
+            port map(
+                A_AXI_ARESETN => rst_i,
+                A_AXI_ACLK    => mclk_i,
+                A_AXI_AWADDR  => A_AXI_AWADDR,
+                A_AXI_AWPROT  => A_AXI_AWPROT,
+                A_AXI_AWVALID => A_AXI_AWVALID,
+                A_AXI_AWREADY => A_AXI_AWREADY,
+                A_AXI_WDATA   => A_AXI_WDATA,
+                A_AXI_WSTRB   => A_AXI_WSTRB,
+                A_AXI_WVALID  => A_AXI_WVALID,
+                A_AXI_WREADY  => A_AXI_WREADY,
+                A_AXI_BRESP   => A_AXI_BRESP,
+                A_AXI_BVALID  => A_AXI_BVALID,
+                A_AXI_BREADY  => A_AXI_BREADY,
+                A_AXI_ARADDR  => A_AXI_ARADDR,
+                A_AXI_ARPROT  => A_AXI_ARPROT,
+                A_AXI_ARVALID => A_AXI_ARVALID,
+                A_AXI_ARREADY => A_AXI_ARREADY,
+                A_AXI_RDATA   => A_AXI_RDATA,
+                A_AXI_RRESP   => A_AXI_RRESP,
+                A_AXI_RVALID  => A_AXI_RVALID,
+                A_AXI_RREADY  => A_AXI_RREADY,
+
+                B_AXI_ARESETN => rst_i,
+                B_AXI_ACLK    => mclk_i,
+                B_AXI_AWADDR  => B_AXI_AWADDR,
+                B_AXI_AWPROT  => B_AXI_AWPROT,
+                B_AXI_AWVALID => B_AXI_AWVALID,
+                B_AXI_AWREADY => B_AXI_AWREADY,
+                B_AXI_WDATA   => B_AXI_WDATA,
+                B_AXI_WSTRB   => B_AXI_WSTRB,
+                B_AXI_WVALID  => B_AXI_WVALID,
+                B_AXI_WREADY  => B_AXI_WREADY,
+                B_AXI_BRESP   => B_AXI_BRESP,
+                B_AXI_BVALID  => B_AXI_BVALID,
+                B_AXI_BREADY  => B_AXI_BREADY,
+                B_AXI_ARADDR  => B_AXI_ARADDR,
+                B_AXI_ARPROT  => B_AXI_ARPROT,
+                B_AXI_ARVALID => B_AXI_ARVALID,
+                B_AXI_ARREADY => B_AXI_ARREADY,
+                B_AXI_RDATA   => B_AXI_RDATA,
+                B_AXI_RRESP   => B_AXI_RRESP,
+                B_AXI_RVALID  => B_AXI_RVALID,
+                B_AXI_RREADY  => B_AXI_RREADY
+            );
+    end generate;
 
 end simulation;
@@ -0,0 +1,257 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Constrained random traffic for the "Random Traffic Memory Image" test of
+# aximm_intercon_tb, checked against what the peripherals logged.
+#
+# Every master (slave port k of the intercon) gets stim_<k>.txt: reads and
+# writes with random strobes, to addresses that decode to a peripheral through
+# the address map of the testbench. Part of the traffic goes to a few hot words
+# shared by all masters, so they collide on the same peripherals and bytes.
+#
+# The order masters win arbitration depends on timing, so the testbench logs
+# it: every peripheral (master port j of the intercon) writes the writes it
+# takes, in order, to writes_<j>.txt, and every master its reads, with the
+# cycles they were queued and returned, to reads_<k>.txt. check() then wants:
+#   - each peripheral took exactly the writes decoded to it, no more, no less;
+#   - the memory dump (memory.txt) is that log replayed, byte for byte;
+#   - no write of a master landed after a later write of its own to a byte;
+#   - every read returned the byte as it was at some point of its window.
+#--------------------------------------------------------------------------------
+from os.path import dirname, join
+import functools
+import re
+
+import numpy as np
+
+from tools import hexio
+
+tb_file = join(dirname(__file__), "aximm_intercon_tb.vhd")
+addr_map_re = re.compile(r'set_peripheral_address\(\s*(\d+)\s*,\s*"([01-]+)"')
+
+
+def read_addr_map(path=tb_file):
+    # addr_map_i as set by config_process in aximm_intercon_tb, by peripheral port.
+    with open(path) as f:
+        return {int(j): pattern for j, pattern in addr_map_re.findall(f.read())}
+
+
+tb_addr_map = read_addr_map()
+
+read_op = 0
+write_op = 1
+
+
+def sort_rows(rows):
+    return rows[np.lexsort(rows.T[::-1])]
+
+
+class AximmInterconModel:
+    def __init__(self, addr_map=tb_addr_map, controllers_num=8, peripherals_num=5, data_byte_num=1, addr_size=8):
+        if data_byte_num > 8:
+            raise ValueError("model holds data in 64 bits, DATA_BYTE_NUM must be up to 8.")
+        self.addr_map = addr_map
+        self.controllers_num = controllers_num
+        self.peripherals_num = peripherals_num
+        self.data_byte_num = data_byte_num
+        self.addr_size = addr_size
+        self.widths = [1, hexio.digits(addr_size), hexio.digits(data_byte_num), 2 * data_byte_num]
+
+    def decode(self, address):
+        # address_decode/address_valid of aximm_intercon_pkg: ports are tried from
+        # the highest down, the first std_match wins.
+        address = np.asarray(address, dtype=np.uint64)
+        port = np.zeros(address.shape, dtype=np.int64)
+        valid = np.zeros(address.shape, dtype=bool)
+        for j in sorted(self.addr_map, reverse=True):
+            pattern = self.addr_map[j]
+            care = int(pattern.replace("0", "1").replace("-", "0"), 2)
+            value = int(pattern.replace("-", "0"), 2)
+            match = ~valid & ((address & np.uint64(care)) == np.uint64(value))
+            port[match] = j
+            valid = valid | match
+        return port, valid
+
+    def words(self):
+        # every word aligned address the intercon forwards somewhere.
+        address = np.arange(0, 2**self.addr_size, self.data_byte_num, dtype=np.uint64)
+        return address[self.decode(address)[1]]
+
+    def stimulus(self, transactions, seed=0, write_ratio=0.7, hot_words=8, hot_ratio=0.3):
+        rng = np.random.default_rng(seed)
+        words = self.words()
+        hot = rng.choice(words, min(hot_words, words.size), replace=False)
+        stim = []
+        for k in range(self.peripherals_num):
+            address = rng.choice(words, transactions)
+            to_hot = rng.random(transactions) < hot_ratio
+            address[to_hot] = rng.choice(hot, int(to_hot.sum()))
+            stim.append({
+                "op":   (rng.random(transactions) < write_ratio).astype(np.uint64),
+                "addr": address,
+                "strb": rng.integers(1, 2**self.data_byte_num, transactions, dtype=np.uint64, endpoint=False),
+                "data": rng.integers(0, 2**(8 * self.data_byte_num), transactions, dtype=np.uint64, endpoint=False),
+            })
+        return stim
+
+    def last_writes(self, stim):
+        # last byte value each master wrote to each address, -1 if it did not.
+        last = np.full((len(stim), 2**self.addr_size), -1, dtype=np.int16)
+        lanes = np.arange(self.data_byte_num, dtype=np.uint64)
+        for k, s in enumerate(stim):
+            write = s["op"] == write_op
+            address = (s["addr"][write][:, None] + lanes).ravel()
+            value = ((s["data"][write][:, None] >> (np.uint64(8) * lanes)) & np.uint64(0xFF)).ravel()
+            enable = ((s["strb"][write][:, None] >> lanes) & np.uint64(1)).ravel().astype(bool)
+            address, value = address[enable][::-1], value[enable][::-1]
+            written, first = np.unique(address, return_index=True)
+            last[k, written] = value[first]
+        return last
+
+    def written_bytes(self, address, strb, data):
+        # one row per written byte: address, value, index of the write.
+        lanes = np.arange(self.data_byte_num, dtype=np.uint64)
+        index = np.repeat(np.arange(len(address)), self.data_byte_num)
+        enable = ((strb[:, None] >> lanes) & np.uint64(1)).ravel().astype(bool)
+        value = ((data[:, None] >> (np.uint64(8) * lanes)) & np.uint64(0xFF)).ravel()
+        return (address[:, None] + lanes).ravel()[enable], value[enable], index[enable]
+
+    def replay(self, writes):
+        # memory image after every write of every peripheral log, in order.
+        image = np.zeros(2**self.addr_size, dtype=np.int16)
+        for log in writes.values():
+            address, value, _ = self.written_bytes(log["addr"], log["strb"], log["data"])
+            image[address] = value
+        return image
+
+    def check_routing(self, stim, writes):
+        errors = []
+        for j in range(self.controllers_num):
+            expected = []
+            for s in stim:
+                port, valid = self.decode(s["addr"])
+                write = (s["op"] == write_op) & valid & (port == j)
+                expected.append(np.stack([s["addr"][write], s["strb"][write], s["data"][write]], axis=1))
+            expected = np.concatenate(expected)
+            log = writes[j]
+            taken = np.stack([log["addr"], log["strb"], log["data"]], axis=1)
+            if len(taken) != len(expected) or (sort_rows(taken) != sort_rows(expected)).any():
+                errors.append("peripheral %d: took %d writes, expected %d, or not the same ones" % (
+                    j, len(taken), len(expected)))
+        return errors
+
+    def check_reads(self, reads, writes):
+        # a read is sent to its peripheral and sampled somewhere between the
+        # cycle it was queued and the cycle it returned. A write is in memory for
+        # sure once its B handshake is done and for sure not before its W
+        # handshake, so the read may see the log up to any write in between.
+        errors = []
+        lanes = np.arange(self.data_byte_num, dtype=np.uint64)
+        for j, log in writes.items():
+            address, value, index = self.written_bytes(log["addr"], log["strb"], log["data"])
+            address, value, index = (x.astype(np.int64) for x in (address, value, index))
+            span = len(log["addr"]) + 1
+            # written bytes sorted once by (address, index) and by (address, value, index),
+            # after a key no byte has, so every read has an entry before its window.
+            by_address = np.concatenate([[-1], np.sort(address * span + index)])
+            by_value = np.sort((address * 256 + value) * span + index)
+            value_of = np.concatenate([[0], value[np.lexsort((index, address))]])
+            for k, read in reads.items():
+                port, valid = self.decode(read["addr"])
+                mine = np.flatnonzero(valid & (port == j))
+                if not mine.size:
+                    continue
+                # one row per byte read: address, value got, log window [first, last).
+                byte = (read["addr"][mine][:, None] + lanes).ravel().astype(np.int64)
+                got = (read["data"][mine][:, None] >> (np.uint64(8) * lanes)) & np.uint64(0xFF)
+                got = got.ravel().astype(np.int64)
+                first = np.repeat(np.searchsorted(log["b_cycle"], read["issue"][mine], side="left"), lanes.size)
+                last = np.repeat(np.searchsorted(log["w_cycle"], read["done"][mine], side="right"), lanes.size)
+                last = np.maximum(last, first)
+                start = np.searchsorted(by_address, byte * span + first)
+                stop = np.searchsorted(by_address, byte * span + last)
+                before = np.where(by_address[start - 1] // span == byte, value_of[start - 1], 0)
+                key = (byte * 256 + got) * span
+                seen = np.searchsorted(by_value, key + last) > np.searchsorted(by_value, key + first)
+                for n in np.flatnonzero((got != before) & ~seen):
+                    legal = set(int(v) for v in value_of[start[n]:stop[n]]) | {int(before[n])}
+                    read_n = mine[n // lanes.size]
+                    errors.append("master %d: read @%02X = %02X in cycles %d to %d, expected one of %s" % (
+                        k, byte[n], got[n], read["issue"][read_n], read["done"][read_n],
+                        ", ".join("%02X" % v for v in sorted(legal))))
+        return errors
+
+    def check(self, stim, memory, writes, reads):
+        errors = self.check_routing(stim, writes)
+
+        image = self.replay(writes)
+        port, valid = self.decode(np.arange(2**self.addr_size))
+        for j in range(self.controllers_num):
+            bad = np.flatnonzero((image != memory) & valid & (port == j))
+            if bad.size:
+                errors.append("peripheral %d: %d bytes wrong, first @%02X = %02X, expected %02X from its log" % (
+                    j, bad.size, bad[0], memory[bad[0]], image[bad[0]]))
+
+        # the log itself: the write that stays on a byte is the last one its
+        # master made to it.
+        last = self.last_writes(stim)
+        written = (last >= 0).any(axis=0)
+        stale = np.flatnonzero(written & ~(last == image).any(axis=0))
+        if stale.size:
+            errors.append("%d bytes end with a write its master overwrote later, first @%02X = %02X" % (
+                stale.size, stale[0], image[stale[0]]))
+
+        return errors + self.check_reads(reads, writes)
+
+    def write_stimulus(self, stim, path):
+        for k, s in enumerate(stim):
+            hexio.write(join(path, "stim_%d.txt" % k), [s["op"], s["addr"], s["strb"], s["data"]], self.widths)
+
+    def read_memory(self, path):
+        return hexio.read(join(path, "memory.txt"), [2])[0].astype(np.int16)
+
+    def read_writes(self, path):
+        writes = {}
+        for j in range(self.controllers_num):
+            columns = hexio.read(join(path, "writes_%d.txt" % j), [8, 8] + self.widths[1:])
+            writes[j] = dict(zip(["w_cycle", "b_cycle", "addr", "strb", "data"], columns))
+        return writes
+
+    def read_reads(self, path, masters):
+        reads = {}
+        for k in range(masters):
+            columns = hexio.read(join(path, "reads_%d.txt" % k), [8, 8] + self.widths[1:2] + self.widths[3:])
+            reads[k] = dict(zip(["issue", "done", "addr", "data"], columns))
+        return reads
+
+
+def pre_config(model, transactions, seed, output_path):
+    model.write_stimulus(model.stimulus(transactions, seed=seed), output_path)
+    return True
+
+
+def post_check(model, transactions, seed, output_path):
+    stim = model.stimulus(transactions, seed=seed)
+    errors = model.check(stim, model.read_memory(output_path), model.read_writes(output_path),
+                         model.read_reads(output_path, len(stim)))
+    for error in errors[:20]:
+        print(error)
+    return not errors
+
+
+def add_configs(test_tb, transactions=2000, seed=0):
+    model = AximmInterconModel()
+    test = test_tb.test("Random Traffic Memory Image")
+    test.set_pre_config(functools.partial(pre_config, model, transactions, seed))
+    test.set_post_check(functools.partial(post_check, model, transactions, seed))
@@ -181,10 +181,29 @@ architecture behavioral of aximm_intercon_tb is
 
   shared variable prbs : prbs_t;
 
+  --"Random Traffic Memory Image": every master replays stim_<k>.txt, written by
+  --aximm_intercon_model.py, and logs its reads to reads_<k>.txt. Every
+  --peripheral logs the writes it takes to writes_<j>.txt and the whole memory
+  --is dumped once all masters are idle. Cycles are counted by cycle_s.
+  constant addr_digits_c : positive := (ADDR_SIZE+3)/4;
+  constant strb_digits_c : positive := (DATA_BYTE_NUM+3)/4;
+
+  signal cycle_s      : natural := 0;
+  signal file_start_s : boolean := false;
+  signal file_stop_s  : boolean := false;
+  signal file_done_s  : std_logic_vector(peripherals_num-1 downto 0) := (others=>'0');
+
 begin
 
   clk_i <= not clk_i after 10 ns;
 
+  cycle_p : process(clk_i)
+  begin
+    if rising_edge(clk_i) then
+      cycle_s <= cycle_s + 1;
+    end if;
+  end process;
+
 
   -- There are several ways to configure the peripheral address map. It can be made
   -- on signal declaration (see addr_map_c above) or using the set_peripheral_api.
@@ -209,6 +228,9 @@ begin
     variable rdata_v  : std_logic_array(register_num-1 downto 0)(8*DATA_BYTE_NUM-1 downto 0) := (others=>(others=>'0'));
     variable data_v   : std_logic_vector(8*DATA_BYTE_NUM-1 downto 0) := (others=>'0');
     variable buffer_v : buffer_t := null_buffer;
+    variable cycle_v  : natural := 0;
+    variable dump_l   : line;
+    file     dump_f   : text;
   begin
       test_runner_setup(runner, runner_cfg);
       rst_i     <= '1';
@@ -296,6 +318,30 @@ begin
             clear(memory);
           end loop;
           check_passed(result("All Masters Read Out - Pass."));
+
+        elsif run("Random Traffic Memory Image") then
+          info("Stimulus and memory image at " & output_path(runner_cfg));
+          set_timeout(runner, now + 100 us);
+          buffer_v := allocate(memory, 2**ADDR_SIZE, "traffic buffer", alignment => add_inc);
+          file_start_s <= true;
+          loop
+            wait until rising_edge(clk_i);
+            cycle_v := cycle_v + 1;
+            exit when file_done_s = (file_done_s'range => '1');
+            --a stalled master never gets done, the timeout catches it.
+            if cycle_v mod 1000 = 0 then
+              set_timeout(runner, now + 100 us);
+            end if;
+          end loop;
+          file_stop_s <= true;
+          wait until rising_edge(clk_i);
+          file_open(dump_f, output_path(runner_cfg) & "memory.txt", write_mode);
+          for addr in 0 to 2**ADDR_SIZE-1 loop
+            hwrite(dump_l, to_std_logic_vector(read_byte(memory, base_address(buffer_v)+addr), 8));
+            writeline(dump_f, dump_l);
+          end loop;
+          file_close(dump_f);
+          check_passed(result("Random Traffic Memory Image done in " & to_string(cycle_v) & " cycles."));
         end if;
       end loop;
       test_runner_cleanup(runner); -- Simulation ends here
@@ -402,6 +448,61 @@ begin
       S_AXI_WLAST(j) <= '1';
   end generate;
 
+  file_source_gen : for k in 0 to peripherals_num-1 generate
+
+    --one line per transaction: op (0 read, 1 write), address, strobe, data.
+    --one line per read: cycle before it is queued, cycle it returns, address,
+    --data.
+    file_source : process
+      file     stim_f  : text;
+      file     read_f  : text;
+      variable stim_l  : line;
+      variable read_l  : line;
+      variable status  : file_open_status;
+      variable op_v    : std_logic_vector(3 downto 0);
+      variable addr_v  : std_logic_vector(4*addr_digits_c-1 downto 0);
+      variable strb_v  : std_logic_vector(4*strb_digits_c-1 downto 0);
+      variable data_v  : std_logic_vector(8*DATA_BYTE_NUM-1 downto 0);
+      variable issue_v : natural;
+    begin
+      file_done_s(k) <= '0';
+      wait until file_start_s;
+      file_open(status, stim_f, output_path(runner_cfg) & "stim_" & to_string(k) & ".txt", read_mode);
+      if status = open_ok then
+        file_open(read_f, output_path(runner_cfg) & "reads_" & to_string(k) & ".txt", write_mode);
+        while not endfile(stim_f) loop
+          readline(stim_f, stim_l);
+          hread(stim_l, op_v);
+          hread(stim_l, addr_v);
+          hread(stim_l, strb_v);
+          hread(stim_l, data_v);
+          if op_v(0) = '1' then
+            write_bus(net, axi_master_handle(k), addr_v(ADDR_SIZE-1 downto 0), data_v, strb_v(DATA_BYTE_NUM-1 downto 0));
+          else
+            issue_v := cycle_s;
+            read_bus(net, axi_master_handle(k), addr_v(ADDR_SIZE-1 downto 0), data_v);
+            hwrite(read_l, to_std_logic_vector(issue_v, 32));
+            write(read_l, ' ');
+            hwrite(read_l, to_std_logic_vector(cycle_s, 32));
+            write(read_l, ' ');
+            hwrite(read_l, addr_v);
+            write(read_l, ' ');
+            hwrite(read_l, data_v);
+            writeline(read_f, read_l);
+          end if;
+        end loop;
+        file_close(stim_f);
+        file_close(read_f);
+        wait_until_idle(net, axi_master_handle(k));
+      else
+        warning("No stimulus file for master " & to_string(k));
+      end if;
+      file_done_s(k) <= '1';
+      wait;
+    end process;
+
+  end generate;
+
   slave_vci_gen : for j in 0 to controllers_num-1 generate
 
     read_slave_vci_u : entity vunit_lib.axi_read_slave
@@ -451,7 +552,47 @@ begin
         bid     => M_AXI_BID(j),
         bresp   => M_AXI_BRESP(j)
       );
-  
+
+    --the writes peripheral j takes, in the order it writes them to memory. One
+    --line per write: cycle of the W handshake, cycle of the B handshake,
+    --address, strobe, data.
+    write_log : process
+      constant aw_queue  : queue_t := new_queue;
+      constant w_queue   : queue_t := new_queue;
+      file     log_f     : text;
+      variable log_l     : line;
+    begin
+      wait until file_start_s;
+      file_open(log_f, output_path(runner_cfg) & "writes_" & to_string(j) & ".txt", write_mode);
+      loop
+        wait until rising_edge(clk_i) or file_stop_s;
+        exit when file_stop_s;
+        if (M_AXI_AWVALID(j) and M_AXI_AWREADY(j)) = '1' then
+          push_integer(aw_queue, to_integer(M_AXI_AWADDR(j)));
+        end if;
+        if (M_AXI_WVALID(j) and M_AXI_WREADY(j)) = '1' then
+          push_integer(w_queue, cycle_s);
+          push_integer(w_queue, pop_integer(aw_queue));
+          push_integer(w_queue, to_integer(M_AXI_WSTRB(j)));
+          push_integer(w_queue, to_integer(M_AXI_WDATA(j)));
+        end if;
+        if (M_AXI_BVALID(j) and M_AXI_BREADY(j)) = '1' then
+          hwrite(log_l, to_std_logic_vector(pop_integer(w_queue), 32));
+          write(log_l, ' ');
+          hwrite(log_l, to_std_logic_vector(cycle_s, 32));
+          write(log_l, ' ');
+          hwrite(log_l, to_std_logic_vector(pop_integer(w_queue), 4*addr_digits_c));
+          write(log_l, ' ');
+          hwrite(log_l, to_std_logic_vector(pop_integer(w_queue), 4*strb_digits_c));
+          write(log_l, ' ');
+          hwrite(log_l, to_std_logic_vector(pop_integer(w_queue), 8*DATA_BYTE_NUM));
+          writeline(log_f, log_l);
+        end if;
+      end loop;
+      file_close(log_f);
+      wait;
+    end process;
+
   end generate;
 
 end behavioral;
@@ -0,0 +1,26 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Backdoor test of aximm_ram_tb: the testbench preloads the RAM with a random
+# image, the test touches a few words over AXI and the dump of the whole RAM
+# is compared against the image by tools/memimage.py.
+#--------------------------------------------------------------------------------
+from tools import memimage
+
+addr_width = 6
+data_width = 32
+
+
+def add_configs(test_tb):
+    memimage.add_backdoor(test_tb, "Backdoor Preload and Dump", addr_width, data_width)
@@ -24,6 +24,33 @@
 --
 -- For more information, please refer to <http://unlicense.org/>
 ---------------------------------------------------------------------------------
+--aximm_ram with its stdblocks RAM swapped for ram_backdoor, for the tests
+--that preload and dump the RAM through ram_image. The core is not changed.
+library stdblocks;
+    use stdblocks.ram_lib.all;
+
+configuration aximm_ram_backdoor of aximm_ram is
+    for rtl
+        for ram_u : dp_ram
+            use entity work.ram_backdoor
+                generic map(
+                    mem_size  => mem_size,
+                    port_size => port_size
+                )
+                port map(
+                    clka_i  => clka_i,
+                    clkb_i  => clkb_i,
+                    addra_i => addra_i,
+                    addrb_i => addrb_i,
+                    dataa_i => dataa_i,
+                    dataa_o => dataa_o,
+                    datab_o => datab_o,
+                    wea_i   => wea_i
+                );
+        end for;
+    end for;
+end configuration;
+
 library IEEE;
     use IEEE.std_logic_1164.all;
     use IEEE.numeric_std.all;
@@ -39,11 +66,13 @@ library vunit_lib;
     context vunit_lib.vc_context;
 
 use work.aximm_ram_pkg.all;
+use work.ram_backdoor_pkg.all;
 
 entity aximm_ram_tb is
     generic (
         runner_cfg : string;
-        run_time   : integer := 100
+        run_time   : integer := 100;
+        backdoor   : boolean := false
     );
     --port (
     --port_declaration_tag
@@ -56,6 +85,11 @@ architecture simulation of aximm_ram_tb is
     constant C_S_AXI_DATA_WIDTH : integer := 32;
     constant BYTE_NUM           : integer := C_S_AXI_DATA_WIDTH/8;
     constant MAX_ADDR           : integer := (2**C_S_AXI_ADDR_WIDTH)/BYTE_NUM;
+    constant RAM_IMAGE          : string  := output_path(runner_cfg) & "ram_image.hex";
+    constant RAM_DUMP           : string  := output_path(runner_cfg) & "ram_dump.hex";
+    --words under test of "Backdoor Preload and Dump", see tools/memimage.py.
+    constant TESTED_WORDS       : integer := 4;
+    constant TESTED_STEP        : integer := (2**C_S_AXI_ADDR_WIDTH)/TESTED_WORDS;
 
     constant axi_handle       : bus_master_t := new_bus(data_length => C_S_AXI_DATA_WIDTH, address_length => C_S_AXI_ADDR_WIDTH);
 
@@ -90,6 +124,7 @@ begin
         variable prbs    : prbs_t;
         variable wdata_v : std_logic_vector(C_S_AXI_DATA_WIDTH - 1 downto 0) := (others => '0');
         variable rdata_v : std_logic_vector(C_S_AXI_DATA_WIDTH - 1 downto 0) := (others => '0');
+        variable image_v : ram_image_t(0 to 2**C_S_AXI_ADDR_WIDTH-1)(C_S_AXI_DATA_WIDTH - 1 downto 0);
     begin
         test_runner_setup(runner, runner_cfg);
         rst_i <= '0';
@@ -147,6 +182,22 @@ begin
                 end loop;
                 check_passed(result("Test Full Write then Full Read Random Values: Pass."));
 
+            elsif run("Backdoor Preload and Dump") then
+                --only the words under test go over AXI: read back, then
+                --inverted. The whole RAM is checked from the dump, by
+                --tools/memimage.py.
+                check_true(backdoor, result("Backdoor Preload and Dump: needs the backdoor generic."));
+                ram_image.load(RAM_IMAGE);
+                image_v := ram_load(RAM_IMAGE, 2**C_S_AXI_ADDR_WIDTH, C_S_AXI_DATA_WIDTH);
+                for j in 0 to TESTED_WORDS-1 loop
+                    read_bus(net, axi_handle, TESTED_STEP*j, rdata_v);
+                    check_equal(rdata_v, image_v(TESTED_STEP*j), result("Backdoor Preload and Dump"));
+                    write_bus(net, axi_handle, TESTED_STEP*j, not rdata_v, "1111");
+                end loop;
+                wait_until_idle(net, axi_handle);
+                ram_image.dump(RAM_DUMP);
+                check_passed(result("Backdoor Preload and Dump: Pass."));
+
             end if;
         end loop;
         test_runner_cleanup(runner); -- Simulation ends here
@@ -180,33 +231,64 @@ begin
             rready  => S_AXI_RREADY
         );
 
-    dut_u : aximm_ram
-        generic map(
-            C_S_AXI_ADDR_WIDTH => C_S_AXI_ADDR_WIDTH,
-            C_S_AXI_DATA_WIDTH => C_S_AXI_DATA_WIDTH
-        )
-        port map(
-            AXI_ARESETN => rst_i,
-            AXI_ACLK    => mclk_i,
-            AXI_AWADDR  => S_AXI_AWADDR,
-            AXI_AWPROT  => S_AXI_AWPROT,
-            AXI_AWVALID => S_AXI_AWVALID,
-            AXI_AWREADY => S_AXI_AWREADY,
-            AXI_WDATA   => S_AXI_WDATA,
-            AXI_WSTRB   => S_AXI_WSTRB,
-            AXI_WVALID  => S_AXI_WVALID,
-            AXI_WREADY  => S_AXI_WREADY,
-            AXI_BRESP   => S_AXI_BRESP,
-            AXI_BVALID  => S_AXI_BVALID,
-            AXI_BREADY  => S_AXI_BREADY,
-            AXI_ARADDR  => S_AXI_ARADDR,
-            AXI_ARPROT  => S_AXI_ARPROT,
-            AXI_ARVALID => S_AXI_ARVALID,
-            AXI_ARREADY => S_AXI_ARREADY,
-            AXI_RDATA   => S_AXI_RDATA,
-            AXI_RRESP   => S_AXI_RRESP,
-            AXI_RVALID  => S_AXI_RVALID,
-            AXI_RREADY  => S_AXI_RREADY
-        );
+    dut_g : if backdoor generate
+        dut_u : configuration work.aximm_ram_backdoor
+            generic map(
+                C_S_AXI_ADDR_WIDTH => C_S_AXI_ADDR_WIDTH,
+                C_S_AXI_DATA_WIDTH => C_S_AXI_DATA_WIDTH
+            )
+            port map(
+                AXI_ARESETN => rst_i,
+                AXI_ACLK    => mclk_i,
+                AXI_AWADDR  => S_AXI_AWADDR,
+                AXI_AWPROT  => S_AXI_AWPROT,
+                AXI_AWVALID => S_AXI_AWVALID,
+                AXI_AWREADY => S_AXI_AWREADY,
+                AXI_WDATA   => S_AXI_WDATA,
+                AXI_WSTRB   => S_AXI_WSTRB,
+                AXI_WVALID  => S_AXI_WVALID,
+                AXI_WREADY  => S_AXI_WREADY,
+                AXI_BRESP   => S_AXI_BRESP,
+                AXI_BVALID  => S_AXI_BVALID,
+                AXI_BREADY  => S_AXI_BREADY,
+                AXI_ARADDR  => S_AXI_ARADDR,
+                AXI_ARPROT  => S_AXI_ARPROT,
+                AXI_ARVALID => S_AXI_ARVALID,
+                AXI_ARREADY => S_AXI_ARREADY,
+                AXI_RDATA   => S_AXI_RDATA,
+                AXI_RRESP   => S_AXI_RRESP,
+                AXI_RVALID  => S_AXI_RVALID,
+                AXI_RREADY  => S_AXI_RREADY
+            );
+    else generate
+        dut_u : aximm_ram
+            generic map(
+                C_S_AXI_ADDR_WIDTH => C_S_AXI_ADDR_WIDTH,
+                C_S_AXI_DATA_WIDTH => C_S_AXI_DATA_WIDTH
+            )
+            port map(
+                AXI_ARESETN => rst_i,
+                AXI_ACLK    => mclk_i,
+                AXI_AWADDR  => S_AXI_AWADDR,
+                AXI_AWPROT  => S_AXI_AWPROT,
+                AXI_AWVALID => S_AXI_AWVALID,
+                AXI_AWREADY => S_AXI_AWREADY,
+                AXI_WDATA   => S_AXI_WDATA,
+                AXI_WSTRB   => S_AXI_WSTRB,
+                AXI_WVALID  => S_AXI_WVALID,
+                AXI_WREADY  => S_AXI_WREADY,
+                AXI_BRESP   => S_AXI_BRESP,
+                AXI_BVALID  => S_AXI_BVALID,
+                AXI_BREADY  => S_AXI_BREADY,
+                AXI_ARADDR  => S_AXI_ARADDR,
+                AXI_ARPROT  => S_AXI_ARPROT,
+                AXI_ARVALID => S_AXI_ARVALID,
+                AXI_ARREADY => S_AXI_ARREADY,
+                AXI_RDATA   => S_AXI_RDATA,
+                AXI_RRESP   => S_AXI_RRESP,
+                AXI_RVALID  => S_AXI_RVALID,
+                AXI_RREADY  => S_AXI_RREADY
+            );
+    end generate;
 
 end simulation;
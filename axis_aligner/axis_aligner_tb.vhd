@@ -28,13 +28,19 @@ library vunit_lib;
 
 entity axis_aligner_tb is
   generic (
-    runner_cfg      : string
+    runner_cfg      : string;
+    peripherals_num : positive := 2;
+    tdata_byte      : integer  := 4;
+    tdest_size      : integer  := 8;
+    tuser_size      : integer  := 8;
+    switch_on_tlast : boolean  := true;
+    stall_prob      : natural  := 0;
+    seed            : natural  := 0
 	);
 end axis_aligner_tb;
 
 architecture behavioral of axis_aligner_tb is
 
-  constant peripherals_num : positive := 2;
   constant packet_size_c   : integer := 8;
   constant packet_number_c : integer := 8;
 
@@ -69,9 +75,6 @@ architecture behavioral of axis_aligner_tb is
   end component axis_aligner;
 
   constant run_time_c : time    := 100 us;
-  constant tdata_byte : integer := 4;
-  constant tdest_size : integer := 8;
-  constant tuser_size : integer := 8;
 
   signal   rst_i       : std_logic;
   signal   clk_i       : std_logic := '0';
@@ -96,6 +99,8 @@ architecture behavioral of axis_aligner_tb is
   signal done  : boolean_vector(peripherals_num-1 downto 0) := (others=>false);
   signal saved : boolean_vector(peripherals_num-1 downto 0) := (others=>false);
 
+  signal monitor_done : boolean := false;
+
   type axi_slave_array_t is array (peripherals_num-1 downto 0) of axi_stream_slave_t;
 
   impure function new_slave_array return axi_slave_array_t is
@@ -107,7 +112,7 @@ architecture behavioral of axis_aligner_tb is
         dest_length  => tdest_size,
         user_length  => tuser_size,
         id_length    => 1,
-        stall_config => new_stall_config(0.00, 1, 10)
+        stall_config => new_stall_config(real(stall_prob)/100.0, 1, 10)
       );
     end loop;
     return tmp;
@@ -161,6 +166,9 @@ begin
         start <= false;
         wait until ( (and done) and (and saved) and rising_edge(clk_i));
         info("Test done");
+        monitor_done <= true;
+        wait until rising_edge(clk_i);
+        wait until rising_edge(clk_i);
 
       end if;
     end loop;
@@ -177,6 +185,10 @@ begin
 
       done(k) <= false;
       last := '0';
+      if seed /= 0 then
+        prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+        prbs.reset;
+      end if;
       wait until start and rising_edge(clk_i);
       wait for (k * 100 ns);
       info("VCI_" & to_string(k) & ": Writing data.");
@@ -220,6 +232,10 @@ begin
       if rst_i = '1' then
         saved(k) <= false;
       end if;
+      if seed /= 0 then
+        prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+        prbs.reset;
+      end if;
       wait until start and rising_edge(clk_i);
 
       info("Reading data from VCI_" & to_string(k) & ".");
@@ -279,6 +295,30 @@ begin
         tuser  => s_tuser_i(k)
       );
 
+    s_stall_u : entity work.axis_stall_monitor
+      generic map (
+        file_name => output_path(runner_cfg) & "s" & to_string(k) & ".stall"
+      )
+      port map (
+        clk_i    => clk_i,
+        done_i   => monitor_done,
+        tvalid_i => s_tvalid_i(k),
+        tready_i => s_tready_o(k),
+        tlast_i  => s_tlast_i(k)
+      );
+
+    m_stall_u : entity work.axis_stall_monitor
+      generic map (
+        file_name => output_path(runner_cfg) & "m" & to_string(k) & ".stall"
+      )
+      port map (
+        clk_i    => clk_i,
+        done_i   => monitor_done,
+        tvalid_i => m_tvalid_o(k),
+        tready_i => m_tready_i(k),
+        tlast_i  => m_tlast_o(k)
+      );
+
   end generate;
 
 
@@ -288,7 +328,7 @@ begin
     tdata_byte      => tdata_byte,
     tdest_size      => tdest_size,
     tuser_size      => tuser_size,
-    switch_on_tlast => true
+    switch_on_tlast => switch_on_tlast
   )
   port map (
     clk_i      => clk_i,
@@ -0,0 +1,63 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Benchmark configurations of axis_bench_tb: every core and variant below runs
+# under every tvalid/tready duty cycle pair of "patterns". Throughput may not
+# drop below axis_bench_baseline.json (see tools/bench.py). The baseline starts
+# at the ideal of every configuration, one beat per allowed cycle; run with
+# --bench-update to store measured figures instead.
+#--------------------------------------------------------------------------------
+from os.path import join, dirname
+import functools
+
+from tools import bench
+
+baseline_file = join(dirname(__file__), "axis_bench_baseline.json")
+
+variants = {
+    "axis_reg":      [{}],
+    "axis_fifo":     [dict(sync_mode=True), dict(sync_mode=False), dict(packet_mode=True)],
+    "axis_mux":      [dict(switch_tlast=True), dict(switch_tlast=False)],
+    "axis_demux":    [dict(switch_tlast=False)],
+    "axis_aligner":  [dict(switch_tlast=True), dict(switch_tlast=False)],
+    "axis_intercon": [dict(switch_tlast=True), dict(switch_tlast=False)],
+}
+
+# (on, period) cycles.
+patterns = [(1, 1), (3, 4), (1, 2)]
+
+
+def configs(beats=1000):
+    for dut, dut_variants in variants.items():
+        for variant in dut_variants:
+            for valid in patterns:
+                for ready in patterns:
+                    generics = dict(dut=dut, beats=beats, **variant)
+                    generics.update(valid_on=valid[0], valid_period=valid[1])
+                    generics.update(ready_on=ready[0], ready_period=ready[1])
+                    name = ",".join([dut] + ["%s=%s" % item for item in variant.items()] + [
+                        "valid=" + bench.duty(*valid),
+                        "ready=" + bench.duty(*ready),
+                    ])
+                    yield name, generics
+
+
+def add_configs(test_tb, beats=1000):
+    baseline = bench.Baseline(baseline_file)
+    for name, generics in configs(beats):
+        test_tb.add_config(
+            name=name,
+            generics=generics,
+            post_check=functools.partial(bench.post_check, name, generics, baseline),
+        )
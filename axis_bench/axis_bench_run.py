@@ -0,0 +1,40 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+from os.path import join, dirname
+import sys
+
+try:
+    import vunit
+except:
+    print("Please, intall vunit_hdl with 'pip install vunit_hdl'")
+    print("Also, make sure to have either GHDL or Modelsim installed.")
+    exit()
+
+root = dirname(__file__)
+sys.path.append(join(root, ".."))
+from tools import cores
+from tools import bench
+from tools.runner import Runner
+
+args = cores.cli().parse_args()
+vu = Runner.from_args(args=args)
+cores.add_project(vu, [cores.CORES["axis_bench"]])
+
+
+def post_run(results):
+    bench.write_table(results, args.output_path, cores.bench_baseline(args))
+
+
+vu.main(post_run=post_run)
@@ -0,0 +1,411 @@
+----------------------------------------------------------------------------------
+--Copyright 2022 Ricardo F Tafas Jr
+
+--Licensed under the Apache License, Version 2.0 (the "License"); you may not
+--use this file except in compliance with the License. You may obtain a copy of
+--the License at
+
+--   http://www.apache.org/licenses/LICENSE-2.0
+
+--Unless required by applicable law or agreed to in writing, software distributed
+--under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+--OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+--the specific language governing permissions and limitations under the License.
+----------------------------------------------------------------------------------
+-- Throughput and latency benchmark for the single stream paths of the AXIS cores.
+-- One stream of sequence numbers goes into port 0 of the core selected by "dut"
+-- and comes out of port 0. tvalid and tready follow periodic duty cycle patterns:
+-- tvalid rises for a new beat on cycles where (cycle mod valid_period) < valid_on,
+-- and tready is high on cycles where (cycle mod ready_period) < ready_on.
+-- Both sides are written to s.trace and m.trace; tools/bench.py turns them into
+-- beats per cycle, first beat latency and bubbles.
+----------------------------------------------------------------------------------
+library ieee;
+  use ieee.std_logic_1164.all;
+  use ieee.numeric_std.all;
+library expert;
+  use expert.std_logic_expert.all;
+library stdblocks;
+  use stdblocks.fifo_lib.all;
+
+library vunit_lib;
+  context vunit_lib.vunit_context;
+
+entity axis_bench_tb is
+  generic (
+    runner_cfg   : string;
+    dut          : string   := "axis_reg";
+    beats        : positive := 1000;
+    packet_size  : positive := 16;
+    valid_on     : positive := 1;
+    valid_period : positive := 1;
+    ready_on     : positive := 1;
+    ready_period : positive := 1;
+    fifo_size    : positive := 4;
+    sync_mode    : boolean  := true;
+    packet_mode  : boolean  := false;
+    switch_tlast : boolean  := true
+  );
+end axis_bench_tb;
+
+architecture behavioral of axis_bench_tb is
+
+  constant tdata_byte : integer  := 2;
+  constant tdest_size : integer  := 8;
+  constant tuser_size : integer  := 8;
+  constant ports_num  : positive := 2;
+
+  signal rst_i   : std_logic;
+  signal clk_i   : std_logic := '0';
+  signal cycle_s : natural   := 0;
+
+  signal s_tdata_i  : std_logic_vector(8*tdata_byte-1 downto 0) := (others=>'0');
+  signal s_tuser_i  : std_logic_vector(  tuser_size-1 downto 0) := (others=>'0');
+  signal s_tdest_i  : std_logic_vector(  tdest_size-1 downto 0) := (others=>'0');
+  signal s_tstrb_i  : std_logic_vector(  tdata_byte-1 downto 0) := (others=>'1');
+  signal s_tready_o : std_logic;
+  signal s_tvalid_i : std_logic := '0';
+  signal s_tlast_i  : std_logic := '0';
+
+  signal m_tdata_o  : std_logic_vector(8*tdata_byte-1 downto 0);
+  signal m_tuser_o  : std_logic_vector(  tuser_size-1 downto 0);
+  signal m_tdest_o  : std_logic_vector(  tdest_size-1 downto 0);
+  signal m_tready_i : std_logic;
+  signal m_tvalid_o : std_logic;
+  signal m_tlast_o  : std_logic;
+
+  signal received_s : natural := 0;
+
+begin
+
+  clk_i   <= not clk_i after 5 ns;
+
+  -- cycle_s is the cycle of the next rising edge, as counted by axis_trace_monitor.
+  cycle_p : process(clk_i)
+  begin
+    if rising_edge(clk_i) then
+      cycle_s <= cycle_s + 1;
+    end if;
+  end process;
+
+  main : process
+  begin
+    test_runner_setup(runner, runner_cfg);
+
+    rst_i     <= '1';
+    wait until rising_edge(clk_i);
+    wait until rising_edge(clk_i);
+    rst_i     <= '0';
+
+    while test_suite loop
+      if run("Benchmark") then
+        set_timeout(runner, now + 100 * beats * valid_period * ready_period * 10 ns);
+        info("Benchmark " & dut & ": " & to_string(beats) & " beats.");
+        wait until received_s = beats and rising_edge(clk_i);
+        info("All beats received.");
+      end if;
+    end loop;
+
+    test_runner_cleanup(runner); -- Simulation ends here
+  end process;
+
+  -- a beat is offered on a valid_on cycle and held until it is accepted.
+  source_p : process(clk_i)
+    variable sent_v : natural := 0;
+  begin
+    if rising_edge(clk_i) then
+      if rst_i = '1' then
+        s_tvalid_i <= '0';
+        sent_v     := 0;
+      else
+        if s_tvalid_i = '1' and s_tready_o = '1' then
+          sent_v     := sent_v + 1;
+          s_tvalid_i <= '0';
+        end if;
+        if (s_tvalid_i = '0' or s_tready_o = '1') and sent_v < beats and cycle_s mod valid_period < valid_on then
+          s_tvalid_i <= '1';
+          s_tdata_i  <= std_logic_vector(to_unsigned(sent_v mod 2**(8*tdata_byte), 8*tdata_byte));
+          s_tuser_i  <= std_logic_vector(to_unsigned(sent_v mod 2**tuser_size, tuser_size));
+          if sent_v mod packet_size = packet_size-1 or sent_v = beats-1 then
+            s_tlast_i <= '1';
+          else
+            s_tlast_i <= '0';
+          end if;
+        end if;
+      end if;
+    end if;
+  end process;
+
+  m_tready_i <= '1' when cycle_s mod ready_period < ready_on else '0';
+
+  sink_p : process(clk_i)
+  begin
+    if rising_edge(clk_i) then
+      if m_tvalid_o = '1' and m_tready_i = '1' then
+        received_s <= received_s + 1;
+      end if;
+    end if;
+  end process;
+
+  s_trace_u : entity work.axis_trace_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "s.trace"
+    )
+    port map (
+      clk_i    => clk_i,
+      tdata_i  => s_tdata_i,
+      tuser_i  => s_tuser_i,
+      tdest_i  => s_tdest_i,
+      tvalid_i => s_tvalid_i,
+      tready_i => s_tready_o,
+      tlast_i  => s_tlast_i
+    );
+
+  m_trace_u : entity work.axis_trace_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "m.trace",
+      stream_id => 1
+    )
+    port map (
+      clk_i    => clk_i,
+      tdata_i  => m_tdata_o,
+      tuser_i  => m_tuser_o,
+      tdest_i  => m_tdest_o,
+      tvalid_i => m_tvalid_o,
+      tready_i => m_tready_i,
+      tlast_i  => m_tlast_o
+    );
+
+  axis_reg_gen : if dut = "axis_reg" generate
+    dut_u : entity work.axis_reg
+      generic map (
+        tdata_byte => tdata_byte,
+        tdest_size => tdest_size,
+        tuser_size => tuser_size
+      )
+      port map (
+        clk_i      => clk_i,
+        rst_i      => rst_i,
+        s_tdata_i  => s_tdata_i,
+        s_tuser_i  => s_tuser_i,
+        s_tdest_i  => s_tdest_i,
+        s_tstrb_i  => s_tstrb_i,
+        s_tready_o => s_tready_o,
+        s_tvalid_i => s_tvalid_i,
+        s_tlast_i  => s_tlast_i,
+        m_tdata_o  => m_tdata_o,
+        m_tuser_o  => m_tuser_o,
+        m_tdest_o  => m_tdest_o,
+        m_tstrb_o  => open,
+        m_tready_i => m_tready_i,
+        m_tvalid_o => m_tvalid_o,
+        m_tlast_o  => m_tlast_o
+      );
+  end generate;
+
+  axis_fifo_gen : if dut = "axis_fifo" generate
+    dut_u : entity work.axis_fifo
+      generic map (
+        ram_type     => blockram,
+        fifo_size    => fifo_size,
+        tdata_size   => 8*tdata_byte,
+        tdest_size   => tdest_size,
+        tuser_size   => tuser_size,
+        packet_mode  => packet_mode,
+        tuser_enable => true,
+        tlast_enable => true,
+        tdest_enable => true,
+        sync_mode    => sync_mode,
+        cut_through  => false
+      )
+      port map (
+        clka_i          => clk_i,
+        rsta_i          => rst_i,
+        clkb_i          => clk_i,
+        rstb_i          => rst_i,
+        s_tdata_i       => s_tdata_i,
+        s_tuser_i       => s_tuser_i,
+        s_tdest_i       => s_tdest_i,
+        s_tready_o      => s_tready_o,
+        s_tvalid_i      => s_tvalid_i,
+        s_tlast_i       => s_tlast_i,
+        m_tdata_o       => m_tdata_o,
+        m_tuser_o       => m_tuser_o,
+        m_tdest_o       => m_tdest_o,
+        m_tready_i      => m_tready_i,
+        m_tvalid_o      => m_tvalid_o,
+        m_tlast_o       => m_tlast_o,
+        fifo_status_a_o => open,
+        fifo_status_b_o => open
+      );
+  end generate;
+
+  -- the cores below have port arrays: the stream uses port 0, other ports idle.
+  axis_mux_gen : if dut = "axis_mux" generate
+    signal s_tready_s : std_logic_vector(ports_num-1 downto 0);
+  begin
+    dut_u : entity work.axis_mux
+      generic map (
+        peripherals_num => ports_num,
+        tdata_byte      => tdata_byte,
+        tdest_size      => tdest_size,
+        tuser_size      => tuser_size,
+        select_auto     => false,
+        switch_tlast    => switch_tlast,
+        interleaving    => false,
+        max_tx_size     => 10,
+        mode            => 10
+      )
+      port map (
+        clk_i      => clk_i,
+        rst_i      => rst_i,
+        s_tdata_i  => (0 => s_tdata_i, others => (others=>'0')),
+        s_tuser_i  => (0 => s_tuser_i, others => (others=>'0')),
+        s_tdest_i  => (0 => s_tdest_i, others => (others=>'0')),
+        s_tstrb_i  => (0 => s_tstrb_i, others => (others=>'0')),
+        s_tready_o => s_tready_s,
+        s_tvalid_i => (0 => s_tvalid_i, others => '0'),
+        s_tlast_i  => (0 => s_tlast_i,  others => '0'),
+        m_tdata_o  => m_tdata_o,
+        m_tuser_o  => m_tuser_o,
+        m_tdest_o  => m_tdest_o,
+        m_tstrb_o  => open,
+        m_tready_i => m_tready_i,
+        m_tvalid_o => m_tvalid_o,
+        m_tlast_o  => m_tlast_o
+      );
+    s_tready_o <= s_tready_s(0);
+  end generate;
+
+  axis_demux_gen : if dut = "axis_demux" generate
+    signal m_tdata_s  : std_logic_array(ports_num-1 downto 0)(8*tdata_byte-1 downto 0);
+    signal m_tuser_s  : std_logic_array(ports_num-1 downto 0)(tuser_size-1 downto 0);
+    signal m_tdest_s  : std_logic_array(ports_num-1 downto 0)(tdest_size-1 downto 0);
+    signal m_tvalid_s : std_logic_vector(ports_num-1 downto 0);
+    signal m_tlast_s  : std_logic_vector(ports_num-1 downto 0);
+  begin
+    dut_u : entity work.axis_demux
+      generic map (
+        controllers_num => ports_num,
+        tdata_byte      => tdata_byte,
+        tdest_size      => tdest_size,
+        tuser_size      => tuser_size,
+        select_auto     => false,
+        switch_tlast    => switch_tlast,
+        max_tx_size     => 10
+      )
+      port map (
+        clk_i      => clk_i,
+        rst_i      => rst_i,
+        m_tdata_o  => m_tdata_s,
+        m_tuser_o  => m_tuser_s,
+        m_tdest_o  => m_tdest_s,
+        m_tstrb_o  => open,
+        m_tready_i => (0 => m_tready_i, others => '1'),
+        m_tvalid_o => m_tvalid_s,
+        m_tlast_o  => m_tlast_s,
+        s_tdata_i  => s_tdata_i,
+        s_tuser_i  => s_tuser_i,
+        s_tdest_i  => s_tdest_i,
+        s_tstrb_i  => s_tstrb_i,
+        s_tready_o => s_tready_o,
+        s_tvalid_i => s_tvalid_i,
+        s_tlast_i  => s_tlast_i
+      );
+    m_tdata_o  <= m_tdata_s(0);
+    m_tuser_o  <= m_tuser_s(0);
+    m_tdest_o  <= m_tdest_s(0);
+    m_tvalid_o <= m_tvalid_s(0);
+    m_tlast_o  <= m_tlast_s(0);
+  end generate;
+
+  -- every aligner port carries the same stream, so they stay aligned.
+  axis_aligner_gen : if dut = "axis_aligner" generate
+    signal s_tready_s : std_logic_vector(ports_num-1 downto 0);
+    signal m_tdata_s  : std_logic_array(ports_num-1 downto 0)(8*tdata_byte-1 downto 0);
+    signal m_tuser_s  : std_logic_array(ports_num-1 downto 0)(tuser_size-1 downto 0);
+    signal m_tdest_s  : std_logic_array(ports_num-1 downto 0)(tdest_size-1 downto 0);
+    signal m_tvalid_s : std_logic_vector(ports_num-1 downto 0);
+    signal m_tlast_s  : std_logic_vector(ports_num-1 downto 0);
+  begin
+    dut_u : entity work.axis_aligner
+      generic map (
+        number_ports    => ports_num,
+        tdata_byte      => tdata_byte,
+        tdest_size      => tdest_size,
+        tuser_size      => tuser_size,
+        switch_on_tlast => switch_tlast
+      )
+      port map (
+        clk_i      => clk_i,
+        rst_i      => rst_i,
+        m_tdata_o  => m_tdata_s,
+        m_tuser_o  => m_tuser_s,
+        m_tdest_o  => m_tdest_s,
+        m_tstrb_o  => open,
+        m_tready_i => (others => m_tready_i),
+        m_tvalid_o => m_tvalid_s,
+        m_tlast_o  => m_tlast_s,
+        s_tdata_i  => (others => s_tdata_i),
+        s_tuser_i  => (others => s_tuser_i),
+        s_tdest_i  => (others => s_tdest_i),
+        s_tstrb_i  => (others => s_tstrb_i),
+        s_tready_o => s_tready_s,
+        s_tvalid_i => (others => s_tvalid_i),
+        s_tlast_i  => (others => s_tlast_i)
+      );
+    s_tready_o <= s_tready_s(0);
+    m_tdata_o  <= m_tdata_s(0);
+    m_tuser_o  <= m_tuser_s(0);
+    m_tdest_o  <= m_tdest_s(0);
+    m_tvalid_o <= m_tvalid_s(0);
+    m_tlast_o  <= m_tlast_s(0);
+  end generate;
+
+  axis_intercon_gen : if dut = "axis_intercon" generate
+    signal s_tready_s : std_logic_vector(ports_num-1 downto 0);
+    signal m_tdata_s  : std_logic_array(ports_num-1 downto 0)(8*tdata_byte-1 downto 0);
+    signal m_tuser_s  : std_logic_array(ports_num-1 downto 0)(tuser_size-1 downto 0);
+    signal m_tdest_s  : std_logic_array(ports_num-1 downto 0)(tdest_size-1 downto 0);
+    signal m_tvalid_s : std_logic_vector(ports_num-1 downto 0);
+    signal m_tlast_s  : std_logic_vector(ports_num-1 downto 0);
+  begin
+    dut_u : entity work.axis_intercon
+      generic map (
+        controllers_num => ports_num,
+        peripherals_num => ports_num,
+        tdata_byte      => tdata_byte,
+        tdest_size      => tdest_size,
+        tuser_size      => tuser_size,
+        select_auto     => false,
+        switch_tlast    => switch_tlast,
+        interleaving    => false,
+        max_tx_size     => 10
+      )
+      port map (
+        rst_i      => rst_i,
+        clk_i      => clk_i,
+        m_tdata_o  => m_tdata_s,
+        m_tuser_o  => m_tuser_s,
+        m_tdest_o  => m_tdest_s,
+        m_tstrb_o  => open,
+        m_tready_i => (0 => m_tready_i, others => '1'),
+        m_tvalid_o => m_tvalid_s,
+        m_tlast_o  => m_tlast_s,
+        s_tdata_i  => (0 => s_tdata_i, others => (others=>'0')),
+        s_tuser_i  => (0 => s_tuser_i, others => (others=>'0')),
+        s_tdest_i  => (0 => s_tdest_i, others => (others=>'0')),
+        s_tstrb_i  => (0 => s_tstrb_i, others => (others=>'0')),
+        s_tready_o => s_tready_s,
+        s_tvalid_i => (0 => s_tvalid_i, others => '0'),
+        s_tlast_i  => (0 => s_tlast_i,  others => '0')
+      );
+    s_tready_o <= s_tready_s(0);
+    m_tdata_o  <= m_tdata_s(0);
+    m_tuser_o  <= m_tuser_s(0);
+    m_tdest_o  <= m_tdest_s(0);
+    m_tvalid_o <= m_tvalid_s(0);
+    m_tlast_o  <= m_tlast_s(0);
+  end generate;
+
+end behavioral;
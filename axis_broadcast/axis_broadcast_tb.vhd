@@ -28,13 +28,18 @@ library vunit_lib;
 
 entity axis_broadcast_tb is
   generic (
-    runner_cfg : string
+    runner_cfg      : string;
+    peripherals_num : positive := 2;
+    tdata_byte      : integer  := 4;
+    tdest_size      : integer  := 8;
+    tuser_size      : integer  := 8;
+    stall_prob      : natural  := 0;
+    seed            : natural  := 0
 	);
 end axis_broadcast_tb;
 
 architecture behavioral of axis_broadcast_tb is
 
-  constant peripherals_num : positive := 2;
 
   component axis_broadcast is
     generic (
@@ -66,9 +71,6 @@ architecture behavioral of axis_broadcast_tb is
   end component axis_broadcast;
 
   constant run_time_c : time    := 100 us;
-  constant tdata_byte : integer := 4;
-  constant tdest_size : integer := 8;
-  constant tuser_size : integer := 8;
 
   signal   rst_i       : std_logic;
   signal   clk_i       : std_logic := '0';
@@ -93,6 +95,8 @@ architecture behavioral of axis_broadcast_tb is
   signal done  : boolean := false;
   signal saved : boolean_vector(peripherals_num-1 downto 0) := (others=>false);
 
+  signal monitor_done : boolean := false;
+
   constant cnt_top_c : integer := 8;
 
   constant master_axi_stream : axi_stream_master_t := new_axi_stream_master(
@@ -113,7 +117,7 @@ architecture behavioral of axis_broadcast_tb is
         dest_length  => tdest_size,
         user_length  => tuser_size,
         id_length    => 1,
-        stall_config => new_stall_config(0.00, 1, 10)
+        stall_config => new_stall_config(real(stall_prob)/100.0, 1, 10)
       );
     end loop;
     return tmp;
@@ -149,6 +153,9 @@ begin
         start <= false;
         wait until (done and (and saved) and rising_edge(clk_i));
         info("Test done");
+        monitor_done <= true;
+        wait until rising_edge(clk_i);
+        wait until rising_edge(clk_i);
 
       end if;
     end loop;
@@ -163,6 +170,10 @@ begin
   begin
     done <= false;
     last := '0';
+    if seed /= 0 then
+      prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+      prbs.reset;
+    end if;
     wait until start and rising_edge(clk_i);
     info("Writing data to VCI.");
     for j in cnt_top_c-1 downto 0 loop
@@ -200,6 +211,10 @@ begin
       if rst_i = '1' then
         saved(k) <= false;
       end if;
+      if seed /= 0 then
+        prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+        prbs.reset;
+      end if;
       wait until done and rising_edge(clk_i);
 
       info("Reading data from VCI_" & to_string(k) & ".");
@@ -244,6 +259,33 @@ begin
         tuser  => m_tuser_o(k)
       );
 
+    m_trace_u : entity work.axis_trace_monitor
+      generic map (
+        file_name => output_path(runner_cfg) & "m" & to_string(k) & ".trace",
+        stream_id => k+1
+      )
+      port map (
+        clk_i    => clk_i,
+        tdata_i  => m_tdata_o(k),
+        tuser_i  => m_tuser_o(k),
+        tdest_i  => m_tdest_o(k),
+        tvalid_i => m_tvalid_o(k),
+        tready_i => m_tready_i(k),
+        tlast_i  => m_tlast_o(k)
+      );
+
+    m_stall_u : entity work.axis_stall_monitor
+      generic map (
+        file_name => output_path(runner_cfg) & "m" & to_string(k) & ".stall"
+      )
+      port map (
+        clk_i    => clk_i,
+        done_i   => monitor_done,
+        tvalid_i => m_tvalid_o(k),
+        tready_i => m_tready_i(k),
+        tlast_i  => m_tlast_o(k)
+      );
+
   end generate;
 
   vunit_axism: entity vunit_lib.axi_stream_master
@@ -261,11 +303,38 @@ begin
       tuser  => s_tuser_i
     );
 
+  s_trace_u : entity work.axis_trace_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "s.trace"
+    )
+    port map (
+      clk_i    => clk_i,
+      tdata_i  => s_tdata_i,
+      tuser_i  => s_tuser_i,
+      tdest_i  => s_tdest_i,
+      tvalid_i => s_tvalid_i,
+      tready_i => s_tready_o,
+      tlast_i  => s_tlast_i
+    );
+
+  s_stall_u : entity work.axis_stall_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "s.stall"
+    )
+    port map (
+      clk_i    => clk_i,
+      done_i   => monitor_done,
+      tvalid_i => s_tvalid_i,
+      tready_i => s_tready_o,
+      tlast_i  => s_tlast_i
+    );
+
   dut : axis_broadcast
   generic map (
-    tdata_byte => tdata_byte,
-    tdest_size => tdest_size,
-    tuser_size => tuser_size
+    peripherals_num => peripherals_num,
+    tdata_byte      => tdata_byte,
+    tdest_size      => tdest_size,
+    tuser_size      => tuser_size
   )
   port map (
     clk_i      => clk_i,
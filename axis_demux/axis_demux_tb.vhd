@@ -28,13 +28,19 @@ library vunit_lib;
 
 entity axis_demux_tb is
   generic (
-    runner_cfg : string
+    runner_cfg      : string;
+    controllers_num : positive := 2;
+    tdata_byte      : integer  := 4;
+    tdest_size      : integer  := 8;
+    tuser_size      : integer  := 8;
+    switch_tlast    : boolean  := false;
+    stall_prob      : natural  := 0;
+    seed            : natural  := 0
 	);
 end axis_demux_tb;
 
 architecture behavioral of axis_demux_tb is
 
-  constant controllers_num : positive := 2;
   constant packet_size_c   : integer := 8;
   constant packet_number_c : integer := 8;
 
@@ -71,9 +77,6 @@ architecture behavioral of axis_demux_tb is
   end component axis_demux;
 
   constant run_time_c : time    := 100 us;
-  constant tdata_byte : integer := 4;
-  constant tdest_size : integer := 8;
-  constant tuser_size : integer := 8;
 
   signal   rst_i       : std_logic;
   signal   clk_i       : std_logic := '0';
@@ -98,6 +101,8 @@ architecture behavioral of axis_demux_tb is
   signal done  : boolean := false;
   signal saved : boolean := false;
 
+  signal monitor_done : boolean := false;
+
   constant master_axi_stream : axi_stream_master_t := new_axi_stream_master(
     data_length  => 8*tdata_byte,
     dest_length  => tdest_size,
@@ -116,7 +121,7 @@ architecture behavioral of axis_demux_tb is
         dest_length  => tdest_size,
         user_length  => tuser_size,
         id_length    => 1,
-        stall_config => new_stall_config(0.00, 1, 10)
+        stall_config => new_stall_config(real(stall_prob)/100.0, 1, 10)
       );
     end loop;
     return tmp;
@@ -152,6 +157,9 @@ begin
         start <= false;
         wait until (done and saved) and rising_edge(clk_i);
         info("Test done");
+        monitor_done <= true;
+        wait until rising_edge(clk_i);
+        wait until rising_edge(clk_i);
 
       end if;
     end loop;
@@ -168,6 +176,10 @@ begin
 
     done <= false;
     last := '0';
+    if seed /= 0 then
+      prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+      prbs.reset;
+    end if;
     wait until start and rising_edge(clk_i);
 
     info("VCI: Writing data.");
@@ -213,6 +225,10 @@ begin
       if rst_i = '1' then
         saved <= false;
       end if;
+      if seed /= 0 then
+        prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+        prbs.reset;
+      end if;
       wait until done and rising_edge(clk_i);
 
       info("Reading data from VCI.");
@@ -262,6 +278,18 @@ begin
         tuser  => m_tuser_o(k)
       );
 
+    m_stall_u : entity work.axis_stall_monitor
+      generic map (
+        file_name => output_path(runner_cfg) & "m" & to_string(k) & ".stall"
+      )
+      port map (
+        clk_i    => clk_i,
+        done_i   => monitor_done,
+        tvalid_i => m_tvalid_o(k),
+        tready_i => m_tready_i(k),
+        tlast_i  => m_tlast_o(k)
+      );
+
   end generate;
 
   vunit_axism: entity vunit_lib.axi_stream_master
@@ -279,6 +307,18 @@ begin
       tuser  => s_tuser_i
     );
 
+  s_stall_u : entity work.axis_stall_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "s.stall"
+    )
+    port map (
+      clk_i    => clk_i,
+      done_i   => monitor_done,
+      tvalid_i => s_tvalid_i,
+      tready_i => s_tready_o,
+      tlast_i  => s_tlast_i
+    );
+
   dut : axis_demux
   generic map (
     controllers_num => controllers_num,
@@ -286,7 +326,7 @@ begin
     tdest_size      => tdest_size,
     tuser_size      => tuser_size,
     select_auto     => false,
-    switch_tlast    => false,
+    switch_tlast    => switch_tlast,
     max_tx_size     => 10
   )
   port map (
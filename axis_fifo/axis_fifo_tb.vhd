@@ -32,7 +32,15 @@ library vunit_lib;
 
 entity axis_fifo_tb is
   generic (
-    runner_cfg : string
+    runner_cfg   : string;
+    ram_type     : string  := "blockram";
+    fifo_size    : integer := 4;
+    packet_mode  : boolean := false;
+    tuser_enable : boolean := true;
+    tlast_enable : boolean := true;
+    tdest_enable : boolean := true;
+    sync_mode    : boolean := false;
+    cut_through  : boolean := false
 	);
 end axis_fifo_tb;
 
@@ -42,7 +50,6 @@ architecture behavioral of axis_fifo_tb is
   constant tdata_byte : integer := 4;
   constant tdest_size : integer := 8;
   constant tuser_size : integer := 8;
-  constant fifo_size  : integer := 4;
 
   signal   rst_i       : std_logic;
   signal   clk_i       : std_logic := '0';
@@ -222,9 +229,13 @@ begin
         tuser => tuser_v
       );
       check_equal(prbs.get_data(tdata_v'length),tdata_v,result("Checking data error.") );
-      check_equal(to_integer(tdest_v),pckt_num,result("TDEST out of order, error at " & to_string(pckt_num) ) );
-      check_equal(to_integer(tuser_v),pckt_num,result("TUSER out of order, error at " & to_string(pckt_num) ) );
-      if (pckt_num > 0) and (pckt_num mod (cnt_top_c-1) = 0) then
+      if tdest_enable then
+        check_equal(to_integer(tdest_v),pckt_num,result("TDEST out of order, error at " & to_string(pckt_num) ) );
+      end if;
+      if tuser_enable then
+        check_equal(to_integer(tuser_v),pckt_num,result("TUSER out of order, error at " & to_string(pckt_num) ) );
+      end if;
+      if tlast_enable and (pckt_num > 0) and (pckt_num mod (cnt_top_c-1) = 0) then
         check_equal(last,std_logic'('1'),result("TLAST Missing.") );
       end if;
       pckt_num := pckt_num + 1;
@@ -269,17 +280,17 @@ begin
 
     dut_u : axis_fifo
       generic map (
-        ram_type     => blockram,
+        ram_type     => fifo_t'value(ram_type),
         fifo_size    => fifo_size,
         tdata_size   => 8*tdata_byte,
         tdest_size   => tdest_size,
         tuser_size   => tuser_size,
-        packet_mode  => false,
-        tuser_enable => true,
-        tlast_enable => true,
-        tdest_enable => true,
-        sync_mode    => false,
-        cut_through  => false
+        packet_mode  => packet_mode,
+        tuser_enable => tuser_enable,
+        tlast_enable => tlast_enable,
+        tdest_enable => tdest_enable,
+        sync_mode    => sync_mode,
+        cut_through  => cut_through
       )
       port map (
         clka_i       => clk_i,
@@ -305,5 +316,33 @@ begin
         fifo_status_b_o => fifo_status_b_o
       );
 
+  s_trace_u : entity work.axis_trace_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "s.trace"
+    )
+    port map (
+      clk_i    => clk_i,
+      tdata_i  => s_tdata_i,
+      tuser_i  => s_tuser_i,
+      tdest_i  => s_tdest_i,
+      tvalid_i => s_tvalid_i,
+      tready_i => s_tready_o,
+      tlast_i  => s_tlast_i
+    );
+
+  m_trace_u : entity work.axis_trace_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "m.trace",
+      stream_id => 1
+    )
+    port map (
+      clk_i    => clk_i,
+      tdata_i  => m_tdata_o,
+      tuser_i  => m_tuser_o,
+      tdest_i  => m_tdest_o,
+      tvalid_i => m_tvalid_o,
+      tready_i => m_tready_i,
+      tlast_i  => m_tlast_o
+    );
 
 end behavioral;
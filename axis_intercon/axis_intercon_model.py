@@ -0,0 +1,156 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Golden model of axis_intercon, used by the "File stimulus" test.
+#
+# Routing: every beat entering slave port k leaves master port tdest, and beats
+# of one (k, tdest) path keep their order. Arbitration: each master port is an
+# axis_mux; with switch_tlast it only changes source on tlast, so packets must
+# come out whole. The exact grant order depends on timing, so it is checked as
+# those two rules rather than replayed.
+#
+# Before the simulation, stim_<k>.txt is written for every slave port (tuser
+# carries k). The testbench writes dump_<j>.txt for every master port, and all
+# of them are checked in bulk afterwards.
+#--------------------------------------------------------------------------------
+from os.path import join
+import functools
+
+import numpy as np
+
+from tools import hexio
+from tools.sweep import Sweep
+
+# interleaving is left out: its grant order comes from the stdblocks queueing
+# timing, which the model does not cover (see AxisInterconModel).
+intercon_sweep = Sweep({
+    "controllers_num": [4, 16],
+    "peripherals_num": [4, 16],
+    "switch_tlast":    [True, False],
+})
+
+fields = ["tdest", "tuser", "tlast", "tdata"]
+
+
+class AxisInterconModel:
+    def __init__(self, controllers_num=8, peripherals_num=4, tdata_byte=1, tdest_size=8,
+                 tuser_size=8, switch_tlast=True, interleaving=False):
+        if interleaving:
+            raise ValueError("the model does not cover interleaving arbitration.")
+        if tdata_byte > 8:
+            raise ValueError("model holds tdata in 64 bits, tdata_byte must be up to 8.")
+        if 2**tuser_size < peripherals_num:
+            raise ValueError("tuser must be wide enough to carry the slave port index.")
+        self.controllers_num = controllers_num
+        self.peripherals_num = peripherals_num
+        self.tdata_byte = tdata_byte
+        self.switch_tlast = switch_tlast
+        self.widths = [hexio.digits(tdest_size), hexio.digits(tuser_size), 1, 2 * tdata_byte]
+
+    def stimulus(self, packets, packet_size=(1, 16), seed=0):
+        # per slave port: packets of random size, each one to a random master port.
+        rng = np.random.default_rng(seed)
+        stim = []
+        for k in range(self.peripherals_num):
+            sizes = rng.integers(packet_size[0], packet_size[1] + 1, packets)
+            beats = int(sizes.sum())
+            tlast = np.zeros(beats, dtype=np.uint64)
+            tlast[np.cumsum(sizes) - 1] = 1
+            stim.append({
+                "tdest": np.repeat(rng.integers(0, self.controllers_num, packets), sizes).astype(np.uint64),
+                "tuser": np.full(beats, k, dtype=np.uint64),
+                "tlast": tlast,
+                "tdata": rng.integers(0, 2**(8 * self.tdata_byte), beats, dtype=np.uint64, endpoint=False),
+            })
+        return stim
+
+    def route(self, stim):
+        # expected beats per (master port, slave port) path, in order.
+        expected = {}
+        for k, beats in enumerate(stim):
+            for j in range(self.controllers_num):
+                mask = beats["tdest"] == j
+                expected[(j, k)] = {field: beats[field][mask] for field in fields}
+        return expected
+
+    def check(self, stim, dumps):
+        errors = []
+        expected = self.route(stim)
+        for j, beats in enumerate(dumps):
+            bad = np.flatnonzero(beats["tdest"] != j)
+            if bad.size:
+                errors.append("m%d beat %d: tdest %d" % (j, bad[0], beats["tdest"][bad[0]]))
+
+            for k in range(self.peripherals_num):
+                mask = beats["tuser"] == k
+                errors = errors + compare("m%d from s%d" % (j, k), expected[(j, k)], beats, mask)
+
+            unknown = np.flatnonzero(beats["tuser"] >= self.peripherals_num)
+            if unknown.size:
+                errors.append("m%d beat %d: tuser %d is no slave port" % (j, unknown[0], beats["tuser"][unknown[0]]))
+
+            if self.switch_tlast and beats["tuser"].size > 1:
+                packet = np.concatenate(([0], np.cumsum(beats["tlast"][:-1])))
+                mixed = np.flatnonzero((beats["tuser"][1:] != beats["tuser"][:-1]) & (packet[1:] == packet[:-1]))
+                if mixed.size:
+                    errors.append("m%d beat %d: source changed inside a packet" % (j, mixed[0] + 1))
+        return errors
+
+    def write_stimulus(self, stim, path):
+        for k, beats in enumerate(stim):
+            hexio.write(join(path, "stim_%d.txt" % k), [beats[field] for field in fields], self.widths)
+
+    def read_dumps(self, path):
+        dumps = []
+        for j in range(self.controllers_num):
+            columns = hexio.read(join(path, "dump_%d.txt" % j), self.widths)
+            dumps.append(dict(zip(fields, columns)))
+        return dumps
+
+
+def compare(name, expected, beats, mask):
+    got = {field: beats[field][mask] for field in fields}
+    if got["tdata"].size != expected["tdata"].size:
+        return ["%s: %d beats, expected %d" % (name, got["tdata"].size, expected["tdata"].size)]
+    errors = []
+    for field in ["tdata", "tlast"]:
+        bad = np.flatnonzero(got[field] != expected[field])
+        if bad.size:
+            errors.append("%s beat %d: %s %x, expected %x" % (name, bad[0], field, got[field][bad[0]], expected[field][bad[0]]))
+    return errors
+
+
+def pre_config(model, packets, seed, output_path):
+    model.write_stimulus(model.stimulus(packets, seed=seed), output_path)
+    return True
+
+
+def post_check(model, packets, seed, output_path):
+    stim = model.stimulus(packets, seed=seed)
+    errors = model.check(stim, model.read_dumps(output_path))
+    for error in errors[:20]:
+        print(error)
+    return not errors
+
+
+def add_configs(test_tb, packets=1000, seed=0):
+    file_test = test_tb.test("File stimulus")
+    for generics in intercon_sweep:
+        model = AxisInterconModel(**generics)
+        file_test.add_config(
+            name=intercon_sweep.config_name(generics),
+            generics=generics,
+            pre_config=functools.partial(pre_config, model, packets, seed),
+            post_check=functools.partial(post_check, model, packets, seed),
+        )
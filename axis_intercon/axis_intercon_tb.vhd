@@ -15,6 +15,9 @@
 library ieee;
   use ieee.std_logic_1164.all;
   use ieee.numeric_std.all;
+  use ieee.math_real.all;
+library std;
+  use std.textio.all;
 library expert;
 	use expert.std_logic_expert.all;
 	use expert.std_string.all;
@@ -28,7 +31,11 @@ library vunit_lib;
 
 entity axis_intercon_tb is
   generic (
-    runner_cfg      : string
+    runner_cfg      : string;
+    controllers_num : positive := 8;
+    peripherals_num : positive := 4;
+    switch_tlast    : boolean  := true;
+    interleaving    : boolean  := false
 	);
 end axis_intercon_tb;
 
@@ -38,11 +45,14 @@ architecture behavioral of axis_intercon_tb is
   constant tdata_byte      : integer  := 1;
   constant tdest_size      : integer  := 8;
   constant tuser_size      : integer  := 8;
-  constant peripherals_num : positive := 4;
-  constant controllers_num : positive := 8;
   constant packet_size_c   : integer  := 8;
   constant packet_number_c : integer  := 8;
 
+  --"File stimulus": stim_<k>.txt / dump_<j>.txt in the test output path.
+  constant file_ready_ratio_c : real    := 0.75;
+  constant file_drain_c       : integer := 100;
+  constant file_stall_c       : integer := 10000;
+
   component axis_intercon is
     generic (
       controllers_num : positive := 8;
@@ -97,6 +107,24 @@ architecture behavioral of axis_intercon_tb is
   signal m_tvalid_o : std_logic_vector(controllers_num-1 downto 0);
   signal m_tlast_o  : std_logic_vector(controllers_num-1 downto 0);
 
+  --verification components side, connected to the DUT unless in file mode.
+  signal vc_tdata_s  : std_logic_array(peripherals_num-1 downto 0)(8*tdata_byte-1 downto 0);
+  signal vc_tuser_s  : std_logic_array(peripherals_num-1 downto 0)(tuser_size-1 downto 0);
+  signal vc_tdest_s  : std_logic_array(peripherals_num-1 downto 0)(tdest_size-1 downto 0);
+  signal vc_tvalid_s : std_logic_vector(peripherals_num-1 downto 0);
+  signal vc_tlast_s  : std_logic_vector(peripherals_num-1 downto 0);
+  signal vc_tready_s : std_logic_vector(controllers_num-1 downto 0);
+
+  signal file_tdata_s  : std_logic_array(peripherals_num-1 downto 0)(8*tdata_byte-1 downto 0);
+  signal file_tuser_s  : std_logic_array(peripherals_num-1 downto 0)(tuser_size-1 downto 0);
+  signal file_tdest_s  : std_logic_array(peripherals_num-1 downto 0)(tdest_size-1 downto 0);
+  signal file_tvalid_s : std_logic_vector(peripherals_num-1 downto 0);
+  signal file_tlast_s  : std_logic_vector(peripherals_num-1 downto 0);
+  signal file_tready_s : std_logic_vector(controllers_num-1 downto 0);
+  signal file_done_s   : std_logic_vector(peripherals_num-1 downto 0);
+  signal file_mode_s   : boolean := false;
+  signal file_start_s  : boolean := false;
+
   type axi_slave_array_t is array (controllers_num-1 downto 0) of axi_stream_slave_t;
 
   impure function new_slave_array return axi_slave_array_t is
@@ -152,6 +180,8 @@ begin
     variable tid_v   : std_logic_vector(0 downto 0);
     variable master_index : integer := 0;
     variable slave_index  : integer := 0;
+    variable cycle_v      : natural := 0;
+    variable idle_v       : natural := 0;
 
     procedure send_axis_packet ( packet_number : integer; packet_size : integer ) is
     begin
@@ -291,6 +321,34 @@ begin
       elsif run("1:1 Master Slave with intermitent read") then
         check_passed(result("TBI."));
 
+      elsif run("File stimulus") then
+        info("Stimulus and dumps at " & output_path(runner_cfg));
+        set_timeout(runner, now + 100 us);
+        file_mode_s  <= true;
+        wait until rising_edge(clk_i);
+        file_start_s <= true;
+        loop
+          wait until rising_edge(clk_i);
+          cycle_v := cycle_v + 1;
+          if (m_tvalid_o and m_tready_i) /= (m_tvalid_o'range => '0') then
+            idle_v := 0;
+          else
+            idle_v := idle_v + 1;
+          end if;
+          exit when file_done_s = (file_done_s'range => '1') and idle_v >= file_drain_c;
+          if idle_v >= file_stall_c then
+            error("No output beat for " & to_string(file_stall_c) & " cycles.");
+            exit;
+          end if;
+          if cycle_v mod 1000 = 0 then
+            set_timeout(runner, now + 100 us);
+          end if;
+        end loop;
+        file_start_s <= false;
+        wait until rising_edge(clk_i);
+        wait until rising_edge(clk_i);
+        check_passed(result("File stimulus done in " & to_string(cycle_v) & " cycles."));
+
       end if;
     end loop;
 
@@ -306,7 +364,7 @@ begin
       port map (
         aclk   => clk_i,
         tvalid => m_tvalid_o(k),
-        tready => m_tready_i(k),
+        tready => vc_tready_s(k),
         tdata  => m_tdata_o(k),
         tlast  => m_tlast_o(k),
         tstrb  => m_tstrb_o(k),
@@ -324,17 +382,101 @@ begin
       )
       port map (
         aclk   => clk_i,
-        tvalid => s_tvalid_i(k),
+        tvalid => vc_tvalid_s(k),
         tready => s_tready_o(k),
-        tdata  => s_tdata_i(k),
-        tlast  => s_tlast_i(k),
-        tstrb  => s_tstrb_i(k),
-        tdest  => s_tdest_i(k),
-        tuser  => s_tuser_i(k)
+        tdata  => vc_tdata_s(k),
+        tlast  => vc_tlast_s(k),
+        tstrb  => open,
+        tdest  => vc_tdest_s(k),
+        tuser  => vc_tuser_s(k)
       );
 
   end generate;
 
+  s_tdata_i  <= file_tdata_s  when file_mode_s else vc_tdata_s;
+  s_tuser_i  <= file_tuser_s  when file_mode_s else vc_tuser_s;
+  s_tdest_i  <= file_tdest_s  when file_mode_s else vc_tdest_s;
+  s_tvalid_i <= file_tvalid_s when file_mode_s else vc_tvalid_s;
+  s_tlast_i  <= file_tlast_s  when file_mode_s else vc_tlast_s;
+  m_tready_i <= file_tready_s when file_mode_s else vc_tready_s;
+
+  file_source_gen : for k in 0 to peripherals_num-1 generate
+
+    file_source : process
+      file     stim_f  : text;
+      variable stim_l  : line;
+      variable status  : file_open_status;
+      variable tdata_v : std_logic_vector(8*tdata_byte-1 downto 0);
+      variable tuser_v : std_logic_vector(tuser_size-1 downto 0);
+      variable tdest_v : std_logic_vector(tdest_size-1 downto 0);
+      variable tlast_v : std_logic;
+    begin
+      file_tvalid_s(k) <= '0';
+      file_done_s(k)   <= '0';
+      wait until file_start_s;
+      file_open(status, stim_f, output_path(runner_cfg) & "stim_" & to_string(k) & ".txt", read_mode);
+      if status = open_ok then
+        while not endfile(stim_f) loop
+          readline(stim_f, stim_l);
+          hread(stim_l, tdest_v);
+          hread(stim_l, tuser_v);
+          read(stim_l, tlast_v);
+          hread(stim_l, tdata_v);
+          file_tdata_s(k)  <= tdata_v;
+          file_tuser_s(k)  <= tuser_v;
+          file_tdest_s(k)  <= tdest_v;
+          file_tlast_s(k)  <= tlast_v;
+          file_tvalid_s(k) <= '1';
+          wait until rising_edge(clk_i) and s_tready_o(k) = '1';
+        end loop;
+        file_close(stim_f);
+      else
+        warning("No stimulus file for slave port " & to_string(k));
+      end if;
+      file_tvalid_s(k) <= '0';
+      file_done_s(k)   <= '1';
+      wait;
+    end process;
+
+  end generate;
+
+  file_sink_gen : for j in 0 to controllers_num-1 generate
+
+    file_sink : process
+      file     dump_f : text;
+      variable dump_l : line;
+      variable seed1  : positive := 1;
+      variable seed2  : positive := j+1;
+      variable rand_v : real;
+    begin
+      file_tready_s(j) <= '0';
+      wait until file_start_s;
+      file_open(dump_f, output_path(runner_cfg) & "dump_" & to_string(j) & ".txt", write_mode);
+      while file_start_s loop
+        wait until rising_edge(clk_i);
+        if m_tvalid_o(j) = '1' and m_tready_i(j) = '1' then
+          hwrite(dump_l, m_tdest_o(j));
+          write(dump_l, ' ');
+          hwrite(dump_l, m_tuser_o(j));
+          write(dump_l, ' ');
+          write(dump_l, m_tlast_o(j));
+          write(dump_l, ' ');
+          hwrite(dump_l, m_tdata_o(j));
+          writeline(dump_f, dump_l);
+        end if;
+        uniform(seed1, seed2, rand_v);
+        if rand_v < file_ready_ratio_c then
+          file_tready_s(j) <= '1';
+        else
+          file_tready_s(j) <= '0';
+        end if;
+      end loop;
+      file_close(dump_f);
+      wait;
+    end process;
+
+  end generate;
+
 
   dut : axis_intercon
   generic map (
@@ -343,9 +485,9 @@ begin
     tdata_byte      => tdata_byte,
     tdest_size      => tdest_size,
     tuser_size      => tuser_size,
-    switch_tlast    => true,
+    switch_tlast    => switch_tlast,
     select_auto     => false,
-    interleaving    => false,
+    interleaving    => interleaving,
     max_tx_size     => 10
   )
   port map (
@@ -29,17 +29,20 @@ library stdblocks;
 
 entity axis_mux_tb is
   generic (
-    runner_cfg      : string
+    runner_cfg      : string;
+    peripherals_num : positive := 4;
+    tdata_byte      : integer  := 1;
+    tdest_size      : integer  := 8;
+    tuser_size      : integer  := 8;
+    switch_tlast    : boolean  := true;
+    stall_prob      : natural  := 0;
+    seed            : natural  := 0
 	);
 end axis_mux_tb;
 
 architecture behavioral of axis_mux_tb is
 
   constant run_time_c      : time     := 100 us;
-  constant tdata_byte      : integer  := 1;
-  constant tdest_size      : integer  := 8;
-  constant tuser_size      : integer  := 8;
-  constant peripherals_num : positive := 4;
   constant packet_size_c   : integer  := 8;
   constant packet_number_c : integer  := 8;
 
@@ -101,12 +104,14 @@ architecture behavioral of axis_mux_tb is
   signal done  : boolean := false;
   signal saved : boolean := false;
 
+  signal monitor_done : boolean := false;
+
   constant slave_axi_stream  : axi_stream_slave_t := new_axi_stream_slave (
     data_length  => 8*tdata_byte,
     dest_length  => tdest_size,
     user_length  => tuser_size,
     id_length    => 1,
-    stall_config => new_stall_config(0.00, 1, 10)
+    stall_config => new_stall_config(real(stall_prob)/100.0, 1, 10)
   );
 
   type axi_master_array_t is array (peripherals_num-1 downto 0) of axi_stream_master_t;
@@ -155,6 +160,9 @@ begin
         start <= false;
         wait until ( done and saved) and rising_edge(clk_i);
         info("Test done");
+        monitor_done <= true;
+        wait until rising_edge(clk_i);
+        wait until rising_edge(clk_i);
 
       end if;
     end loop;
@@ -172,6 +180,10 @@ begin
 
       done <= false;
       last := '0';
+      if seed /= 0 then
+        prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+        prbs.reset;
+      end if;
       wait until start and rising_edge(clk_i);
       info("VCI: Writing data.");
 
@@ -216,6 +228,10 @@ begin
       if rst_i = '1' then
         saved <= false;
       end if;
+      if seed /= 0 then
+        prbs.set_seed(std_logic_vector(to_unsigned(seed, 32)));
+        prbs.reset;
+      end if;
       wait until start and rising_edge(clk_i);
 
       info("Reading data from VCI.");
@@ -279,9 +295,33 @@ begin
         tuser  => s_tuser_i(k)
       );
 
+    s_stall_u : entity work.axis_stall_monitor
+      generic map (
+        file_name => output_path(runner_cfg) & "s" & to_string(k) & ".stall"
+      )
+      port map (
+        clk_i    => clk_i,
+        done_i   => monitor_done,
+        tvalid_i => s_tvalid_i(k),
+        tready_i => s_tready_o(k),
+        tlast_i  => s_tlast_i(k)
+      );
+
   end generate;
 
 
+  m_stall_u : entity work.axis_stall_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "m.stall"
+    )
+    port map (
+      clk_i    => clk_i,
+      done_i   => monitor_done,
+      tvalid_i => m_tvalid_o,
+      tready_i => m_tready_i,
+      tlast_i  => m_tlast_o
+    );
+
   dut : axis_mux
   generic map (
     peripherals_num => peripherals_num,
@@ -289,7 +329,7 @@ begin
     tdest_size      => tdest_size,
     tuser_size      => tuser_size,
     select_auto     => false,
-    switch_tlast    => true,
+    switch_tlast    => switch_tlast,
     interleaving    => false,
     max_tx_size     => 10,
     mode            => 10
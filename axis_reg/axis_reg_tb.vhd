@@ -263,6 +263,33 @@ begin
     m_tlast_o  => m_tlast_o
   );
 
+  s_trace_u : entity work.axis_trace_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "s.trace"
+    )
+    port map (
+      clk_i    => clk_i,
+      tdata_i  => s_tdata_i,
+      tuser_i  => s_tuser_i,
+      tdest_i  => s_tdest_i,
+      tvalid_i => s_tvalid_i,
+      tready_i => s_tready_o,
+      tlast_i  => s_tlast_i
+    );
 
+  m_trace_u : entity work.axis_trace_monitor
+    generic map (
+      file_name => output_path(runner_cfg) & "m.trace",
+      stream_id => 1
+    )
+    port map (
+      clk_i    => clk_i,
+      tdata_i  => m_tdata_o,
+      tuser_i  => m_tuser_o,
+      tdest_i  => m_tdest_o,
+      tvalid_i => m_tvalid_o,
+      tready_i => m_tready_i,
+      tlast_i  => m_tlast_o
+    );
 
 end behavioral;
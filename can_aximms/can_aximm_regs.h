@@ -0,0 +1,110 @@
+/* Generated by tools/regmap.py from can_aximm.md, version 20210528_1505. Do not edit. */
+#ifndef CAN_AXIMM_REGS_H
+#define CAN_AXIMM_REGS_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+/* RX_DLC to RX_DATA1, copied together. */
+typedef struct __attribute__((packed, aligned(4))) {
+    uint32_t rx_dlc;
+    uint32_t rx_id;
+    uint32_t rx_data0;
+    uint32_t rx_data1;
+} can_aximm_rx_frame_t;
+
+/* TX_DLC to TX_DATA1, copied together. */
+typedef struct __attribute__((packed, aligned(4))) {
+    uint32_t tx_dlc;
+    uint32_t tx_id;
+    uint32_t tx_data0;
+    uint32_t tx_data1;
+} can_aximm_tx_frame_t;
+
+/* Register window: can_aximm_regs_t *regs = (can_aximm_regs_t *)base; */
+typedef volatile struct __attribute__((packed, aligned(4))) {
+    uint32_t golden;               /* 0x00 */
+    uint32_t config_1;             /* 0x04 */
+    uint32_t config_2;             /* 0x08 */
+    uint32_t irq;                  /* 0x0C */
+    uint32_t line_status;          /* 0x10 */
+    uint32_t reserved_14[2];       /* 0x14 */
+    uint32_t test_control;         /* 0x1C */
+    uint32_t rx_status;            /* 0x20 */
+    uint32_t id_filter;            /* 0x24 */
+    uint32_t id_filter_mask;       /* 0x28 */
+    union {
+        struct {
+            uint32_t rx_dlc;       /* 0x2C */
+            uint32_t rx_id;        /* 0x30 */
+            uint32_t rx_data0;     /* 0x34 */
+            uint32_t rx_data1;     /* 0x38 */
+        };
+        can_aximm_rx_frame_t rx_frame;
+    };
+    uint32_t reserved_3c[1];       /* 0x3C */
+    uint32_t tx_status;            /* 0x40 */
+    union {
+        struct {
+            uint32_t tx_dlc;       /* 0x44 */
+            uint32_t tx_id;        /* 0x48 */
+            uint32_t tx_data0;     /* 0x4C */
+            uint32_t tx_data1;     /* 0x50 */
+        };
+        can_aximm_tx_frame_t tx_frame;
+    };
+} can_aximm_regs_t;
+
+_Static_assert(offsetof(can_aximm_regs_t, golden) == 0x00, "Golden offset");
+_Static_assert(offsetof(can_aximm_regs_t, config_1) == 0x04, "Config_1 offset");
+_Static_assert(offsetof(can_aximm_regs_t, config_2) == 0x08, "Config_2 offset");
+_Static_assert(offsetof(can_aximm_regs_t, irq) == 0x0C, "IRQ offset");
+_Static_assert(offsetof(can_aximm_regs_t, line_status) == 0x10, "Line_Status offset");
+_Static_assert(offsetof(can_aximm_regs_t, test_control) == 0x1C, "TEST_Control offset");
+_Static_assert(offsetof(can_aximm_regs_t, rx_status) == 0x20, "RX_STATUS offset");
+_Static_assert(offsetof(can_aximm_regs_t, id_filter) == 0x24, "ID_Filter offset");
+_Static_assert(offsetof(can_aximm_regs_t, id_filter_mask) == 0x28, "ID_Filter_MASK offset");
+_Static_assert(offsetof(can_aximm_regs_t, rx_dlc) == 0x2C, "RX_DLC offset");
+_Static_assert(offsetof(can_aximm_regs_t, rx_id) == 0x30, "RX_ID offset");
+_Static_assert(offsetof(can_aximm_regs_t, rx_data0) == 0x34, "RX_DATA0 offset");
+_Static_assert(offsetof(can_aximm_regs_t, rx_data1) == 0x38, "RX_DATA1 offset");
+_Static_assert(offsetof(can_aximm_regs_t, tx_status) == 0x40, "TX_STATUS offset");
+_Static_assert(offsetof(can_aximm_regs_t, tx_dlc) == 0x44, "TX_DLC offset");
+_Static_assert(offsetof(can_aximm_regs_t, tx_id) == 0x48, "TX_ID offset");
+_Static_assert(offsetof(can_aximm_regs_t, tx_data0) == 0x4C, "TX_DATA0 offset");
+_Static_assert(offsetof(can_aximm_regs_t, tx_data1) == 0x50, "TX_DATA1 offset");
+_Static_assert(offsetof(can_aximm_regs_t, rx_frame) == 0x2C, "rx_frame offset");
+_Static_assert(sizeof(can_aximm_rx_frame_t) == 16, "rx_frame size");
+_Static_assert(offsetof(can_aximm_regs_t, tx_frame) == 0x44, "tx_frame offset");
+_Static_assert(sizeof(can_aximm_tx_frame_t) == 16, "tx_frame size");
+_Static_assert(sizeof(can_aximm_regs_t) == 0x54, "register window size");
+
+static inline can_aximm_rx_frame_t can_aximm_read_rx_frame(can_aximm_regs_t *regs)
+{
+    can_aximm_rx_frame_t rx_frame;
+    rx_frame.rx_dlc = regs->rx_dlc;
+    rx_frame.rx_id = regs->rx_id;
+    rx_frame.rx_data0 = regs->rx_data0;
+    rx_frame.rx_data1 = regs->rx_data1;
+    return rx_frame;
+}
+
+static inline can_aximm_tx_frame_t can_aximm_read_tx_frame(can_aximm_regs_t *regs)
+{
+    can_aximm_tx_frame_t tx_frame;
+    tx_frame.tx_dlc = regs->tx_dlc;
+    tx_frame.tx_id = regs->tx_id;
+    tx_frame.tx_data0 = regs->tx_data0;
+    tx_frame.tx_data1 = regs->tx_data1;
+    return tx_frame;
+}
+
+static inline void can_aximm_write_tx_frame(can_aximm_regs_t *regs, const can_aximm_tx_frame_t *tx_frame)
+{
+    regs->tx_dlc = tx_frame->tx_dlc;
+    regs->tx_id = tx_frame->tx_id;
+    regs->tx_data0 = tx_frame->tx_data0;
+    regs->tx_data1 = tx_frame->tx_data1;
+}
+
+#endif
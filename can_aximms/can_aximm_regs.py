@@ -0,0 +1,91 @@
+# Generated by tools/regmap.py from can_aximm.md, version 20210528_1505. Do not edit.
+import numpy as np
+
+from tools import regaccess
+
+data_width = 32
+
+# field: (address, shift, mask, type)
+fields = {
+    'g1':              (0x00,  0, 0xFFFFFFFF, 'ReadOnly'),
+    'iso_mode':        (0x04,  0, 0x00000001, 'ReadWrite'),
+    'fd_enable':       (0x04,  1, 0x00000002, 'ReadWrite'),
+    'promiscuous':     (0x04,  8, 0x00000100, 'ReadWrite'),
+    'sample_rate':     (0x08,  0, 0x0000FFFF, 'ReadWrite'),
+    'rx_data_irq':     (0x0C,  0, 0x00000001, 'Write2Clear'),
+    'rx_error_irq':    (0x0C,  1, 0x00000002, 'Write2Clear'),
+    'tx_data_irq':     (0x0C,  8, 0x00000100, 'Write2Clear'),
+    'tx_error_irq':    (0x0C,  9, 0x00000200, 'Write2Clear'),
+    'rx_data_mask':    (0x0C, 16, 0x00010000, 'ReadWrite'),
+    'rx_error_mask':   (0x0C, 17, 0x00020000, 'ReadWrite'),
+    'tx_data_mask':    (0x0C, 24, 0x01000000, 'ReadWrite'),
+    'tx_error_mask':   (0x0C, 25, 0x02000000, 'ReadWrite'),
+    'stuff_violation': (0x10,  0, 0x00000001, 'Write2Clear'),
+    'collision':       (0x10,  1, 0x00000002, 'Write2Clear'),
+    'channel_ready':   (0x10,  8, 0x00000100, 'ReadOnly'),
+    'loop_enable':     (0x1C,  0, 0x00000001, 'ReadWrite'),
+    'insert_error':    (0x1C,  8, 0x00000100, 'Write2Pulse'),
+    'force_dominant':  (0x1C, 16, 0x00010000, 'ReadWrite'),
+    'rx_data_valid':   (0x20,  0, 0x00000001, 'Write2Clear'),
+    'rx_read_done':    (0x20,  1, 0x00000002, 'Write2Pulse'),
+    'rx_busy':         (0x20,  8, 0x00000100, 'ReadOnly'),
+    'rx_crc_error':    (0x20,  9, 0x00000200, 'ReadOnly'),
+    'rx_rtr':          (0x20, 16, 0x00010000, 'ReadOnly'),
+    'rx_ide':          (0x20, 24, 0x01000000, 'ReadOnly'),
+    'rx_reserved':     (0x20, 25, 0x06000000, 'ReadOnly'),
+    'id1':             (0x24,  0, 0x1FFFFFFF, 'ReadWrite'),
+    'id1_mask':        (0x28,  0, 0x1FFFFFFF, 'ReadWrite'),
+    'rx_size':         (0x2C,  0, 0x0000000F, 'ReadOnly'),
+    'rx_id':           (0x30,  0, 0x1FFFFFFF, 'ReadOnly'),
+    'rx_data0':        (0x34,  0, 0xFFFFFFFF, 'ReadOnly'),
+    'rx_data1':        (0x38,  0, 0xFFFFFFFF, 'ReadOnly'),
+    'tx_ready':        (0x40,  0, 0x00000001, 'ReadOnly'),
+    'tx_valid':        (0x40,  1, 0x00000002, 'Write2Pulse'),
+    'tx_busy':         (0x40,  8, 0x00000100, 'ReadOnly'),
+    'tx_arb_lost':     (0x40,  9, 0x00000200, 'Write2Clear'),
+    'tx_retry_error':  (0x40, 10, 0x00000400, 'Write2Clear'),
+    'tx_rtr':          (0x40, 16, 0x00010000, 'ReadWrite'),
+    'tx_eff':          (0x40, 24, 0x01000000, 'ReadWrite'),
+    'tx_reserved':     (0x40, 25, 0x06000000, 'ReadWrite'),
+    'tx_dlc':          (0x44,  0, 0x0000000F, 'ReadWrite'),
+    'tx_id':           (0x48,  0, 0x1FFFFFFF, 'ReadWrite'),
+    'tx_data0':        (0x4C,  0, 0xFFFFFFFF, 'ReadWrite'),
+    'tx_data1':        (0x50,  0, 0xFFFFFFFF, 'ReadWrite'),
+}
+
+# address: (name, read-modify-write keep mask, reset)
+registers = {
+    0x00: ('Golden',         0x00000000, 0x00000000),
+    0x04: ('Config_1',       0x00000103, 0x00000000),
+    0x08: ('Config_2',       0x0000FFFF, 0x00000000),
+    0x0C: ('IRQ',            0x03030000, 0x00000000),
+    0x10: ('Line_Status',    0x00000000, 0x00000000),
+    0x1C: ('TEST_Control',   0x00010001, 0x00000000),
+    0x20: ('RX_STATUS',      0x00000000, 0x00000000),
+    0x24: ('ID_Filter',      0x1FFFFFFF, 0x00000000),
+    0x28: ('ID_Filter_MASK', 0x1FFFFFFF, 0x00000000),
+    0x2C: ('RX_DLC',         0x00000000, 0x00000000),
+    0x30: ('RX_ID',          0x00000000, 0x00000000),
+    0x34: ('RX_DATA0',       0x00000000, 0x00000000),
+    0x38: ('RX_DATA1',       0x00000000, 0x00000000),
+    0x40: ('TX_STATUS',      0x07010000, 0x00000000),
+    0x44: ('TX_DLC',         0x0000000F, 0x00000000),
+    0x48: ('TX_ID',          0x1FFFFFFF, 0x00000000),
+    0x4C: ('TX_DATA0',       0xFFFFFFFF, 0x00000000),
+    0x50: ('TX_DATA1',       0xFFFFFFFF, 0x00000000),
+}
+
+
+class CanAximm(regaccess.RegisterBlock):
+    fields = fields
+    registers = registers
+    data_width = data_width
+
+
+# register window, unmapped words are padding.
+dtype = np.dtype({
+    "names":    ['golden', 'config_1', 'config_2', 'irq', 'line_status', 'test_control', 'rx_status', 'id_filter', 'id_filter_mask', 'rx_dlc', 'rx_id', 'rx_data0', 'rx_data1', 'tx_status', 'tx_dlc', 'tx_id', 'tx_data0', 'tx_data1'],
+    "formats":  ['<u4'] * 18,
+    "offsets":  [0x00, 0x04, 0x08, 0x0C, 0x10, 0x1C, 0x20, 0x24, 0x28, 0x2C, 0x30, 0x34, 0x38, 0x40, 0x44, 0x48, 0x4C, 0x50],
+    "itemsize": 0x54,
+})
@@ -41,8 +41,13 @@ use work.can_aximm_pkg.all;
 
 entity can_aximm_top_tb is
     generic (
-        runner_cfg : string;
-        run_time   : integer := 100
+        runner_cfg  : string;
+        run_time    : integer := 100;
+        --"Replay model RX frames" settings, see can_soak.py.
+        id_filter   : natural := 0;
+        id_mask     : natural := 0;
+        promiscuous : boolean := true;
+        idle_bits   : natural := 0
     );
     --port (
     --port_declaration_tag
@@ -93,6 +98,11 @@ architecture simulation of can_aximm_top_tb is
     signal tx_irq_n_s : std_logic;
     signal rx_irq_n_s : std_logic;
 
+    --bus line driven by the model tests, and what the DUT puts on it.
+    signal line_s     : std_logic := '1';
+    signal tx_line_s  : std_logic;
+    signal capture_en : boolean   := false;
+
 
 begin
 
@@ -102,6 +112,33 @@ begin
     main : process
         variable wdata_v : std_logic_vector(C_S_AXI_DATA_WIDTH - 1 downto 0) := (others => '0');
         variable rdata_v : std_logic_vector(C_S_AXI_DATA_WIDTH - 1 downto 0) := (others => '0');
+        --model frames, see can_model.py.
+        file     frames_f   : text;
+        variable line_v     : line;
+        variable ide_v      : std_logic_vector(3 downto 0);
+        variable id_v       : std_logic_vector(31 downto 0);
+        variable rtr_v      : std_logic_vector(3 downto 0);
+        variable dlc_v      : std_logic_vector(3 downto 0);
+        variable data_v     : std_logic_vector(63 downto 0);
+        variable error_v    : std_logic_vector(3 downto 0);
+        variable check_at_v : std_logic_vector(15 downto 0);
+        variable length_v   : std_logic_vector(15 downto 0);
+        variable bit_v      : character;
+        variable start_v    : time;
+        variable frame_v    : natural;
+        --register stimulus, see can_regs_script.py.
+        file     regs_f     : text;
+        variable op_v       : std_logic_vector(3 downto 0);
+        variable addr_v     : std_logic_vector(31 downto 0);
+        variable mask_v     : std_logic_vector(31 downto 0);
+        variable strb_v     : std_logic_vector(3 downto 0);
+        --replay counters of what the DUT flagged, written to rx_counters.txt.
+        variable accept_v   : boolean;
+        variable stuffed_v  : boolean;
+        variable data_n_v   : natural;
+        variable crc_n_v    : natural;
+        variable stuff_n_v  : natural;
+        variable drop_n_v   : natural;
     begin
         test_runner_setup(runner, runner_cfg);
         rst_i <= '1';
@@ -1612,6 +1649,205 @@ begin
 
                 check_passed(result("Test TX/RX IRQ MASK: Pass."));
 
+            elsif run("Replay model RX frames") then
+                --set speed
+                wdata_v := to_std_logic_vector(data_rate_c, 32);
+                write_bus(net, axi_handle, 8, wdata_v, "0011");
+                --IRQ Mask
+                wdata_v := (others => '1');
+                write_bus(net, axi_handle, 12, wdata_v, "1100");
+                --ID filter, any ID by default.
+                wdata_v := to_std_logic_vector(id_filter, 32);
+                write_bus(net, axi_handle, 36, wdata_v, "1111");
+                wdata_v := to_std_logic_vector(id_mask, 32);
+                write_bus(net, axi_handle, 40, wdata_v, "1111");
+                wdata_v := (others => '0');
+                wdata_v(8) := '1' when promiscuous else '0';
+                write_bus(net, axi_handle, 4, wdata_v, "0010");
+
+                file_open(frames_f, output_path(runner_cfg) & "rx_frames.txt", read_mode);
+                frame_v     := 0;
+                data_n_v    := 0;
+                crc_n_v     := 0;
+                stuff_n_v   := 0;
+                drop_n_v    := 0;
+                while not endfile(frames_f) loop
+                    readline(frames_f, line_v);
+                    hread(line_v, ide_v);
+                    hread(line_v, id_v);
+                    hread(line_v, rtr_v);
+                    hread(line_v, dlc_v);
+                    hread(line_v, data_v);
+                    hread(line_v, error_v);
+                    hread(line_v, check_at_v);
+                    hread(line_v, length_v);
+                    read(line_v, bit_v); --separator
+                    set_timeout(runner, now + (to_integer(unsigned(length_v)) + idle_bits + 50) * data_period_c);
+                    --promiscuous only opens standard frames to any ID.
+                    accept_v := (promiscuous and ide_v(0) = '0') or
+                                ((id_v(28 downto 0) and to_std_logic_vector(id_mask, 29)) =
+                                 (to_std_logic_vector(id_filter, 29) and to_std_logic_vector(id_mask, 29)));
+
+                    --line status of the previous frame EOF.
+                    wdata_v := (others => '1');
+                    write_bus(net, axi_handle, 16, wdata_v, "0001");
+                    stuffed_v := false;
+
+                    for j in 0 to to_integer(unsigned(length_v)) - 1 loop
+                        start_v := now;
+                        read(line_v, bit_v);
+                        if bit_v = '0' then
+                            line_s <= '0';
+                        else
+                            line_s <= '1';
+                        end if;
+                        --right after the stuffed part of the frame.
+                        if j = to_integer(unsigned(check_at_v)) then
+                            read_bus(net, axi_handle, 16, rdata_v);
+                            stuffed_v := rdata_v(0) = '1';
+                            if error_v = x"2" then
+                                check_equal(rdata_v(0), '1', result("Frame " & to_string(frame_v) & ": stuff_violation."));
+                            else
+                                check_equal(rdata_v(0), '0', result("Frame " & to_string(frame_v) & ": stuff_violation."));
+                            end if;
+                        end if;
+                        wait for data_period_c - (now - start_v);
+                    end loop;
+                    line_s <= '1';
+
+                    --counted from the DUT flags: stuff_violation mid frame, then the RX IRQs.
+                    read_bus(net, axi_handle, 12, rdata_v);
+                    if stuffed_v then
+                        stuff_n_v := stuff_n_v + 1;
+                    elsif rdata_v(1) = '1' then
+                        crc_n_v := crc_n_v + 1;
+                    elsif rdata_v(0) = '1' then
+                        data_n_v := data_n_v + 1;
+                    else
+                        drop_n_v := drop_n_v + 1;
+                    end if;
+                    if error_v = x"0" and not accept_v then
+                        check_equal(rdata_v(0), '0', result("Frame " & to_string(frame_v) & ": RX DATA IRQ on filtered ID."));
+                        check_equal(rdata_v(1), '0', result("Frame " & to_string(frame_v) & ": RX ERROR IRQ."));
+                    elsif error_v = x"0" then
+                        check_equal(rdata_v(0), '1', result("Frame " & to_string(frame_v) & ": RX DATA IRQ."));
+                        check_equal(rdata_v(1), '0', result("Frame " & to_string(frame_v) & ": RX ERROR IRQ."));
+                        read_bus(net, axi_handle, 48, rdata_v);
+                        check_equal(rdata_v(28 downto 0), id_v(28 downto 0), result("Frame " & to_string(frame_v) & ": rx_id."));
+                        read_bus(net, axi_handle, 44, rdata_v);
+                        check_equal(rdata_v(3 downto 0), dlc_v, result("Frame " & to_string(frame_v) & ": rx_dlc."));
+                        read_bus(net, axi_handle, 32, rdata_v);
+                        check_equal(rdata_v(16), rtr_v(0), result("Frame " & to_string(frame_v) & ": rx_rtr."));
+                        check_equal(rdata_v(24), ide_v(0), result("Frame " & to_string(frame_v) & ": rx_ide."));
+                        if dlc_v /= "0000" then
+                            read_bus(net, axi_handle, 52, rdata_v);
+                            check_equal(rdata_v, data_v(31 downto 0), result("Frame " & to_string(frame_v) & ": rx_data0."));
+                            read_bus(net, axi_handle, 56, rdata_v);
+                            check_equal(rdata_v, data_v(63 downto 32), result("Frame " & to_string(frame_v) & ": rx_data1."));
+                        end if;
+                    elsif error_v = x"1" then
+                        check_equal(rdata_v(0), '0', result("Frame " & to_string(frame_v) & ": RX DATA IRQ on CRC error."));
+                        check_equal(rdata_v(1), '1', result("Frame " & to_string(frame_v) & ": rx_crc_error."));
+                    else
+                        --a stuff error leaves can_rx out of step, give it time to go idle,
+                        --then the violation must still be flagged and no frame delivered.
+                        wait for 20 * data_period_c;
+                        read_bus(net, axi_handle, 16, rdata_v);
+                        check_equal(rdata_v(0), '1', result("Frame " & to_string(frame_v) & ": stuff_violation after the frame."));
+                        read_bus(net, axi_handle, 12, rdata_v);
+                        check_equal(rdata_v(0), '0', result("Frame " & to_string(frame_v) & ": RX DATA IRQ on stuff error."));
+                    end if;
+                    wdata_v := (others => '1');
+                    write_bus(net, axi_handle, 12, wdata_v, "0011");
+                    --bus load: recessive bits until the next frame.
+                    if idle_bits > 0 then
+                        wait for idle_bits * data_period_c;
+                    end if;
+                    frame_v := frame_v + 1;
+                end loop;
+                file_close(frames_f);
+                info(to_string(frame_v) & " model frames replayed.");
+                --frames, received, crc errors, stuff errors, filtered.
+                file_open(frames_f, output_path(runner_cfg) & "rx_counters.txt", write_mode);
+                write(line_v, to_string(frame_v) & " " & to_string(data_n_v) & " " & to_string(crc_n_v) & " " &
+                              to_string(stuff_n_v) & " " & to_string(drop_n_v));
+                writeline(frames_f, line_v);
+                file_close(frames_f);
+                check_passed(result("Replay model RX frames: Pass."));
+
+            elsif run("Compare TX frames against model") then
+                --set speed
+                wdata_v := to_std_logic_vector(data_rate_c, 32);
+                write_bus(net, axi_handle, 8, wdata_v, "0011");
+                --IRQ Mask
+                wdata_v := (others => '1');
+                write_bus(net, axi_handle, 12, wdata_v, "1100");
+                --accept any ID, frames loop back to can_rx, which acknowledges them.
+                wdata_v := (others => '0');
+                write_bus(net, axi_handle, 40, wdata_v, "1111");
+                wdata_v := (8 => '1', others => '0');
+                write_bus(net, axi_handle, 4, wdata_v, "0010");
+
+                --tx_capture_p writes the line of every frame, checked by can_model.py.
+                capture_en <= true;
+                file_open(frames_f, output_path(runner_cfg) & "tx_frames.txt", read_mode);
+                frame_v := 0;
+                while not endfile(frames_f) loop
+                    readline(frames_f, line_v);
+                    hread(line_v, ide_v);
+                    hread(line_v, id_v);
+                    hread(line_v, rtr_v);
+                    hread(line_v, dlc_v);
+                    hread(line_v, data_v);
+                    set_timeout(runner, now + 400 * data_period_c);
+
+                    write_bus(net, axi_handle, 72, id_v, "1111");
+                    wdata_v := (others => '0');
+                    wdata_v(3 downto 0) := dlc_v;
+                    write_bus(net, axi_handle, 68, wdata_v, "0001");
+                    write_bus(net, axi_handle, 76, data_v(31 downto 0), "1111");
+                    write_bus(net, axi_handle, 80, data_v(63 downto 32), "1111");
+                    wdata_v := (1 => '1', 16 => rtr_v(0), 24 => ide_v(0), others => '0');
+                    write_bus(net, axi_handle, 64, wdata_v, "1111");
+
+                    wait until tx_irq_o = '1';
+                    read_bus(net, axi_handle, 12, rdata_v);
+                    check_equal(rdata_v(8), '1', result("Frame " & to_string(frame_v) & ": TX DATA IRQ."));
+                    check_equal(rdata_v(9), '0', result("Frame " & to_string(frame_v) & ": TX ERROR IRQ."));
+                    wdata_v := (others => '1');
+                    write_bus(net, axi_handle, 12, wdata_v, "0011");
+                    frame_v := frame_v + 1;
+                end loop;
+                file_close(frames_f);
+                wait for 20 * data_period_c;
+                capture_en <= false;
+                wait for data_period_c;
+                info(to_string(frame_v) & " model frames sent.");
+                check_passed(result("Compare TX frames against model: Pass."));
+
+            elsif run("Replay register stimulus") then
+                --op address data mask: op 1 writes with the mask bytes as strobes,
+                --op 0 reads and checks the mask bits.
+                file_open(regs_f, output_path(runner_cfg) & "regs.txt", read_mode);
+                while not endfile(regs_f) loop
+                    readline(regs_f, line_v);
+                    hread(line_v, op_v);
+                    hread(line_v, addr_v);
+                    hread(line_v, wdata_v);
+                    hread(line_v, mask_v);
+                    if op_v(0) = '1' then
+                        for k in strb_v'range loop
+                            strb_v(k) := or mask_v(8*k+7 downto 8*k);
+                        end loop;
+                        write_bus(net, axi_handle, to_integer(unsigned(addr_v)), wdata_v, strb_v);
+                    else
+                        read_bus(net, axi_handle, to_integer(unsigned(addr_v)), rdata_v);
+                        check_equal(rdata_v and mask_v, wdata_v and mask_v, result("Register 0x" & to_hstring(addr_v)));
+                    end if;
+                end loop;
+                file_close(regs_f);
+                check_passed(result("Replay register stimulus: Pass."));
+
             end if;
         end loop;
         test_runner_cleanup(runner); -- Simulation ends here
@@ -1627,12 +1863,41 @@ begin
     --CAN VCI PROCESS
     -- vci_p: process
     -- begin
-    rxi <= '0'   when force_line  else
-           txo_o when txo_t = '1' else
-           '1';
+    tx_line_s <= txo_o when txo_t = '1' else '1';
+    rxi       <= '0' when force_line else line_s and tx_line_s;
     --   wait;
     -- end process;
 
+    --TX line of every frame, SOF up to the 7th recessive bit in a row.
+    tx_capture_p : process
+        file     capture_f : text;
+        variable line_v    : line;
+        variable ones_v    : natural;
+    begin
+        wait until capture_en;
+        file_open(capture_f, output_path(runner_cfg) & "tx_capture.txt", write_mode);
+        while capture_en loop
+            wait until tx_line_s = '0' or not capture_en;
+            if capture_en then
+                wait for data_period_c / 2;
+                ones_v := 0;
+                while ones_v < 7 loop
+                    if tx_line_s = '1' then
+                        write(line_v, character'('1'));
+                        ones_v := ones_v + 1;
+                    else
+                        write(line_v, character'('0'));
+                        ones_v := 0;
+                    end if;
+                    wait for data_period_c;
+                end loop;
+                writeline(capture_f, line_v);
+            end if;
+        end loop;
+        file_close(capture_f);
+        wait;
+    end process;
+
     axi_master_u : entity vunit_lib.axi_lite_master
         generic map(
             bus_handle => axi_handle
@@ -0,0 +1,379 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Bit level CAN 2.0A/B model for can_aximm_top_tb, vectorized over frames.
+#
+# frames() draws random frames; line_bits() turns them into the bits on the bus:
+# SOF, arbitration and control fields, data, CRC-15, all bit stuffed, then CRC
+# delimiter, ACK slot, ACK delimiter, EOF and intermission. DLC 9 to 15 carries
+# 8 bytes. Every step runs on all frames at once, one bit position at a time.
+#
+# CanModel() follows ISO 11898-1. CanModel.core() matches can_aximm as built:
+#   - crc15 in can_aximm_pkg shifts the input in (Fibonacci form), which is not
+#     the ISO CRC-15 division.
+#   - can_tx sends SRR dominant.
+#   - RTR frames carry DLC data bytes, like data frames.
+# These are known_deviations: the TX capture is also checked against the ISO
+# model, and each frame must match ISO with the least of them applied. They are
+# expected failures; one that no frame shows any more must be removed.
+#
+# Two tests use it: "Replay model RX frames" drives line traces into can_rx
+# (with crc and stuff errors injected in some frames) and checks the register
+# view in VHDL; "Compare TX frames against model" sends frames through can_tx
+# and the captured line is compared here, after the simulation.
+#--------------------------------------------------------------------------------
+from os.path import join
+import functools
+import itertools
+
+import numpy as np
+
+from tools import hexio
+
+no_error = 0
+crc_error = 1
+stuff_error = 2
+
+iso_poly = 0x4599
+
+# can_aximm choices that differ from ISO 11898-1, see deviation_model().
+known_deviations = {
+    "crc": "crc15 shifts the input in (Fibonacci form)",
+    "srr": "SRR sent dominant",
+    "rtr_data": "RTR frames carry DLC data bytes",
+}
+
+# fixed columns of the frame files, hex digits each.
+frame_fields = ["ide", "id", "rtr", "dlc", "data"]
+frame_widths = [1, 8, 1, 1, 16]
+
+
+def bits_of(values, width):
+    # (frames, width) array, most significant bit first.
+    shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+    return ((np.asarray(values, dtype=np.uint64)[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def data_bytes(dlc, rtr, rtr_data=False):
+    size = np.minimum(dlc, 8)
+    if not rtr_data:
+        size = np.where(rtr == 1, 0, size)
+    return size
+
+
+class CanModel:
+    def __init__(self, crc="iso", srr=1, rtr_data=False):
+        if crc not in ["iso", "core"]:
+            raise ValueError("crc must be 'iso' or 'core'.")
+        self.crc = crc
+        self.srr = srr
+        self.rtr_data = rtr_data
+
+    @classmethod
+    def core(cls):
+        return cls(crc="core", srr=0, rtr_data=True)
+
+    def frames(self, count, seed=0, extended=0.5, rtr=0.1):
+        rng = np.random.default_rng(seed)
+        ide = (rng.random(count) < extended).astype(np.uint64)
+        ident = np.where(ide == 1, rng.integers(0, 2**29, count), rng.integers(0, 2**11, count))
+        frames = {
+            "ide": ide,
+            "id": ident.astype(np.uint64),
+            "rtr": (rng.random(count) < rtr).astype(np.uint64),
+            "dlc": rng.integers(0, 16, count).astype(np.uint64),
+            "data": rng.integers(0, 2**63, count, dtype=np.uint64) * np.uint64(2) + rng.integers(0, 2, count, dtype=np.uint64),
+        }
+        size = data_bytes(frames["dlc"], frames["rtr"], self.rtr_data).astype(np.uint64)
+        mask = np.where(size == 8, np.uint64(2**64 - 1), (np.uint64(1) << (size * np.uint64(8))) - np.uint64(1))
+        frames["data"] = frames["data"] & mask
+        return frames
+
+    def crc_step(self, crc, bit):
+        if self.crc == "iso":
+            nxt = bit ^ ((crc >> 14) & 1)
+            crc = (crc << 1) & 0x7FFF
+            return crc ^ (nxt * iso_poly)
+        taps = (crc >> 14) ^ (crc >> 13) ^ (crc >> 9) ^ (crc >> 7) ^ (crc >> 6) ^ (crc >> 3) ^ (crc >> 2)
+        return ((crc << 1) | ((taps ^ bit) & 1)) & 0x7FFF
+
+    def unstuffed(self, frames):
+        # SOF to CRC: (bits, lengths, crc_start) with bits (frames, max length).
+        count = len(frames["id"])
+        ide = frames["ide"] == 1
+        zero = np.zeros(count, dtype=np.uint64)
+        standard = np.hstack([
+            bits_of(zero, 1),                       # SOF
+            bits_of(frames["id"], 11),              # ID
+            bits_of(frames["rtr"], 1),              # RTR
+            bits_of(zero, 1),                       # IDE
+            bits_of(zero, 1),                       # r0
+            bits_of(frames["dlc"], 4),              # DLC
+        ])
+        extended = np.hstack([
+            bits_of(zero, 1),                       # SOF
+            bits_of(frames["id"] >> np.uint64(18), 11),  # ID_A
+            bits_of(zero + np.uint64(self.srr), 1),  # SRR
+            bits_of(zero + np.uint64(1), 1),        # IDE
+            bits_of(frames["id"], 18),              # ID_B
+            bits_of(frames["rtr"], 1),              # RTR
+            bits_of(zero, 2),                       # r1, r0
+            bits_of(frames["dlc"], 4),              # DLC
+        ])
+        header = np.where(ide, extended.shape[1], standard.shape[1])
+        size = data_bytes(frames["dlc"], frames["rtr"], self.rtr_data).astype(np.int64) * 8
+        crc_start = header + size
+        lengths = crc_start + 15
+
+        bits = np.zeros((count, int(lengths.max())), dtype=np.uint8)
+        bits[~ide, :standard.shape[1]] = standard[~ide]
+        bits[ide, :extended.shape[1]] = extended[ide]
+
+        # data bits 8n-1 downto 0 go out first, so align them to bit 63.
+        shift = (64 - size).astype(np.uint64)
+        aligned = np.where(size > 0, frames["data"] << np.minimum(shift, np.uint64(63)), np.uint64(0))
+        data = bits_of(aligned, 64)
+        rows, cols = np.nonzero(np.arange(64) < size[:, None])
+        bits[rows, header[rows] + cols] = data[rows, cols]
+
+        crc = np.zeros(count, dtype=np.int64)
+        for pos in range(int(crc_start.max())):
+            active = pos < crc_start
+            crc = np.where(active, self.crc_step(crc, bits[:, pos].astype(np.int64)), crc)
+        crc_bits = bits_of(crc.astype(np.uint64), 15)
+        rows, cols = np.nonzero(np.ones((count, 15), dtype=bool))
+        bits[rows, crc_start[rows] + cols] = crc_bits[rows, cols]
+        return bits, lengths, crc_start
+
+    def stuff(self, bits, lengths):
+        # (stuffed, lengths, stuff bit mask), a complement after 5 equal bits.
+        count = len(lengths)
+        stuffed = np.ones((count, bits.shape[1] + bits.shape[1] // 4 + 1), dtype=np.uint8)
+        is_stuff = np.zeros(stuffed.shape, dtype=bool)
+        pos = np.zeros(count, dtype=np.int64)
+        run_bit = np.full(count, 2, dtype=np.uint8)
+        run_len = np.zeros(count, dtype=np.int64)
+        rows = np.arange(count)
+        for col in range(bits.shape[1]):
+            active = col < lengths
+            bit = bits[:, col]
+            stuffed[rows[active], pos[active]] = bit[active]
+            pos = pos + active
+            run_len = np.where(active, np.where(bit == run_bit, run_len + 1, 1), run_len)
+            run_bit = np.where(active, bit, run_bit)
+            need = active & (run_len == 5)
+            stuffed[rows[need], pos[need]] = 1 - bit[need]
+            is_stuff[rows[need], pos[need]] = True
+            pos = pos + need
+            run_bit = np.where(need, 1 - bit, run_bit)
+            run_len = np.where(need, 1, run_len)
+        return stuffed, pos, is_stuff
+
+    def line_bits(self, frames, ack=0, errors=None, seed=0):
+        # list of uint8 arrays SOF to end of intermission, and the stuffed lengths.
+        # errors: per frame no_error, crc_error (one CRC bit flipped before
+        # stuffing) or stuff_error (one stuff bit flipped, six equal bits).
+        bits, lengths, crc_start = self.unstuffed(frames)
+        count = len(lengths)
+        rng = np.random.default_rng(seed)
+        if errors is None:
+            errors = np.zeros(count, dtype=np.int64)
+        rows = np.flatnonzero(errors == crc_error)
+        bits[rows, crc_start[rows] + rng.integers(0, 15, rows.size)] ^= 1
+
+        stuffed, stuffed_len, is_stuff = self.stuff(bits, lengths)
+        for row in np.flatnonzero(errors == stuff_error):
+            candidates = np.flatnonzero(is_stuff[row])
+            if candidates.size:
+                stuffed[row, rng.choice(candidates)] ^= 1
+            else:
+                errors[row] = no_error
+
+        tail = np.array([1, ack, 1] + [1] * 7 + [1] * 3, dtype=np.uint8)
+        lines = [np.concatenate([stuffed[j, :stuffed_len[j]], tail]) for j in range(count)]
+        return lines, stuffed_len
+
+    def decode(self, line):
+        # single frame from a line (SOF first). Returns (fields, problems).
+        problems = []
+        bits = []
+        run_bit, run_len, skip = 2, 0, False
+        needed = None
+        for index, bit in enumerate(int(b) for b in line):
+            if skip:
+                if bit == run_bit:
+                    problems.append("stuff violation at bit %d" % index)
+                run_bit, run_len, skip = bit, 1, False
+                if needed is not None and len(bits) == needed:
+                    break
+                continue
+            bits.append(bit)
+            run_len = run_len + 1 if bit == run_bit else 1
+            run_bit = bit
+            skip = run_len == 5
+            if needed is None and len(bits) >= 19:
+                ext = bits[13] == 1
+                if not ext or len(bits) >= 39:
+                    header = 39 if ext else 19
+                    dlc = int("".join(map(str, bits[header - 4:header])), 2)
+                    rtr = bits[32] if ext else bits[12]
+                    size = int(data_bytes(np.array([dlc]), np.array([rtr]), self.rtr_data)[0]) * 8
+                    needed = header + size + 15
+            if needed is not None and len(bits) == needed and not skip:
+                break
+        if needed is None or len(bits) < needed:
+            return None, problems + ["line ends inside the frame"]
+
+        def value(first, width):
+            return int("".join(map(str, bits[first:first + width])) or "0", 2)
+
+        ext = bits[13] == 1
+        header = 39 if ext else 19
+        fields = {
+            "ide": int(ext),
+            "id": (value(1, 11) << 18 | value(14, 18)) if ext else value(1, 11),
+            "rtr": bits[32] if ext else bits[12],
+            "dlc": value(header - 4, 4),
+        }
+        size = needed - header - 15
+        fields["data"] = value(header, size)
+        crc = 0
+        for bit in bits[:header + size]:
+            crc = int(self.crc_step(np.int64(crc), np.int64(bit)))
+        if crc != value(header + size, 15):
+            problems.append("crc 0x%04x, expected 0x%04x" % (value(header + size, 15), crc))
+        return fields, problems
+
+
+def until_idle(line):
+    # up to and including the 7th recessive bit in a row, as the testbench captures.
+    ones = 0
+    for index, bit in enumerate(line):
+        ones = ones + 1 if bit == 1 else 0
+        if ones == 7:
+            return line[:index + 1]
+    return line
+
+
+def bit_string(bits):
+    return (np.asarray(bits, dtype=np.uint8) + ord("0")).tobytes().decode()
+
+
+def write_rx_frames(path, model, frames, errors, seed=0):
+    # one line per frame: fields, error kind, stuffed length (where the
+    # testbench reads Line_Status), line length, then the line bits.
+    lines, stuffed_len = model.line_bits(frames, ack=1, errors=errors, seed=seed)
+    fixed = hexio.encode([frames[f] for f in frame_fields] + [errors, stuffed_len, [len(l) for l in lines]],
+                         frame_widths + [1, 4, 4]).decode().splitlines()
+    with open(path, "w") as f:
+        for text, line in zip(fixed, lines):
+            f.write(text + " " + bit_string(line) + "\n")
+
+
+def write_tx_frames(path, frames):
+    hexio.write(path, [frames[f] for f in frame_fields], frame_widths)
+
+
+def read_capture(path):
+    with open(path) as f:
+        return [text.strip() for text in f if text.strip()]
+
+
+def deviation_model(deviations):
+    # the ISO model with some of known_deviations applied.
+    return CanModel(crc="core" if "crc" in deviations else "iso",
+                    srr=0 if "srr" in deviations else 1,
+                    rtr_data="rtr_data" in deviations)
+
+
+def iso_deviations(captured, frames):
+    # (deviations seen, unexplained frames): per frame, the smallest set of
+    # known deviations that turns the ISO line into the captured one.
+    names = list(known_deviations)
+    subsets = [set(subset) for size in range(len(names) + 1) for subset in itertools.combinations(names, size)]
+    expected = []
+    for deviations in subsets:
+        lines, _ = deviation_model(deviations).line_bits(frames, ack=0)
+        expected.append([bit_string(until_idle(line)) for line in lines])
+    seen = set()
+    unexplained = []
+    for j, got in enumerate(captured):
+        match = next((deviations for deviations, wants in zip(subsets, expected)
+                      if j < len(wants) and wants[j] == got), None)
+        if match is None:
+            unexplained.append(j)
+        else:
+            seen = seen | match
+    return seen, unexplained
+
+
+def check_iso(path, frames):
+    seen, unexplained = iso_deviations(read_capture(path), frames)
+    errors = ["frame %d: line is not ISO 11898-1 with known deviations" % j for j in unexplained]
+    for name in sorted(set(known_deviations) - seen):
+        errors.append("known deviation '%s' (%s) no longer seen, remove it" % (name, known_deviations[name]))
+    return errors, seen
+
+
+def check_tx_capture(path, model, frames):
+    captured = read_capture(path)
+    lines, _ = model.line_bits(frames, ack=0)
+    errors = []
+    if len(captured) != len(lines):
+        errors.append("%d frames captured, %d sent" % (len(captured), len(lines)))
+    for j, (got, line) in enumerate(zip(captured, lines)):
+        want = bit_string(until_idle(line))
+        if got != want:
+            fields, problems = model.decode(np.frombuffer(got.encode(), dtype=np.uint8) - ord("0"))
+            sent = {f: int(frames[f][j]) for f in frame_fields}
+            errors.append("frame %d: line differs from bit %d, sent %s, decoded %s %s" % (
+                j, next(k for k in range(min(len(got), len(want)) + 1) if got[k:k + 1] != want[k:k + 1]),
+                sent, fields, "; ".join(problems)))
+    return errors
+
+
+rx_test = "Replay model RX frames"
+tx_test = "Compare TX frames against model"
+
+
+def rx_errors(count, seed, crc_rate=0.05, stuff_rate=0.05):
+    draw = np.random.default_rng(seed + 1).random(count)
+    return np.where(draw < crc_rate, crc_error, np.where(draw < crc_rate + stuff_rate, stuff_error, no_error))
+
+
+def pre_config(model, rx_frames, tx_frames, seed, output_path):
+    frames = model.frames(rx_frames, seed)
+    write_rx_frames(join(output_path, "rx_frames.txt"), model, frames, rx_errors(rx_frames, seed), seed)
+    write_tx_frames(join(output_path, "tx_frames.txt"), model.frames(tx_frames, seed + 2))
+    return True
+
+
+def post_check(model, tx_frames, seed, output_path):
+    path = join(output_path, "tx_capture.txt")
+    frames = model.frames(tx_frames, seed + 2)
+    errors = check_tx_capture(path, model, frames)
+    iso_errors, seen = check_iso(path, frames)
+    print("ISO 11898-1 known deviations seen: " + ", ".join(sorted(seen)))
+    errors = errors + iso_errors
+    for error in errors[:20]:
+        print(error)
+    return not errors
+
+
+def add_configs(test_tb, rx_frames=1000, tx_frames=200, seed=0):
+    model = CanModel.core()
+    prepare = functools.partial(pre_config, model, rx_frames, tx_frames, seed)
+    for name in [rx_test, tx_test]:
+        test_tb.test(name).set_pre_config(prepare)
+    test_tb.test(tx_test).set_post_check(functools.partial(post_check, model, tx_frames, seed))
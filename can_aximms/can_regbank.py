@@ -12,6 +12,10 @@
 # OR CONDITIONS OF ANY KIND, either express or implied. See the License for
 # the specific language governing permissions and limitations under the License.
 #--------------------------------------------------------------------------------
+# Register bank spec of can_aximm. Run it to update can_aximm.vhd,
+# can_aximm_pkg.vhd, can_aximm.h and can_aximm.md; nothing is written when the
+# spec did not change (see tools/regbank.py).
+#--------------------------------------------------------------------------------
 import sys
 import os
 import hdltools
@@ -186,5 +190,13 @@ can_aximm.add(20, "TX_DATA1")
 can_aximm.reg[20].add("tx_data1", "ReadWrite", 0, 32)
 can_aximm.reg[20][0].addDescription("TX Data Bytes 7 (31 downto 24) to 4 (7 downto 0).")
 
+# Registers firmware copies whole, see can_aximm_regs.h.
+blocks = {
+    "rx_frame": ("RX_DLC", "RX_DATA1"),
+    "tx_frame": ("TX_DLC", "TX_DATA1"),
+}
 
-can_aximm()
+if __name__ == "__main__":
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from tools import regbank
+    exit(regbank.main([__file__] + sys.argv[1:]))
@@ -0,0 +1,54 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# "Replay register stimulus" of can_aximm_top_tb: a register script written
+# with the generated CanAximm access class over a StimulusBackend. Field
+# updates of one register go out as a single bus write, and the testbench
+# replays the file through VUnit com and checks the read backs.
+#--------------------------------------------------------------------------------
+from os.path import join
+
+from tools import regaccess
+from can_aximms.can_aximm_regs import CanAximm
+
+test = "Replay register stimulus"
+
+
+def write_script(path):
+    with regaccess.StimulusBackend(path) as backend:
+        regs = CanAximm(backend)
+        settings = [
+            dict(sample_rate=500, promiscuous=1),
+            dict(rx_data_mask=1, rx_error_mask=1, tx_data_mask=1, tx_error_mask=1),
+            dict(id1=0x123, id1_mask=0x7FF),
+            dict(tx_id=0x1ABCDEF, tx_dlc=8, tx_data0=0x03020100, tx_data1=0x07060504),
+            dict(tx_rtr=1, tx_eff=1, tx_reserved=2),
+        ]
+        for fields in settings:
+            regs.update(**fields)
+        for fields in settings:
+            regs.check(**fields)
+        # a second update of one field must keep the others of its register.
+        regs.write("tx_data_mask", 0)
+        regs.check(rx_data_mask=1, rx_error_mask=1, tx_data_mask=0, tx_error_mask=1)
+    return backend
+
+
+def pre_config(output_path):
+    write_script(join(output_path, "regs.txt"))
+    return True
+
+
+def add_configs(test_tb):
+    test_tb.test(test).set_pre_config(pre_config)
@@ -0,0 +1,211 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Time sliced soak of "Replay model RX frames". The soak length, in frames, is
+# split into independent segments, VUnit configs soak_000, soak_001, ... that
+# run in parallel (-p). From the soak seed every segment draws its own frame
+# seed, bus load (recessive bits between frames), ID filter and CRC/stuff error
+# rates, so a segment runs again alone with the same soak arguments.
+#
+#   python can_aximms/can_soak_run.py --soak-frames 200000 --segments 32
+#
+# After the run <output path>/soak_report.json adds up the frames and error
+# counters of every segment: "expected" by the model, "counted" by the
+# testbench from what the DUT flagged for each frame, stuff_violation and the RX
+# IRQs (rx_counters.txt). A segment whose counts differ fails its post_check. Each failing segment comes with the command that reproduces it.
+#--------------------------------------------------------------------------------
+from os.path import join, isfile
+import functools
+import json
+import shlex
+
+import numpy as np
+
+from can_aximms import can_model
+
+idle_choices = [0, 3, 20, 200]
+rate_choices = [0.0, 0.01, 0.05, 0.2]
+filter_kinds = ["open", "mask", "exact"]
+id_bits = 29
+counter_names = ["frames", "received", "crc_errors", "stuff_errors", "filtered"]
+
+
+class Segment:
+    def __init__(self, index, frames, seed, idle_bits, filter_kind, id_filter, id_mask, promiscuous,
+                 crc_rate, stuff_rate):
+        self.index = index
+        self.frames = frames
+        self.seed = seed
+        self.idle_bits = idle_bits
+        self.filter_kind = filter_kind
+        self.id_filter = id_filter
+        self.id_mask = id_mask
+        self.promiscuous = promiscuous
+        self.crc_rate = crc_rate
+        self.stuff_rate = stuff_rate
+
+    @property
+    def name(self):
+        return "soak_%03d" % self.index
+
+    def generics(self):
+        return dict(id_filter=self.id_filter, id_mask=self.id_mask, promiscuous=self.promiscuous,
+                    idle_bits=self.idle_bits)
+
+    def settings(self):
+        return dict(frames=self.frames, seed=self.seed, filter=self.filter_kind, crc_rate=self.crc_rate,
+                    stuff_rate=self.stuff_rate, **self.generics())
+
+    def accepted(self, frames):
+        # can_rx: promiscuous only opens standard frames.
+        mask = np.uint64(self.id_mask)
+        match = (frames["id"] & mask) == (np.uint64(self.id_filter) & mask)
+        return match | (self.promiscuous & (frames["ide"] == 0))
+
+
+def segments(frames, count, seed=0):
+    model = can_model.CanModel.core()
+    rng = np.random.default_rng(seed)
+    sizes = np.full(count, frames // count)
+    sizes[:frames % count] += 1
+    result = []
+    for index, size in enumerate(sizes):
+        frame_seed = int(rng.integers(0, 2**31))
+        kind = filter_kinds[rng.integers(len(filter_kinds))]
+        id_filter = int(rng.integers(0, 2**id_bits))
+        if kind == "open":
+            id_mask = 0
+        elif kind == "mask":
+            # a few low bits, so standard IDs go through 1 in 2 to 1 in 16.
+            id_mask = int(np.bitwise_or.reduce(1 << rng.choice(11, rng.integers(1, 5), replace=False)))
+        else:
+            # the ID of one frame of the segment, so at least that one goes through.
+            ids = model.frames(int(size), frame_seed)["id"] if size else [0]
+            id_filter = int(ids[rng.integers(len(ids))])
+            id_mask = 2**id_bits - 1
+        result.append(Segment(
+            index=index,
+            frames=int(size),
+            seed=frame_seed,
+            idle_bits=int(rng.choice(idle_choices)),
+            filter_kind=kind,
+            id_filter=id_filter,
+            id_mask=id_mask,
+            promiscuous=bool(rng.integers(2)),
+            crc_rate=float(rng.choice(rate_choices)),
+            stuff_rate=float(rng.choice(rate_choices)),
+        ))
+    return [segment for segment in result if segment.frames]
+
+
+def pre_config(model, segment, output_path):
+    frames = model.frames(segment.frames, segment.seed)
+    errors = can_model.rx_errors(segment.frames, segment.seed, segment.crc_rate, segment.stuff_rate)
+    # frames without a stuff bit to flip go out without error, errors says so after.
+    can_model.write_rx_frames(join(output_path, "rx_frames.txt"), model, frames, errors, segment.seed)
+    good = errors == can_model.no_error
+    accepted = segment.accepted(frames)
+    expected = [segment.frames, good & accepted, errors == can_model.crc_error,
+                errors == can_model.stuff_error, good & ~accepted]
+    with open(join(output_path, "soak_expected.json"), "w") as f:
+        json.dump(dict(zip(counter_names, [int(np.sum(count)) for count in expected])), f)
+    return True
+
+
+def read_counters(output_path):
+    path = join(output_path, "rx_counters.txt")
+    if not isfile(path):
+        return None
+    with open(path) as f:
+        return dict(zip(counter_names, [int(field) for field in f.read().split()]))
+
+
+def read_expected(output_path):
+    path = join(output_path, "soak_expected.json")
+    if not isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def post_check(output_path):
+    # a segment passes only when the testbench counted what the model expects.
+    expected = read_expected(output_path)
+    counted = read_counters(output_path)
+    if counted is None:
+        print("no rx_counters.txt in %s" % output_path)
+        return False
+    for name in counter_names:
+        if counted.get(name) != expected[name]:
+            print("%s: counted %s, expected %d" % (name, counted.get(name), expected[name]))
+    return counted == expected
+
+
+def add_configs(test_tb, soak_segments):
+    model = can_model.CanModel.core()
+    test = test_tb.test(can_model.rx_test)
+    for segment in soak_segments:
+        test.add_config(name=segment.name, generics=segment.generics(),
+                        pre_config=functools.partial(pre_config, model, segment), post_check=post_check)
+
+
+def add_counts(total, counts):
+    for name in counter_names:
+        total[name] = total[name] + (counts or {}).get(name, 0)
+
+
+def report(results, soak_segments, command):
+    # command: the soak command line, as a list, without test patterns.
+    tests = results.get_report().tests
+    expected_total = dict.fromkeys(counter_names, 0)
+    counted_total = dict.fromkeys(counter_names, 0)
+    seconds = 0.0
+    rows = []
+    for segment in soak_segments:
+        suffix = ".%s.%s" % (segment.name, can_model.rx_test)
+        names = [name for name in tests if name.endswith(suffix)]
+        if not names:
+            continue
+        result = tests[names[0]]
+        expected = read_expected(result.path)
+        counted = read_counters(result.path)
+        add_counts(expected_total, expected)
+        add_counts(counted_total, counted)
+        seconds = seconds + result.time
+        row = dict(name=segment.name, status=result.status.name, seconds=round(result.time, 3),
+                   settings=segment.settings(), expected=expected, counted=counted)
+        if result.status.name != "passed":
+            row["reproduce"] = " ".join(shlex.quote(arg) for arg in command + [names[0]])
+        rows.append(row)
+    failed = [row for row in rows if row["status"] != "passed"]
+    return {
+        "segments": len(rows),
+        "passed": len(rows) - len(failed),
+        "failed": [row["name"] for row in failed],
+        "segment_seconds": round(seconds, 3),
+        "expected": expected_total,
+        "counted": counted_total,
+        "results": rows,
+    }
+
+
+def print_report(soak):
+    print("Soak: %d/%d segments passed, %.1f s of simulation" % (
+        soak["passed"], soak["segments"], soak["segment_seconds"]))
+    for name in counter_names:
+        print("  %-13s expected %9d  counted %9d" % (name, soak["expected"][name], soak["counted"][name]))
+    for row in soak["results"]:
+        if "reproduce" in row:
+            print("Failed %s %s" % (row["name"], json.dumps(row["settings"])))
+            print("  " + row["reproduce"])
@@ -0,0 +1,76 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Time sliced soak of can_aximm_top_tb, see can_soak.py. Only the soak segments
+# run unless test patterns are given; usual VUnit options still apply.
+#
+#   python can_aximms/can_soak_run.py --soak-frames 200000 --segments 32 -p 16
+#--------------------------------------------------------------------------------
+from os.path import join, dirname
+import os
+import sys
+
+try:
+    import vunit
+except:
+    print("Please, intall vunit_hdl with 'pip install vunit_hdl'")
+    print("Also, make sure to have either GHDL or Modelsim installed.")
+    exit()
+
+root = dirname(__file__)
+sys.path.append(join(root, ".."))
+from tools import cores, perf
+from tools.runner import Runner
+from can_aximms import can_soak
+
+cli = cores.cli()
+cli.parser.add_argument(
+    "--soak-frames",
+    type=int,
+    default=20000,
+    help="Model RX frames of the whole soak. Default: %(default)s"
+)
+cli.parser.add_argument(
+    "--segments",
+    type=int,
+    help="Independent segments the soak is split into. Default: one per thread (-p)."
+)
+cli.parser.add_argument(
+    "--soak-seed",
+    type=int,
+    default=0,
+    help="Seed every segment setting is drawn from. Default: %(default)s"
+)
+args = cli.parse_args()
+if args.segments is None:
+    args.segments = args.num_threads
+if args.test_patterns == "*":
+    args.test_patterns = ["*.soak_*"]
+
+vu = Runner.from_args(args=args)
+lib = cores.add_project(vu, [cores.CORES["can_aximms"]])
+segments = can_soak.segments(args.soak_frames, args.segments, args.soak_seed)
+can_soak.add_configs(lib.entity("can_aximm_top_tb"), segments)
+
+command = [sys.executable, os.path.relpath(__file__), "--soak-frames", str(args.soak_frames),
+           "--segments", str(args.segments), "--soak-seed", str(args.soak_seed)]
+
+
+def post_run(results):
+    soak = can_soak.report(results, segments, command)
+    perf.write(join(args.output_path, "soak_report.json"), soak)
+    can_soak.print_report(soak)
+
+
+vu.main(post_run=post_run)
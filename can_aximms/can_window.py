@@ -0,0 +1,65 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# can_aximm frame access over a register window (tools/regwindow.py): a
+# received frame is one copy of RX_STATUS..RX_DATA1, a frame to send is one
+# store of TX_DLC..TX_DATA1 and then TX_STATUS with tx_valid.
+#
+#   can = CanWindow.open("/dev/uio0")
+#   frame = can.rx_frame()
+#   can.send(0x123, b"\x01\x02")
+#--------------------------------------------------------------------------------
+import numpy as np
+
+from tools.regwindow import RegisterWindow, map_file
+from can_aximms import can_aximm_regs as regs
+
+rx_registers = ("rx_status", "rx_dlc", "rx_id", "rx_data0", "rx_data1")
+
+
+def field(name, word):
+    address, shift, mask, kind = regs.fields[name]
+    return (word & mask) >> shift
+
+
+class CanWindow(RegisterWindow):
+    def __init__(self, buffer, offset=0):
+        super().__init__(regs.dtype, buffer, offset)
+
+    @classmethod
+    def open(cls, path, offset=0):
+        return cls(map_file(path, regs.dtype.itemsize, offset))
+
+    def rx_frame(self):
+        # one record: rx_status, rx_dlc, rx_id, rx_data0, rx_data1.
+        return self.read(*rx_registers)
+
+    def rx_done(self):
+        self.regs["rx_status"] = 1 << regs.fields["rx_read_done"][1]
+
+    def send(self, can_id, data=b"", rtr=False, eff=False):
+        payload = np.zeros(8, dtype=np.uint8)
+        payload[:len(data)] = np.frombuffer(bytes(data), dtype=np.uint8)
+        words = payload.view("<u4")
+        self.write(tx_dlc=len(data), tx_id=can_id, tx_data0=words[0], tx_data1=words[1])
+        # tx_valid last, with the frame flags sharing its register.
+        status = 1 << regs.fields["tx_valid"][1]
+        status = status | int(rtr) << regs.fields["tx_rtr"][1] | int(eff) << regs.fields["tx_eff"][1]
+        self.regs["tx_status"] = status
+
+
+def payload(frame):
+    # data bytes of rx_frame() records, DLC 9 to 15 carry 8 bytes.
+    data = np.array([frame["rx_data0"], frame["rx_data1"]], dtype="<u4").view(np.uint8)
+    return bytes(data[:min(int(field("rx_size", frame["rx_dlc"])), 8)])
@@ -0,0 +1,69 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Full regression: every VUnit core testbench in one VUnit project. The shared
+# libraries (expert, stdblocks) are compiled only once and tests run in parallel.
+#
+#   python run_all.py                   -> all cores, one thread per CPU
+#   python run_all.py --core axis_fifo  -> only axis_fifo (and what it needs)
+#   python run_all.py -p 4 "*Sanity*"   -> usual VUnit options still apply
+#   python run_all.py --lib-cache DIR   -> reuse precompiled expert/stdblocks
+#   python run_all.py --core axis_bench --bench-update -> new throughput baseline
+#--------------------------------------------------------------------------------
+import os
+
+try:
+    import vunit
+except:
+    print("Please, intall vunit_hdl with 'pip install vunit_hdl'")
+    print("Also, make sure to have either GHDL or Modelsim installed.")
+    exit()
+
+from tools import bench, cores
+from tools.runner import Runner
+from tools.lib_cache import LibraryCache, cache_env
+
+cli = cores.cli()
+cli.parser.add_argument(
+    "--core",
+    action="append",
+    choices=sorted(cores.CORES),
+    help="Only run the given core. Can be used more than once. Default: all cores."
+)
+cli.parser.add_argument(
+    "--lib-cache",
+    default=os.environ.get(cache_env),
+    help="Directory of precompiled expert/stdblocks libraries, shared between runs. "
+         "Default: $" + cache_env + ", no cache when unset."
+)
+args = cli.parse_args()
+
+selected = [cores.CORES[name] for name in (args.core or sorted(cores.CORES))]
+
+vu = Runner.from_args(args=args)
+
+cache = None
+if args.lib_cache:
+    cache = LibraryCache(args.lib_cache, vu.get_simulator_name())
+    vu.lib_cache = cache
+cores.add_project(vu, selected, cache)
+
+
+def post_run(results):
+    if cache is not None:
+        cache.store(args.output_path)
+    bench.write_table(results, args.output_path, cores.bench_baseline(args))
+
+
+vu.main(post_run=post_run)
@@ -0,0 +1,149 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# aximm_intercon/aximm_intercon_model.py: check() on logs of an intercon that
+# serves one transaction at a time, then on the same logs corrupted on purpose.
+#--------------------------------------------------------------------------------
+from os.path import join
+
+import numpy as np
+import pytest
+
+from aximm_intercon import aximm_intercon_model
+from aximm_intercon.aximm_intercon_model import AximmInterconModel, write_op
+from tools import hexio
+
+
+def log(rows, names):
+    columns = np.array(rows, dtype=np.uint64).reshape(-1, len(names)).T
+    return dict(zip(names, columns))
+
+
+def serve(model, stim, seed=0):
+    # masters picked at random, one transaction every other cycle, so every
+    # write is done before the next transaction is queued.
+    rng = np.random.default_rng(seed)
+    memory = np.zeros(2**model.addr_size, dtype=np.int16)
+    writes = {j: [] for j in range(model.controllers_num)}
+    reads = {k: [] for k in range(len(stim))}
+    pending = [list(range(len(s["op"])))[::-1] for s in stim]
+    cycle = 0
+    while any(pending):
+        k = int(rng.choice([k for k in range(len(stim)) if pending[k]]))
+        n = pending[k].pop()
+        cycle += 2
+        address, strb, data = (int(stim[k][field][n]) for field in ("addr", "strb", "data"))
+        port, valid = model.decode([address])
+        if stim[k]["op"][n] == write_op:
+            if valid[0]:
+                for lane in range(model.data_byte_num):
+                    if strb >> lane & 1:
+                        memory[address + lane] = data >> 8 * lane & 0xFF
+                writes[int(port[0])].append((cycle, cycle + 1, address, strb, data))
+        else:
+            value = sum(int(memory[address + lane]) << 8 * lane for lane in range(model.data_byte_num))
+            reads[k].append((cycle, cycle + 1, address, value if valid[0] else 0))
+    writes = {j: log(rows, ["w_cycle", "b_cycle", "addr", "strb", "data"]) for j, rows in writes.items()}
+    reads = {k: log(rows, ["issue", "done", "addr", "data"]) for k, rows in reads.items()}
+    return memory, writes, reads
+
+
+@pytest.fixture
+def model():
+    return AximmInterconModel(data_byte_num=2)
+
+
+def word_of(model, port):
+    words = model.words()
+    return int(words[model.decode(words)[0] == port][0])
+
+
+def test_served_logs_pass(model):
+    stim = model.stimulus(300, seed=3)
+    assert model.check(stim, *serve(model, stim)) == []
+
+
+def test_wrong_read_fails(model):
+    stim = model.stimulus(300, seed=3)
+    memory, writes, reads = serve(model, stim)
+    reads[2]["data"][4] ^= np.uint64(0x100)
+    errors = model.check(stim, memory, writes, reads)
+    assert len(errors) == 1
+    assert errors[0].startswith("master 2: read @%02X = " % (reads[2]["addr"][4] + 1))
+
+
+def test_wrong_memory_fails(model):
+    stim = model.stimulus(300, seed=3)
+    memory, writes, reads = serve(model, stim)
+    address = int(writes[1]["addr"][0])
+    memory[address] ^= 1
+    assert model.check(stim, memory, writes, reads) == [
+        "peripheral 1: 1 bytes wrong, first @%02X = %02X, expected %02X from its log" % (
+            address, memory[address], memory[address] ^ 1)]
+
+
+def test_dropped_write_fails(model):
+    stim = model.stimulus(300, seed=3)
+    memory, writes, reads = serve(model, stim)
+    writes[0] = {name: column[1:] for name, column in writes[0].items()}
+    errors = model.check(stim, memory, writes, reads)
+    assert errors[0].startswith("peripheral 0: took %d writes, expected %d" % (
+        len(writes[0]["addr"]), len(writes[0]["addr"]) + 1))
+
+
+def test_writes_of_a_master_out_of_order_fail(model):
+    address = word_of(model, 0)
+    stim = [{"op": np.array([write_op, write_op], dtype=np.uint64),
+             "addr": np.array([address, address], dtype=np.uint64),
+             "strb": np.array([3, 3], dtype=np.uint64),
+             "data": np.array([0x1111, 0x2222], dtype=np.uint64)}]
+    memory, writes, reads = serve(model, stim)
+    writes[0] = log([(2, 3, address, 3, 0x2222), (4, 5, address, 3, 0x1111)],
+                    ["w_cycle", "b_cycle", "addr", "strb", "data"])
+    memory[address:address + 2] = 0x11
+    assert model.check(stim, memory, writes, reads) == [
+        "2 bytes end with a write its master overwrote later, first @%02X = 11" % address]
+
+
+def test_read_sees_either_side_of_a_write_in_its_window(model):
+    address = word_of(model, 0)
+    writes = {j: log([], ["w_cycle", "b_cycle", "addr", "strb", "data"]) for j in range(model.controllers_num)}
+    writes[0] = log([(10, 12, address, 1, 0x22)], ["w_cycle", "b_cycle", "addr", "strb", "data"])
+
+    def check(issue, done, data):
+        return model.check_reads({0: log([(issue, done, address, data)], ["issue", "done", "addr", "data"])}, writes)
+
+    assert check(11, 13, 0x00) == []
+    assert check(11, 13, 0x22) == []
+    assert check(11, 13, 0x33) == ["master 0: read @%02X = 33 in cycles 11 to 13, expected one of 00, 22" % address]
+    # queued after the B handshake: only the new value, before the W handshake: only the old one.
+    assert check(13, 15, 0x00) == ["master 0: read @%02X = 00 in cycles 13 to 15, expected one of 22" % address]
+    assert check(2, 9, 0x22) == ["master 0: read @%02X = 22 in cycles 2 to 9, expected one of 00" % address]
+
+
+def test_post_check_reads_the_testbench_files(tmp_path, model):
+    model = AximmInterconModel()
+    stim = model.stimulus(100, seed=5)
+    memory, writes, reads = serve(model, stim)
+    hexio.write(join(tmp_path, "memory.txt"), [memory.astype(np.uint64)], [2])
+    for j, columns in writes.items():
+        hexio.write(join(tmp_path, "writes_%d.txt" % j), list(columns.values()), [8, 8] + model.widths[1:])
+    for k, columns in reads.items():
+        hexio.write(join(tmp_path, "reads_%d.txt" % k), list(columns.values()),
+                    [8, 8] + model.widths[1:2] + model.widths[3:])
+    assert aximm_intercon_model.post_check(model, 100, 5, str(tmp_path))
+
+    memory[int(writes[2]["addr"][0])] ^= 1
+    hexio.write(join(tmp_path, "memory.txt"), [memory.astype(np.uint64)], [2])
+    assert not aximm_intercon_model.post_check(model, 100, 5, str(tmp_path))
@@ -0,0 +1,101 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# axis_intercon/axis_intercon_model.py: check() on dumps built from the model
+# itself, then on the same dumps corrupted on purpose.
+#--------------------------------------------------------------------------------
+from os.path import join
+
+import numpy as np
+import pytest
+
+from axis_intercon import axis_intercon_model
+from axis_intercon.axis_intercon_model import AxisInterconModel, fields
+from tools import hexio
+
+
+def concat(parts):
+    return {field: np.concatenate([part[field] for part in parts]) for field in fields}
+
+
+def dumps_of(model, stim):
+    # whole packets of every slave port, one port after the other.
+    expected = model.route(stim)
+    return [concat([expected[(j, k)] for k in range(model.peripherals_num)])
+            for j in range(model.controllers_num)]
+
+
+@pytest.fixture
+def setup():
+    model = AxisInterconModel(controllers_num=4, peripherals_num=3)
+    stim = model.stimulus(50, seed=1)
+    return model, stim, dumps_of(model, stim)
+
+
+def test_model_dumps_pass(setup):
+    model, stim, dumps = setup
+    assert model.check(stim, dumps) == []
+
+
+def test_corrupted_data_fails(setup):
+    model, stim, dumps = setup
+    dumps[1]["tdata"][5] ^= np.uint64(1)
+    assert model.check(stim, dumps) == ["m1 from s0 beat 5: tdata %x, expected %x" % (
+        dumps[1]["tdata"][5], dumps[1]["tdata"][5] ^ np.uint64(1))]
+
+
+def test_dropped_beat_fails(setup):
+    model, stim, dumps = setup
+    dumps[2] = {field: np.delete(dumps[2][field], 0) for field in fields}
+    errors = model.check(stim, dumps)
+    assert len(errors) == 1 and errors[0].startswith("m2 from s0:")
+
+
+def test_misrouted_beat_fails(setup):
+    model, stim, dumps = setup
+    dumps[0]["tdest"][3] = 1
+    assert model.check(stim, dumps)[0] == "m0 beat 3: tdest 1"
+
+
+def test_unknown_source_fails(setup):
+    model, stim, dumps = setup
+    dumps[0]["tuser"][0] = 7
+    assert any("tuser 7 is no slave port" in error for error in model.check(stim, dumps))
+
+
+def test_packet_cut_by_another_source_fails(setup):
+    model, stim, dumps = setup
+    beats = dumps[0]
+    # first beat of s1 moved to the middle of the first s0 packet that has two beats or more.
+    first = int(np.flatnonzero(beats["tuser"] == 1)[0])
+    start = 0
+    for end in np.flatnonzero(beats["tlast"]):
+        if end > start:
+            break
+        start = end + 1
+    order = np.arange(len(beats["tdata"]))
+    order = np.concatenate([order[:start + 1], [first], np.delete(order, first)[start + 1:]])
+    dumps[0] = {field: beats[field][order] for field in fields}
+    assert model.check(stim, dumps) == ["m0 beat %d: source changed inside a packet" % (start + 1)]
+    model.switch_tlast = False
+    assert model.check(stim, dumps) == []
+
+
+def test_post_check_reads_the_dump_files(tmp_path, setup):
+    model, stim, dumps = setup
+    axis_intercon_model.pre_config(model, 50, 1, str(tmp_path))
+    for j, beats in enumerate(dumps):
+        hexio.write(join(str(tmp_path), "dump_%d.txt" % j), [beats[field] for field in fields], model.widths)
+    assert axis_intercon_model.post_check(model, 50, 1, str(tmp_path))
+    assert not axis_intercon_model.post_check(model, 50, 2, str(tmp_path))
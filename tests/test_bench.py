@@ -0,0 +1,111 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/bench.py: the duty cycle arithmetic, the figures measured from traces
+# and the baseline file.
+#--------------------------------------------------------------------------------
+import json
+
+import numpy as np
+
+from tools import bench, trace
+
+generics = {"dut": "axis_reg", "valid_on": 1, "valid_period": 1, "ready_on": 3, "ready_period": 4}
+
+
+def write_traces(path, s_cycles, m_cycles):
+    for name, cycles in [("s.trace", s_cycles), ("m.trace", m_cycles)]:
+        rows = np.zeros(len(cycles), dtype=trace.beat_dtype)
+        rows["cycle"] = cycles
+        rows["tdata"] = np.arange(len(cycles))
+        rows.tofile(str(path / name))
+    return str(path)
+
+
+def source(accepted_first, ready, on, period, beats):
+    # the testbench source in front of a DUT whose s_tready is ready(edge).
+    accepted = []
+    edge = accepted_first
+    while len(accepted) < beats:
+        if ready(edge):
+            accepted.append(edge)
+            wait = next(e for e in range(edge, edge + period + 1) if e % period < on)
+            edge = wait + 1
+        else:
+            edge = edge + 1
+    return accepted
+
+
+def test_offered_follows_the_source():
+    for on, period in [(1, 1), (1, 2), (3, 4), (5, 7)]:
+        for previous in range(0, 30):
+            first_valid = next(e for e in range(previous, previous + period) if e % period < on)
+            assert bench.offered([previous, 0], on, period)[0] == first_valid + 1
+
+
+def test_measure_from_traces(tmp_path):
+    # a DUT with one cycle of latency, its s_tready low on cycle 13.
+    s_cycles = source(10, lambda edge: edge != 13, 1, 1, 6)
+    assert s_cycles == [10, 11, 12, 14, 15, 16]
+    # ready 3 of 4 (low on 15): beat 2 waits inside on 13, beat 3 cannot leave on 15.
+    output_path = write_traces(tmp_path, s_cycles, [11, 12, 14, 16, 17, 18])
+    metrics = bench.measure(output_path, generics)
+    assert metrics["valid"] == "1of1"
+    assert metrics["ready"] == "3of4"
+    assert metrics["beats"] == 6
+    assert metrics["cycles"] == 8
+    assert metrics["beats_per_cycle"] == 6 / 8
+    assert metrics["ideal"] == 0.75
+    assert metrics["latency"] == 1
+    # beat 3 was offered from cycle 13 and taken on 14.
+    assert metrics["stalls"] == 1
+    # cycle 13 only: cycle 15 has m_tready low.
+    assert metrics["bubbles"] == 1
+
+
+def test_source_starved_cycles_are_no_bubbles(tmp_path):
+    # valid 1 of 4: the DUT is empty between beats, nothing is its fault.
+    slow = dict(generics, valid_on=1, valid_period=4, ready_on=1, ready_period=1)
+    s_cycles = source(8, lambda edge: True, 1, 4, 5)
+    output_path = write_traces(tmp_path, s_cycles, [cycle + 1 for cycle in s_cycles])
+    metrics = bench.measure(output_path, slow)
+    assert metrics["stalls"] == 0
+    assert metrics["bubbles"] == 0
+
+
+def test_post_check_against_the_baseline(tmp_path):
+    output_path = write_traces(tmp_path, list(range(10, 16)), [12, 13, 14, 16, 17, 18])
+    baseline = bench.Baseline(str(tmp_path / "baseline.json"))
+    assert bench.post_check("reg", generics, baseline, output_path)
+    with open(tmp_path / bench.metrics_file) as f:
+        assert json.load(f)["config"] == "reg"
+    baseline.values["reg"] = 0.9
+    assert not bench.post_check("reg", generics, baseline, output_path)
+    baseline.values["reg"] = 6 / 7 / (1 - baseline.tolerance / 2)
+    assert bench.post_check("reg", generics, baseline, output_path)
+
+
+def test_post_check_under_the_ideal_floor(tmp_path):
+    # one beat every 4 cycles where 3 of 4 are possible.
+    output_path = write_traces(tmp_path, list(range(10, 16)), [12, 16, 20, 24, 28, 32])
+    assert not bench.post_check("reg", generics, bench.Baseline(str(tmp_path / "baseline.json")), output_path)
+
+
+def test_baseline_update_and_save(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    baseline = bench.Baseline(path)
+    baseline.update([{"config": "a", "beats_per_cycle": 0.123456, "status": "passed"},
+                     {"config": "b", "beats_per_cycle": 0.5, "status": "failed"}])
+    baseline.save()
+    assert bench.Baseline(path).values == {"a": 0.1235}
@@ -0,0 +1,116 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# can_aximms/can_model.py: CRC, bit stuffing, line decoding and the capture
+# checks, on a few hundred random frames.
+#--------------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+from can_aximms import can_model
+from can_aximms.can_model import CanModel
+
+
+def iso_crc(bits):
+    # CRC-15 as the remainder of the polynomial division of the bits, x^15 shifted.
+    remainder = 0
+    for bit in list(bits) + [0] * 15:
+        remainder = (remainder << 1) | bit
+        if remainder >> 15:
+            remainder = remainder ^ (0x8000 | can_model.iso_poly)
+    return remainder
+
+
+def capture(path, model, frames):
+    lines, _ = model.line_bits(frames, ack=0)
+    path.write_text("".join(can_model.bit_string(can_model.until_idle(line)) + "\n" for line in lines))
+    return path
+
+
+def test_iso_crc_is_the_polynomial_division():
+    model = CanModel()
+    rng = np.random.default_rng(1)
+    for length in [1, 15, 19, 83, 103]:
+        bits = rng.integers(0, 2, length).tolist()
+        crc = 0
+        for bit in bits:
+            crc = model.crc_step(crc, bit)
+        assert crc == iso_crc(bits)
+
+
+@pytest.mark.parametrize("model", [CanModel(), CanModel.core()], ids=["iso", "core"])
+def test_decode_gives_back_the_frames(model):
+    frames = model.frames(300, seed=3)
+    lines, _ = model.line_bits(frames)
+    for j, line in enumerate(lines):
+        fields, problems = model.decode(line)
+        assert problems == []
+        assert fields == {name: int(frames[name][j]) for name in can_model.frame_fields}
+
+
+def test_no_six_equal_bits_up_to_the_crc():
+    model = CanModel()
+    frames = model.frames(300, seed=4)
+    lines, stuffed_len = model.line_bits(frames)
+    for line, length in zip(lines, stuffed_len):
+        text = can_model.bit_string(line[:length])
+        assert "000000" not in text and "111111" not in text
+
+
+def test_injected_errors_are_found():
+    model = CanModel.core()
+    frames = model.frames(200, seed=5)
+    errors = can_model.rx_errors(200, seed=5, crc_rate=0.2, stuff_rate=0.2)
+    # frames without a stuff bit to flip go back to no_error.
+    lines, _ = model.line_bits(frames, errors=errors, seed=5)
+    for j, line in enumerate(lines):
+        _, problems = model.decode(line)
+        if errors[j] == can_model.no_error:
+            assert problems == []
+        elif errors[j] == can_model.crc_error:
+            assert any(problem.startswith("crc") for problem in problems)
+        else:
+            assert any(problem.startswith("stuff violation") for problem in problems)
+
+
+def test_tx_capture_of_the_model_passes(tmp_path):
+    model = CanModel.core()
+    frames = model.frames(100, seed=6)
+    path = capture(tmp_path / "tx_capture.txt", model, frames)
+    assert can_model.read_capture(path)[0].startswith("0")
+    assert can_model.check_tx_capture(path, model, frames) == []
+    errors, seen = can_model.check_iso(path, frames)
+    assert errors == []
+    assert seen == set(can_model.known_deviations)
+
+
+def test_tx_capture_reports_the_first_bad_bit(tmp_path):
+    model = CanModel.core()
+    frames = model.frames(10, seed=7)
+    path = capture(tmp_path / "tx_capture.txt", model, frames)
+    lines = path.read_text().splitlines()
+    lines[2] = lines[2][:20] + ("1" if lines[2][20] == "0" else "0") + lines[2][21:]
+    path.write_text("\n".join(lines[:-1]) + "\n")
+    errors = can_model.check_tx_capture(path, model, frames)
+    assert errors[0] == "9 frames captured, 10 sent"
+    assert errors[1].startswith("frame 2: line differs from bit 20,")
+
+
+def test_iso_capture_flags_deviations_gone(tmp_path):
+    model = CanModel()
+    frames = model.frames(50, seed=8)
+    path = capture(tmp_path / "tx_capture.txt", model, frames)
+    errors, seen = can_model.check_iso(path, frames)
+    assert seen == set()
+    assert len(errors) == len(can_model.known_deviations)
@@ -0,0 +1,47 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# can_aximms/can_soak.py: segment draws, expected counters and the check of
+# the counters the testbench writes.
+#--------------------------------------------------------------------------------
+import json
+
+from can_aximms import can_model, can_soak
+
+
+def test_segments_share_out_the_frames():
+    soak = can_soak.segments(1003, 8, seed=1)
+    assert sum(segment.frames for segment in soak) == 1003
+    assert [segment.name for segment in soak] == ["soak_%03d" % j for j in range(8)]
+    again = can_soak.segments(1003, 8, seed=1)
+    assert [segment.settings() for segment in soak] == [segment.settings() for segment in again]
+
+
+def test_expected_counters_add_up(tmp_path):
+    segment = can_soak.segments(400, 1, seed=2)[0]
+    can_soak.pre_config(can_model.CanModel.core(), segment, str(tmp_path))
+    expected = can_soak.read_expected(str(tmp_path))
+    assert expected["frames"] == 400
+    assert sum(expected[name] for name in can_soak.counter_names[1:]) == 400
+
+
+def test_post_check_compares_the_counters(tmp_path):
+    output_path = str(tmp_path)
+    (tmp_path / "soak_expected.json").write_text(json.dumps(
+        {"frames": 10, "received": 6, "crc_errors": 1, "stuff_errors": 1, "filtered": 2}))
+    assert not can_soak.post_check(output_path)
+    (tmp_path / "rx_counters.txt").write_text("10 6 1 1 2\n")
+    assert can_soak.post_check(output_path)
+    (tmp_path / "rx_counters.txt").write_text("10 7 0 1 2\n")
+    assert not can_soak.post_check(output_path)
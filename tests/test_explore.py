@@ -0,0 +1,88 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/explore.py: sampling, the stall monitor files and coverage bins.
+#--------------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+from tools import explore
+from tools.explore import Coverage, Coverpoint, Exploration, Run, Space
+
+
+def space():
+    return Space({"ports": [2, 4, 8], "stall": [0, 50]}).require(lambda g: g["ports"] != 8 or g["stall"] == 0)
+
+
+def test_sample_meets_the_requirements():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        generics = space().sample(rng)
+        assert generics["ports"] != 8 or generics["stall"] == 0
+        assert 1 <= generics["seed"] < 2**31 - 1
+        assert all(type(value) is int for value in generics.values())
+    with pytest.raises(ValueError):
+        Space({"ports": [2]}).require(lambda g: False).sample(rng)
+
+
+def test_sample_never_repeats_a_config():
+    exploration = Exploration(space(), Coverage({}))
+    seen = set()
+    rng = np.random.default_rng(1)
+    first = exploration.sample(rng, 20, seen)
+    second = exploration.sample(rng, 20, seen)
+    assert not set(first) & set(second)
+    assert all(name.startswith(explore.config_prefix) for name in first)
+
+
+def test_read_monitors(tmp_path):
+    (tmp_path / "s0.stall").write_text("100 3 10\n")
+    (tmp_path / "m0.stall").write_text("60 7 6\n")
+    (tmp_path / "m1.stall").write_text("40 0 4\n")
+    run = Run({"ports": 2}, explore.read_monitors(str(tmp_path)))
+    assert run.beats("m") == 100
+    assert run.stalls("m") == 7
+    assert run.lasts("s") == 10
+
+
+def test_post_check_records_the_base_check(tmp_path):
+    output_path = tmp_path / "test_output" / "lib.tb.explore"
+    output_path.mkdir(parents=True)
+    (output_path / "m0.stall").write_text("60 7 6\n")
+    assert explore.post_check("t", {"ports": 2}, None, str(output_path))
+    assert explore.records(str(tmp_path), "t")[0]["passed"]
+    assert not explore.post_check("t", {"ports": 2}, lambda output_path: False, str(output_path))
+    assert explore.records(str(tmp_path), "t") == [
+        {"token": "t", "generics": {"ports": 2}, "monitors": {"m0": [60, 7, 6]}, "passed": False}]
+    assert explore.records(str(tmp_path), "other") == []
+
+
+def test_coverage_bins():
+    coverage = Coverage({
+        "ports": Coverpoint(lambda run: run.generics["ports"], [2, 4]),
+        "stalled": Coverpoint(lambda run: run.stalls("m") > 0, [False, True]),
+    })
+    assert coverage.hit(Run({"ports": 2}, {"m0": [10, 0, 1]})) == 2
+    assert coverage.hit(Run({"ports": 2}, {"m0": [10, 0, 1]})) == 0
+    assert not coverage.complete()
+    assert coverage.lines() == ["  ports: 2: 2; missing 4", "  stalled: False: 2; missing True"]
+    assert coverage.hit(Run({"ports": 4}, {"m0": [10, 3, 1]})) == 2
+    assert coverage.complete()
+    assert coverage.summary() == {"ports": {"2": 2, "4": 1}, "stalled": {"False": 2, "True": 1}}
+
+
+def test_open_bins_never_complete():
+    coverage = Coverage({"ports": Coverpoint(lambda run: run.generics["ports"])})
+    coverage.hit(Run({"ports": 2}, {}))
+    assert not coverage.complete()
@@ -0,0 +1,119 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/ghdl.py: which testbench generics are structural, the elaboration key
+# and the generics passed to ghdl -e and to the executable.
+#--------------------------------------------------------------------------------
+from types import SimpleNamespace
+import threading
+
+import pytest
+
+from tools import ghdl
+from tools.ghdl import GHDL, structural_generics
+
+tb_source = """
+entity some_tb is
+  generic (runner_cfg : string; WIDTH : natural; depth : natural; use_fifo : boolean;
+           run_time : natural; seed : natural);
+end entity;
+
+architecture sim of some_tb is
+  signal data : std_logic_vector(width - 1 downto 0);
+  -- signal unused : std_logic_vector(run_time downto 0);
+begin
+  dut_u : entity work.dut generic map (DEPTH => depth) port map (data => data);
+  fifo_gen : if use_fifo generate
+  end generate;
+  main : process
+  begin
+    wait for run_time * 1 ns;
+    report integer'image(seed);
+  end process;
+end architecture;
+"""
+
+generic_names = ["runner_cfg", "WIDTH", "depth", "use_fifo", "run_time", "seed"]
+
+
+@pytest.fixture
+def tb_file(tmp_path):
+    path = tmp_path / "some_tb.vhd"
+    path.write_text(tb_source)
+    return str(path)
+
+
+@pytest.fixture
+def simulator(tb_file):
+    # only what structural() and elab_key() use of a GHDLInterface.
+    entity = SimpleNamespace(name="some_tb", generic_names=generic_names, source_file=SimpleNamespace(name=tb_file))
+    library = SimpleNamespace(get_entities=lambda: [entity])
+    sim = GHDL.__new__(GHDL)
+    sim._project = SimpleNamespace(get_library=lambda name: library)
+    sim._structural = {}
+    sim._built = {}
+    sim._lock = threading.Lock()
+    sim.elaborations = 0
+    sim.reused = 0
+    return sim
+
+
+def config(entity="some_tb", elab_flags=(), **generics):
+    values = {"runner_cfg": "cfg", "WIDTH": 8, "depth": 16, "use_fifo": True, "run_time": 100, "seed": 1}
+    values.update(generics)
+    return SimpleNamespace(library_name="lib", entity_name=entity, architecture_name="sim", generics=values,
+                           sim_options={"ghdl.elab_flags": list(elab_flags)})
+
+
+def test_structural_generics(tb_file):
+    assert structural_generics(tb_file, generic_names) == ["WIDTH", "depth", "use_fifo"]
+
+
+def test_unknown_top_counts_every_generic_but_runner_cfg(simulator):
+    assert simulator.structural(config(entity="other_tb")) == ["WIDTH", "depth", "use_fifo", "run_time", "seed"]
+
+
+def test_elab_key_follows_structural_generics_only(simulator):
+    key = simulator.elab_key(config())
+    assert key.startswith("some_tb-")
+    assert simulator.elab_key(config(run_time=5, seed=9, runner_cfg="other")) == key
+    assert simulator.elab_key(config(WIDTH=16)) != key
+    assert simulator.elab_key(config(use_fifo=False)) != key
+    assert simulator.elab_key(config(elab_flags=["-O2"])) != key
+    assert simulator.elab_key(config(), SimpleNamespace(name="fast")) == "fast/" + key
+
+
+def test_generics_split_between_elaboration_and_run(simulator):
+    cfg = config()
+    assert simulator.elab_generics(cfg) == ["-gWIDTH=8", "-gdepth=16", "-guse_fifo=True"]
+    assert simulator.run_generics(cfg) == {"runner_cfg": "cfg", "run_time": 100, "seed": 1}
+    assert simulator.sim_flags(SimpleNamespace(sim_options={}, vhdl_assert_stop_level="error"),
+                               simulator.run_generics(cfg))[:3] == ["-grunner_cfg=cfg", "-grun_time=100", "-gseed=1"]
+
+
+def test_structural_generics_are_elaborated_in_once(simulator, monkeypatch):
+    runs = []
+
+    def run(cmd):
+        runs.append(cmd)
+        return SimpleNamespace(passed=True, seconds=1.0)
+
+    monkeypatch.setattr(ghdl, "Run", run)
+    simulator._output_path = "out"
+    simulator.command = lambda cfg, path, *args: ["ghdl", "-e", "--work=lib", cfg.entity_name, cfg.architecture_name]
+    binary, seconds = simulator.elaborated(config())
+    assert runs == [["ghdl", "-e", "--work=lib", "-gWIDTH=8", "-gdepth=16", "-guse_fifo=True", "some_tb", "sim"]]
+    assert binary.endswith("some_tb-sim") and seconds == 1.0
+    assert simulator.elaborated(config(seed=2)) == (binary, 0.0)
+    assert len(runs) == 1 and (simulator.elaborations, simulator.reused) == (1, 1)
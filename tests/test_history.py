@@ -0,0 +1,56 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/history.py: recorded durations and the longest first order.
+#--------------------------------------------------------------------------------
+import json
+from types import SimpleNamespace
+
+from tools.history import History
+
+
+def suite(*names):
+    return SimpleNamespace(test_names=list(names))
+
+
+def report(**tests):
+    # the part of vunit.ui.results.Report that History reads.
+    return SimpleNamespace(tests={name: SimpleNamespace(status=SimpleNamespace(name=status), time=time)
+                                  for name, (status, time) in tests.items()})
+
+
+def test_unknown_tests_cost_the_longest_known(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text(json.dumps({"a": 1.0, "b": 4.0}))
+    history = History(str(path))
+    assert history.duration("a") == 1.0
+    assert history.cost(["a", "b", "new"]) == 9.0
+    assert History.empty().cost(["a", "b"]) == 0.0
+
+
+def test_order_is_longest_first_and_stable(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text(json.dumps({"a": 1.0, "b": 4.0, "c": 1.0}))
+    suites = [suite("a"), suite("c"), suite("b"), suite("a", "c")]
+    History(str(path)).order(suites)
+    assert [s.test_names for s in suites] == [["b"], ["a", "c"], ["a"], ["c"]]
+
+
+def test_record_and_save(tmp_path):
+    path = tmp_path / "out" / "history.json"
+    history = History(str(path))
+    history.record(report(a=("passed", 1.23456), b=("failed", 2.0), c=("skipped", 3.0)))
+    history.save()
+    assert json.loads(path.read_text()) == {"a": 1.235, "b": 2.0}
+    assert History(str(path)).tests == {"a": 1.235, "b": 2.0}
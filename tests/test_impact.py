@@ -0,0 +1,80 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/impact.py: testbenches selected by a list of changed files, over a
+# stand-in for the VUnit dependency graph.
+#--------------------------------------------------------------------------------
+from os.path import dirname
+from types import SimpleNamespace
+
+import pytest
+
+from tools.impact import affected_testbenches
+
+
+class VUnit:
+    # {testbench file: files in its compile order}
+    def __init__(self, orders):
+        self.orders = orders
+
+    def get_source_files(self, pattern):
+        return [SimpleNamespace(name=name, library=SimpleNamespace(name="stdcores")) for name in self.orders]
+
+    def get_compile_order(self, source_files):
+        return [SimpleNamespace(name=name) for name in self.orders[source_files[0].name]]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    paths = {}
+    for name in ["axis_mux/axis_mux.vhd", "axis_mux/axis_mux_tb.vhd", "axis_mux/axis_mux_model.py",
+                 "axis_intercon/axis_intercon_tb.vhd", "axis_intercon/stimulus.txt",
+                 "tools/trace.py", "requirements.txt", "can_aximms/can_aximm_regs.h"]:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("")
+        paths[name] = str(path)
+    vu = VUnit({
+        paths["axis_mux/axis_mux_tb.vhd"]: [paths["axis_mux/axis_mux.vhd"], paths["axis_mux/axis_mux_tb.vhd"]],
+        paths["axis_intercon/axis_intercon_tb.vhd"]: [paths["axis_mux/axis_mux.vhd"],
+                                                      paths["axis_intercon/axis_intercon_tb.vhd"]],
+    })
+    return vu, paths
+
+
+def test_vhdl_changes_follow_the_dependencies(tree):
+    vu, paths = tree
+    assert affected_testbenches(vu, [paths["axis_mux/axis_mux.vhd"]]) == \
+        {"stdcores.axis_mux_tb", "stdcores.axis_intercon_tb"}
+    assert affected_testbenches(vu, [paths["axis_intercon/axis_intercon_tb.vhd"]]) == \
+        {"stdcores.axis_intercon_tb"}
+
+
+def test_python_changes(tree):
+    vu, paths = tree
+    assert affected_testbenches(vu, [paths["axis_mux/axis_mux_model.py"]]) == {"stdcores.axis_mux_tb"}
+    assert affected_testbenches(vu, [paths["tools/trace.py"]]) is None
+
+
+@pytest.mark.parametrize("name", ["axis_intercon/stimulus.txt", "requirements.txt", "can_aximms/can_aximm_regs.h"])
+def test_other_files_run_everything(tree, name):
+    vu, paths = tree
+    assert affected_testbenches(vu, [paths[name]]) is None
+    assert affected_testbenches(vu, [paths["axis_mux/axis_mux.vhd"], paths[name]]) is None
+
+
+def test_directories_count_as_their_files(tree):
+    vu, paths = tree
+    assert affected_testbenches(vu, [dirname(paths["axis_mux/axis_mux.vhd"])]) == \
+        {"stdcores.axis_mux_tb", "stdcores.axis_intercon_tb"}
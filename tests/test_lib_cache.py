@@ -0,0 +1,113 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/lib_cache.py: keys, a miss stored after the run and the hit of the
+# next run, with a stand-in for the VUnit object.
+#--------------------------------------------------------------------------------
+from os.path import join, isfile
+
+import pytest
+
+from tools import lib_cache
+from tools.lib_cache import LibraryCache
+
+
+class Library:
+    def __init__(self):
+        self.files = []
+
+    def add_source_files(self, files):
+        self.files = self.files + list(files)
+
+
+class VUnit:
+    def __init__(self):
+        self.libraries = {}
+        self.external = {}
+
+    def add_library(self, name):
+        self.libraries[name] = Library()
+        return self.libraries[name]
+
+    def add_external_library(self, name, path):
+        self.external[name] = path
+
+
+@pytest.fixture
+def sources(tmp_path):
+    files = {}
+    for name in ["expert_a.vhd", "stdblocks_a.vhd"]:
+        files[name] = tmp_path / "src" / name
+        files[name].parent.mkdir(exist_ok=True)
+        files[name].write_text("-- %s\n" % name)
+    return files
+
+
+def compile_and_store(cache, sources, output_path):
+    vu = VUnit()
+    expert = cache.add_library(vu, "expert", [str(sources["expert_a.vhd"])])
+    stdblocks = cache.add_library(vu, "stdblocks", [str(sources["stdblocks_a.vhd"])], depends=["expert"])
+    for name, lib in [("expert", expert), ("stdblocks", stdblocks)]:
+        if lib is not None:
+            compiled = output_path / "ghdl" / "libraries" / name
+            compiled.mkdir(parents=True, exist_ok=True)
+            (compiled / (name + ".cf")).write_text("compiled")
+    cache.store(str(output_path))
+    return vu
+
+
+def test_miss_then_hit(tmp_path, sources):
+    cache_path = str(tmp_path / "cache")
+    first = LibraryCache(cache_path, "ghdl")
+    vu = compile_and_store(first, sources, tmp_path / "out1")
+    assert first.hits == []
+    assert sorted(vu.libraries) == ["expert", "stdblocks"]
+    assert isfile(join(first.entry("stdblocks"), lib_cache.done_marker))
+
+    second = LibraryCache(cache_path, "ghdl")
+    vu = compile_and_store(second, sources, tmp_path / "out2")
+    assert second.hits == ["expert", "stdblocks"]
+    assert vu.libraries == {}
+    assert vu.external["expert"] == join(second.entry("expert"), "lib")
+    assert isfile(join(vu.external["expert"], "expert.cf"))
+    assert second.sources == {"expert": [str(sources["expert_a.vhd"])],
+                              "stdblocks": [str(sources["stdblocks_a.vhd"])]}
+
+
+def test_dependency_change_misses_dependents(tmp_path, sources):
+    cache_path = str(tmp_path / "cache")
+    compile_and_store(LibraryCache(cache_path, "ghdl"), sources, tmp_path / "out1")
+    sources["expert_a.vhd"].write_text("-- changed\n")
+    cache = LibraryCache(cache_path, "ghdl")
+    compile_and_store(cache, sources, tmp_path / "out2")
+    assert cache.hits == []
+
+
+def test_key_follows_flags_and_simulator(sources):
+    files = [str(sources["expert_a.vhd"])]
+    keys = [LibraryCache("cache", simulator, flags).key("expert", files)
+            for simulator, flags in [("ghdl", ()), ("ghdl", ("-O2",)), ("nvc", ())]]
+    assert len(set(keys)) == 3
+    assert LibraryCache("cache", "ghdl").key("expert", files) == keys[0]
+
+
+def test_interrupted_store_is_not_a_hit(tmp_path, sources):
+    cache = LibraryCache(str(tmp_path / "cache"), "ghdl")
+    vu = VUnit()
+    cache.add_library(vu, "expert", [str(sources["expert_a.vhd"])])
+    # compiled nothing: the store leaves no entry and the next run misses again.
+    cache.store(str(tmp_path / "out"))
+    again = LibraryCache(str(tmp_path / "cache"), "ghdl")
+    again.add_library(VUnit(), "expert", [str(sources["expert_a.vhd"])])
+    assert again.hits == []
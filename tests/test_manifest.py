@@ -0,0 +1,69 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/manifest.py: the file closure of a testbench over a small made up
+# source tree, across libraries.
+#--------------------------------------------------------------------------------
+from tools.manifest import Manifest
+
+
+def vhd(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_closure_keeps_only_what_the_top_needs(tmp_path):
+    util = vhd(tmp_path, "util_pkg.vhd", "package util_pkg is\nend package;\n")
+    util_body = vhd(tmp_path, "util_pkg_body.vhd", "package body util_pkg is\nend package body;\n")
+    unused = vhd(tmp_path, "unused.vhd", "entity unused is\nend entity;\n")
+    ram = vhd(tmp_path, "ram.vhd",
+              "library expert;\nuse expert.util_pkg.all;\nentity ram is\nend entity;\n")
+    ram_rtl = vhd(tmp_path, "ram_rtl.vhd", "architecture rtl of ram is\nbegin\nend rtl;\n")
+    core = vhd(tmp_path, "core.vhd",
+               "library ieee;\nuse ieee.std_logic_1164.all;\nentity core is\nend entity;\n"
+               "architecture rtl of core is\nbegin\n  ram_u : ram port map (a => b);\nend rtl;\n")
+    model = vhd(tmp_path, "model.vhd", "entity model is\nend entity;\n")
+    tb = vhd(tmp_path, "core_tb.vhd",
+             "-- model_u : entity work.model port map is only a comment.\n"
+             "entity core_tb is\nend entity;\narchitecture sim of core_tb is\nbegin\n"
+             "  dut_u : entity work.core;\nend sim;\n")
+    manifest = Manifest({
+        "expert": [util, util_body, unused],
+        "stdblocks": [ram, ram_rtl],
+        "stdcores": [core, model, tb],
+    })
+    assert manifest.closure([tb]) == {
+        "expert": [util, util_body],
+        "stdblocks": [ram, ram_rtl],
+        "stdcores": [core, tb],
+    }
+
+
+def test_own_library_first(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    fifo_a = vhd(tmp_path, "a/fifo.vhd", "entity fifo is\nend entity;\n")
+    fifo_b = vhd(tmp_path, "b/fifo.vhd", "entity fifo is\nend entity;\n")
+    top = vhd(tmp_path, "b/top.vhd",
+              "entity top is\nend entity;\narchitecture rtl of top is\nbegin\n"
+              "  fifo_u : fifo generic map (n => 1);\nend rtl;\n")
+    manifest = Manifest({"a": [fifo_a], "b": [fifo_b, top]})
+    assert manifest.closure([top]) == {"b": [fifo_b, top]}
+
+
+def test_unknown_files_are_ignored(tmp_path):
+    top = vhd(tmp_path, "top.vhd", "library missing;\nuse missing.pkg.all;\nentity top is\nend entity;\n")
+    manifest = Manifest({"stdcores": [top]})
+    assert manifest.closure([top, str(tmp_path / "other.vhd")]) == {"stdcores": [top]}
@@ -0,0 +1,82 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/memimage.py: image files in both formats, and the check of a dump the
+# way "Backdoor Preload and Dump" leaves it.
+#--------------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+from tools import memimage
+
+
+@pytest.mark.parametrize("name", ["image.bin", "image.hex"])
+@pytest.mark.parametrize("width", [8, 12, 32, 64])
+def test_write_then_read(tmp_path, name, width):
+    path = str(tmp_path / name)
+    words = memimage.random_image(100, width, seed=width)
+    memimage.write(path, words, width)
+    assert np.array_equal(memimage.read(path, width), words)
+
+
+def test_binary_layout(tmp_path):
+    path = tmp_path / "image.bin"
+    memimage.write(str(path), [0x0ABC, 0x0123], 12)
+    assert path.read_bytes() == b"\xBC\x0A\x23\x01"
+    (tmp_path / "short.bin").write_bytes(b"\x00\x01\x02")
+    with pytest.raises(ValueError):
+        memimage.read(str(tmp_path / "short.bin"), 12)
+
+
+def test_tested_words_are_the_testbench_ones():
+    # TESTED_WORDS = 4, TESTED_STEP = 2**ADDR_WIDTH / 4.
+    image = memimage.random_image(64, 32, seed=1)
+    tested = memimage.tested_words(image, 32)
+    assert sorted(tested) == [0, 16, 32, 48]
+    assert all(tested[address] == ~int(image[address]) & 0xFFFFFFFF for address in tested)
+
+
+def dump_of(output_path, size, width, seed):
+    # the RAM at the end of the test: the image with the tested words inverted.
+    image = memimage.random_image(size, width, seed)
+    ram = image.copy()
+    for address, word in memimage.tested_words(image, width).items():
+        ram[address] = word
+    memimage.write(str(output_path / memimage.dump_name), ram, width)
+    return ram
+
+
+def test_post_check(tmp_path):
+    memimage.pre_config(64, 32, 3, str(tmp_path))
+    assert np.array_equal(memimage.read(str(tmp_path / memimage.image_name), 32),
+                          memimage.random_image(64, 32, 3))
+    dump_of(tmp_path, 64, 32, 3)
+    assert memimage.post_check(64, 32, 3, str(tmp_path))
+
+
+def test_post_check_finds_every_bad_word(tmp_path):
+    ram = dump_of(tmp_path, 64, 32, 3)
+    ram[[5, 16, 63]] ^= np.uint64(1)
+    memimage.write(str(tmp_path / memimage.dump_name), ram, 32)
+    image = memimage.random_image(64, 32, 3)
+    diff = memimage.compare(str(tmp_path / memimage.dump_name), image, 32, memimage.tested_words(image, 32))
+    assert diff.address.tolist() == [5, 16, 63]
+    assert next(diff.lines()) == "3 of 64 words differ"
+    assert not memimage.post_check(64, 32, 3, str(tmp_path))
+
+
+def test_short_dump(tmp_path):
+    memimage.write(str(tmp_path / memimage.dump_name), np.zeros(10, dtype=np.uint64), 32)
+    with pytest.raises(ValueError):
+        memimage.post_check(64, 32, 3, str(tmp_path))
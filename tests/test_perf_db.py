@@ -0,0 +1,78 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/perf_db.py on a temporary database: runs, the rolling baseline and the
+# clock period parser.
+#--------------------------------------------------------------------------------
+import pytest
+
+from tools import perf_db
+from tools.perf_db import PerfDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = PerfDB(str(tmp_path / "perf.db"))
+    yield db
+    db.close()
+
+
+def perf(**tests):
+    return {"tests": {name: dict(status="passed", profile="debug", **stats) for name, stats in tests.items()}}
+
+
+def add_runs(db, walls, name="lib.tb.test", simulator="ghdl", **stats):
+    return [db.add_run(perf(**{name: dict(wall=wall, **stats)}), simulator, commit=("abc", False))
+            for wall in walls]
+
+
+def test_regression_over_the_median(db):
+    runs = add_runs(db, [10.0, 11.0, 9.0, 100.0, 10.0, 13.0])
+    assert db.last_run() == runs[-1]
+    # median of the 5 before is 10.
+    assert db.regressions(runs[-1], threshold=0.25) == [("lib.tb.test", 13.0, 10.0, 1.3)]
+    assert db.regressions(runs[-1], threshold=0.5) == []
+    assert db.regressions(runs[-1], window=2) == []
+    run_id, commit_id, dirty, _, simulator, _, tests = db.runs(limit=1)[0]
+    assert (run_id, commit_id, dirty, simulator, tests) == (runs[-1], "abc", 0, "ghdl", 1)
+
+
+def test_baseline_needs_the_same_simulator_and_profile(db):
+    add_runs(db, [10.0, 10.0], simulator="nvc")
+    run_id = add_runs(db, [20.0])[0]
+    assert db.regressions(run_id) == []
+    with pytest.raises(ValueError):
+        db.regressions(run_id + 1)
+
+
+def test_cycles_per_second_cost_more_when_lower(db):
+    periods = {"tb": 10.0}
+    for rate in [1000.0, 1000.0, 500.0]:
+        run_id = db.add_run(perf(**{"lib.tb.test": {"sim_ns_per_second": rate}}), "ghdl", periods, ("abc", False))
+    assert db.regressions(run_id, metric="cycles") == [("lib.tb.test", 50.0, 100.0, 2.0)]
+
+
+def test_failed_tests_are_not_baselines(db):
+    db.add_run({"tests": {"lib.tb.test": {"status": "failed", "wall": 1.0}}}, "ghdl", commit=("abc", True))
+    run_id = add_runs(db, [10.0])[0]
+    assert db.regressions(run_id) == []
+
+
+def test_clock_period(tmp_path):
+    path = tmp_path / "tb.vhd"
+    path.write_text("  clk_i <= not clk_i after 2.5 ns;\n")
+    assert perf_db.clock_period_ns(str(path)) == 5.0
+    path.write_text("  clk_i <= '0';\n")
+    assert perf_db.clock_period_ns(str(path)) is None
+    assert perf_db.testbench("lib.tb_name.test name") == "tb_name"
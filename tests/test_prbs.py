@@ -0,0 +1,136 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/prbs.py against a plain bit by bit LFSR, written the way
+# verification_ip shifts it.
+#--------------------------------------------------------------------------------
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from tools import prbs
+
+
+class Lfsr:
+    # prbs(1) .. prbs(n) as reg[0] .. reg[n-1].
+    def __init__(self, order, seed=None):
+        self.order = order
+        self.tap = prbs.taps[order]
+        seed = (1 << order) - 1 if seed is None else seed
+        self.reg = [(seed >> i) & 1 for i in range(order)]
+
+    def step(self):
+        # prbs := prbs(n-1 downto 1) & (prbs(n) xor prbs(tap)); bit out = prbs(n).
+        new = self.reg[self.order - 1] ^ self.reg[self.tap - 1]
+        self.reg = [new] + self.reg[:-1]
+        return self.reg[self.order - 1]
+
+    @property
+    def value(self):
+        return sum(bit << i for i, bit in enumerate(self.reg))
+
+
+def naive_bits(order, count, seed=None):
+    lfsr = Lfsr(order, seed)
+    return [lfsr.step() for _ in range(count)]
+
+
+@pytest.mark.parametrize("order", sorted(prbs.taps))
+@pytest.mark.parametrize("seed", [None, 1, 0x5A])
+def test_bits_match_the_lfsr(order, seed):
+    count = 4 * order + 3000
+    assert prbs.Prbs(order, seed).bits(count).tolist() == naive_bits(order, count, seed)
+
+
+def test_long_blocks_match_the_lfsr():
+    # long enough for the squared polynomial blocks to be used.
+    count = 1 << 16
+    assert prbs.Prbs(7).bits(count).tolist() == naive_bits(7, count)
+    assert prbs.Prbs(23).bits(count).tolist() == naive_bits(23, count)
+
+
+def test_bits_in_pieces_are_one_sequence():
+    generator = prbs.Prbs(15)
+    pieces = [generator.bits(size) for size in [1, 5, 14, 100, 1000, 7]]
+    assert np.concatenate(pieces).tolist() == naive_bits(15, 1127)
+    streamed = np.concatenate(list(prbs.Prbs(15).stream(1127, chunk=100)))
+    assert streamed.tolist() == naive_bits(15, 1127)
+
+
+def test_bad_order_and_seed():
+    with pytest.raises(ValueError):
+        prbs.Prbs(9)
+    with pytest.raises(ValueError):
+        prbs.Prbs(7, 0)
+    with pytest.raises(ValueError):
+        prbs.Prbs(7, 1 << 7)
+
+
+@pytest.mark.parametrize("width", [8, 32, 64, 72])
+def test_words_first_bit_in_msb(width):
+    bits = naive_bits(23, 3 * width)
+    words = prbs.Prbs(23).words(3, width)
+    for j in range(3):
+        value = int("".join(str(bit) for bit in bits[j * width:(j + 1) * width]), 2)
+        if width > 64:
+            assert int.from_bytes(words[j].tobytes(), "big") == value
+        else:
+            assert int(words[j]) == value
+
+
+def test_tdata_is_the_first_bits():
+    bits = naive_bits(23, 32)
+    assert prbs.tdata(32) == int("".join(str(bit) for bit in bits), 2)
+
+
+def test_states_match_the_register():
+    lfsr = Lfsr(23)
+    expected = [lfsr.value]
+    for _ in range(200):
+        lfsr.step()
+        expected.append(lfsr.value)
+    cycles = [0, 1, 2, 22, 23, 24, 150, 200]
+    assert prbs.states(cycles).tolist() == [expected[cycle] for cycle in cycles]
+
+
+@pytest.mark.parametrize("size_min, size_max", [(1, 37), (16, 64)])
+def test_packet_sizes_follow_the_edges(size_min, size_max):
+    # the size after each tlast, from the register one edge before it.
+    lengths = prbs.PacketLengths(size_min, size_max)
+    start_edge = 5
+    lfsr = Lfsr(23)
+    register = [lfsr.value]
+    expected = []
+    size = size_max
+    last = start_edge
+    for _ in range(100):
+        expected.append(size)
+        last = last + size
+        while len(register) < last:
+            lfsr.step()
+            register.append(lfsr.value)
+        value = register[last - 1] % size_max
+        size = max(value or size_max, size_min)
+    assert lengths.sizes(100, start_edge).tolist() == expected
+    assert prbs.PacketLengths(size_min, size_max, random=False).sizes(3, start_edge).tolist() == [size_max] * 3
+
+
+def test_cli_writes_packed_bits(tmp_path):
+    output = tmp_path / "prbs7.bin"
+    subprocess.run([sys.executable, "-m", "tools.prbs", "--order", "7", "--seed", "0x11", "--bits", "64",
+                    "-o", str(output)], check=True)
+    bits = np.unpackbits(np.frombuffer(output.read_bytes(), dtype=np.uint8), bitorder="big")
+    assert bits.tolist() == naive_bits(7, 64, 0x11)
@@ -0,0 +1,87 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/profiles.py: which profile a test runs as, and the fast-run profile
+# made for each GHDL backend.
+#--------------------------------------------------------------------------------
+from types import SimpleNamespace
+
+from tools import profiles
+from tools.profiles import Selector, fast_run
+
+
+def history(**tests):
+    return SimpleNamespace(tests={name.replace("__", "."): seconds for name, seconds in tests.items()})
+
+
+def test_everything_is_fast_compile_by_default():
+    assert Selector().profile("lib.some_tb.test") == "fast-compile"
+    assert Selector(history(lib__some_tb__test=100.0)).profile("lib.some_tb.test") == "fast-compile"
+
+
+def test_forced_profile_wins():
+    selector = Selector(history(lib__some_tb__test=100.0), after=1, forced="fast-compile")
+    assert selector.profile("lib.some_tb.test") == "fast-compile"
+    assert Selector(forced="fast-run").profile("lib.some_tb.test") == "fast-run"
+
+
+def test_patterns_of_the_testbench():
+    selector = Selector(patterns={"can_soak_tb": {"*.run_time*": "fast-run"}})
+    assert selector.profile("lib.can_soak_tb.run_time=1ms.Soak") == "fast-run"
+    assert selector.profile("lib.can_soak_tb.Quick") == "fast-compile"
+    # patterns only apply to their own testbench.
+    assert selector.profile("lib.other_tb.run_time=1ms.Soak") == "fast-compile"
+
+
+def test_pattern_wins_over_history():
+    selector = Selector(history(lib__some_tb__slow=100.0), after=10,
+                        patterns={"some_tb": {"*.slow": "fast-compile"}})
+    assert selector.profile("lib.some_tb.slow") == "fast-compile"
+
+
+def test_history_seconds_after_threshold():
+    selector = Selector(history(lib__some_tb__slow=30.0, lib__some_tb__quick=2.0), after=10)
+    assert selector.profile("lib.some_tb.slow") == "fast-run"
+    assert selector.profile("lib.some_tb.quick") == "fast-compile"
+    assert selector.profile("lib.some_tb.unknown") == "fast-compile"
+
+
+def test_same_sim_suite_costs_all_of_its_tests():
+    selector = Selector(history(lib__some_tb__a=6.0, lib__some_tb__b=6.0, lib__some_tbx__c=50.0), after=10)
+    assert selector.seconds("lib.some_tb") == 12.0
+    assert selector.profile("lib.some_tb") == "fast-run"
+
+
+def simulator_if(prefix, backend):
+    return SimpleNamespace(_prefix=prefix, _backend=backend)
+
+
+def test_fast_run_with_the_same_ghdl():
+    profile = fast_run(None, simulator_if("/usr/bin", "llvm"))
+    assert (profile.name, profile.prefix, profile.backend) == ("fast-run", "/usr/bin", "llvm")
+    assert profile.a_flags == ["-O2"] and profile.elab_flags == ["-O2"]
+    assert profile.has_output_flag()
+    assert fast_run("/usr/bin", simulator_if("/usr/bin", "gcc")).backend == "gcc"
+
+
+def test_no_fast_run_with_mcode():
+    assert fast_run(None, simulator_if("/usr/bin", "mcode")) is None
+
+
+def test_fast_run_with_another_ghdl(monkeypatch):
+    monkeypatch.setattr(profiles.GHDLInterface, "determine_backend", staticmethod(lambda prefix: "llvm"))
+    profile = fast_run("/opt/ghdl-llvm/bin", simulator_if("/usr/bin", "mcode"))
+    assert (profile.prefix, profile.backend) == ("/opt/ghdl-llvm/bin", "llvm")
+    monkeypatch.setattr(profiles.GHDLInterface, "determine_backend", staticmethod(lambda prefix: "mcode"))
+    assert fast_run("/opt/ghdl/bin", simulator_if("/usr/bin", "llvm")) is None
@@ -0,0 +1,120 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/regaccess.py: merged field writes on the can_aximm register bank, over
+# the memory, stimulus and mmap backends.
+#--------------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+from can_aximms.can_aximm_regs import CanAximm
+from tools import hexio
+from tools.regaccess import MemoryBackend, MmapBackend, StimulusBackend, lanes, strobe_mask
+
+
+class Recorder(MemoryBackend):
+    def __init__(self, reset=None):
+        super().__init__(reset)
+        self.log = []
+
+    def read(self, address):
+        self.log.append(("read", address))
+        return super().read(address)
+
+    def write(self, address, data, strobe):
+        self.log.append(("write", address, data, strobe))
+        super().write(address, data, strobe)
+
+
+def test_lanes_and_strobe_mask():
+    assert lanes(0x00010100) == 0b0110
+    assert lanes(0) == 0
+    assert strobe_mask(0b1001) == 0xFF0000FF
+    assert strobe_mask(lanes(0x03030000)) == 0xFFFF0000
+
+
+def test_field_alone_in_its_lanes_is_written_without_a_read():
+    backend = Recorder({0x0C: 0x03030000})
+    regs = CanAximm(backend)
+    regs.write("rx_data_irq", 1)
+    # rx_error_irq shares the lane, but it is Write2Clear: writing it 0 is harmless.
+    assert backend.log == [("write", 0x0C, 0x00000001, 0b0001)]
+    assert backend.memory[0x0C] == 0x03030001
+
+
+def test_kept_bits_in_the_written_lanes_are_read_first():
+    backend = Recorder({0x04: 0x00000102})
+    regs = CanAximm(backend)
+    regs.write("iso_mode", 1)
+    assert backend.log == [("read", 0x04), ("write", 0x04, 0x00000003, 0b0001)]
+    assert backend.memory[0x04] == 0x00000103
+
+
+def test_transaction_merges_fields_of_a_register():
+    backend = Recorder({0x0C: 0x02020000, 0x4C: 0x12345678})
+    regs = CanAximm(backend)
+    with regs.transaction() as t:
+        t.set("rx_data_mask", 1)
+        t.set("tx_data_mask", 1)
+        t.set("tx_data0", 0xCAFEF00D)
+    assert backend.log == [
+        ("read", 0x0C), ("write", 0x0C, 0x03030000, 0b1100),
+        ("write", 0x4C, 0xCAFEF00D, 0b1111),
+    ]
+    assert backend.memory[0x0C] == 0x03030000
+
+
+def test_later_set_of_a_field_wins():
+    backend = Recorder()
+    CanAximm(backend).transaction().set("tx_dlc", 3).set("tx_dlc", 8).commit()
+    assert backend.log == [("write", 0x44, 8, 0b0001)]
+
+
+def test_too_wide_value_is_refused():
+    with pytest.raises(ValueError, match="tx_dlc: 16 does not fit in 4 bits"):
+        CanAximm(MemoryBackend()).write("tx_dlc", 16)
+
+
+def test_failed_transaction_writes_nothing():
+    backend = Recorder()
+    regs = CanAximm(backend)
+    with pytest.raises(KeyError):
+        with regs.transaction() as t:
+            t.set("tx_dlc", 3)
+            t.set("no_such_field", 1)
+    assert backend.log == []
+
+
+def test_stimulus_backend_reads_the_shadow(tmp_path):
+    path = str(tmp_path / "regs.txt")
+    with StimulusBackend(path, reset={0x04: 0x00000100}) as backend:
+        regs = CanAximm(backend)
+        # promiscuous is in another lane, the write leaves it alone.
+        regs.write("fd_enable", 1)
+        regs.check(promiscuous=1, fd_enable=1)
+    ops, addresses, data, masks = hexio.read(path, StimulusBackend.widths)
+    assert list(ops) == [0, 1, 0]
+    assert list(addresses) == [0x04, 0x04, 0x04]
+    assert list(data) == [0, 0x00000002, 0x00000102]
+    assert list(masks) == [0, 0x000000FF, 0x00000102]
+
+
+def test_mmap_backend_partial_strobe_writes_only_its_bytes():
+    buffer = bytearray(0x54)
+    backend = MmapBackend(buffer)
+    backend.write(0x04, 0xFFFFFFFF, 0xF)
+    backend.write(0x04, 0x00AA00BB, 0b0101)
+    assert backend.read(0x04) == 0xFFAAFFBB
+    backend.close()
+    assert np.frombuffer(bytes(buffer), dtype="<u4")[1] == 0xFFAAFFBB
@@ -0,0 +1,76 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/regmap.py on the can_aximm register bank: the markdown parser, the
+# block checks and the generated outputs, which must match the checked in ones.
+#--------------------------------------------------------------------------------
+from os.path import join
+
+import pytest
+
+from tools import regmap
+from tools.cores import root
+
+markdown = join(root, "can_aximms", "can_aximm.md")
+
+blocks = {"rx_frame": ("RX_DLC", "RX_DATA1"), "tx_frame": ("TX_DLC", "TX_DATA1")}
+
+
+@pytest.fixture
+def can_regs():
+    return regmap.RegisterMap.from_markdown(markdown)
+
+
+def test_markdown_is_parsed(can_regs):
+    assert can_regs.name == "can_aximm"
+    assert can_regs.data_width == 32
+    assert can_regs.version == "20210528_1505"
+    assert len(can_regs.registers) == 18
+    config = next(register for register in can_regs.registers if register.name == "Config_1")
+    assert config.address == 0x4
+    assert [(field.name, field.offset, field.width) for field in config.fields] == \
+        [("iso_mode", 0, 1), ("fd_enable", 1, 1), ("promiscuous", 8, 1)]
+    assert config.keep == 0x103
+    assert regmap.window_size(can_regs) == 0x54
+
+
+def test_markdown_without_registers(tmp_path):
+    path = tmp_path / "empty.md"
+    path.write_text("Data Width: 32\n")
+    with pytest.raises(ValueError):
+        regmap.RegisterMap.from_markdown(str(path))
+
+
+def test_generated_outputs_are_up_to_date(can_regs):
+    with open(join(root, "can_aximms", "can_aximm_regs.py")) as f:
+        assert regmap.python_module(can_regs) == f.read()
+    with open(join(root, "can_aximms", "can_aximm_regs.h")) as f:
+        assert regmap.c_header(can_regs, blocks) == f.read()
+
+
+def test_blocks_must_be_contiguous(can_regs):
+    # Line_Status (0x10) and TEST_Control (0x1C) have a gap between them.
+    with pytest.raises(ValueError):
+        regmap.block_runs(can_regs, {"status": ("Line_Status", "TEST_Control")})
+    with pytest.raises(ValueError):
+        regmap.block_runs(can_regs, {"a": ("RX_DLC", "RX_ID"), "b": ("RX_ID", "RX_DATA0")})
+    runs = regmap.block_runs(can_regs, blocks)
+    assert [register.name for register in runs["rx_frame"]] == ["RX_DLC", "RX_ID", "RX_DATA0", "RX_DATA1"]
+
+
+def test_read_only_blocks_have_no_write_accessor(can_regs):
+    header = regmap.c_header(can_regs, blocks)
+    assert "can_aximm_read_rx_frame" in header
+    assert "can_aximm_write_rx_frame" not in header
+    assert "can_aximm_write_tx_frame" in header
@@ -0,0 +1,93 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/regwindow.py and can_aximms/can_window.py over a plain file mmap'd the
+# way a /dev/uioN window is.
+#--------------------------------------------------------------------------------
+import mmap
+
+import numpy as np
+import pytest
+
+from tools.regwindow import RegisterWindow
+from can_aximms import can_aximm_regs as regs
+from can_aximms.can_window import CanWindow, field, payload
+
+
+@pytest.fixture
+def window_file(tmp_path):
+    path = tmp_path / "uio0"
+    path.write_bytes(bytes(mmap.PAGESIZE))
+    return path
+
+
+def words(path):
+    return np.frombuffer(path.read_bytes()[:regs.dtype.itemsize], dtype="<u4")
+
+
+def address(register):
+    return regs.dtype.fields[register][1] // 4
+
+
+def test_send_stores_the_frame_then_tx_valid(window_file):
+    can = CanWindow.open(str(window_file))
+    can.send(0x1ABCDEF, b"\x01\x02\x03\x04\x05", rtr=True, eff=True)
+    can.buffer.flush()
+    stored = words(window_file)
+    assert stored[address("tx_dlc")] == 5
+    assert stored[address("tx_id")] == 0x1ABCDEF
+    assert stored[address("tx_data0")] == 0x04030201
+    assert stored[address("tx_data1")] == 0x00000005
+    status = int(stored[address("tx_status")])
+    assert field("tx_valid", status) == 1
+    assert field("tx_rtr", status) == 1
+    assert field("tx_eff", status) == 1
+    # nothing else of the window is touched.
+    touched = [address(name) for name in ("tx_status", "tx_dlc", "tx_id", "tx_data0", "tx_data1")]
+    assert not np.delete(stored, touched).any()
+    can.close()
+
+
+def test_rx_frame_reads_the_rx_registers(window_file):
+    raw = np.zeros(mmap.PAGESIZE // 4, dtype="<u4")
+    raw[address("rx_status")] = 1 << regs.fields["rx_ide"][1] | 1
+    raw[address("rx_dlc")] = 3
+    raw[address("rx_id")] = 0x123
+    raw[address("rx_data0")] = 0x00CCBBAA
+    raw[address("rx_data1")] = 0xFFFFFFFF
+    window_file.write_bytes(raw.tobytes())
+
+    can = CanWindow.open(str(window_file))
+    frame = can.rx_frame()
+    assert frame["rx_id"] == 0x123
+    assert field("rx_ide", frame["rx_status"]) == 1
+    assert field("rx_size", frame["rx_dlc"]) == 3
+    assert payload(frame) == b"\xAA\xBB\xCC"
+    # a copy: later changes of the window do not show in it.
+    can.regs["rx_id"] = 0x456
+    assert frame["rx_id"] == 0x123
+    can.close()
+
+
+def test_write_needs_a_contiguous_span(window_file):
+    can = CanWindow.open(str(window_file))
+    with pytest.raises(ValueError):
+        can.write(tx_dlc=1, tx_data0=2)
+    can.close()
+
+
+def test_window_must_be_whole_words():
+    dtype = np.dtype([("a", "<u2")])
+    with pytest.raises(ValueError):
+        RegisterWindow(dtype, bytearray(4))
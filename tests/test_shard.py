@@ -0,0 +1,91 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/shard.py: the i/N argument, the split every node agrees on and the
+# xunit merge.
+#--------------------------------------------------------------------------------
+import argparse
+import json
+import xml.etree.ElementTree as ElementTree
+from types import SimpleNamespace
+
+import pytest
+
+from tools import shard
+from tools.history import History
+
+
+def suites(count):
+    return [SimpleNamespace(test_names=["lib.tb_%d.test" % j]) for j in range(count)]
+
+
+@pytest.fixture
+def history(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text(json.dumps({"lib.tb_%d.test" % j: float(j + 1) for j in range(10)}))
+    return History(str(path))
+
+
+def test_parse():
+    assert shard.parse("2/4") == (2, 4)
+    for text in ["0/4", "5/4", "a/4", "2", "1/2/3"]:
+        with pytest.raises(argparse.ArgumentTypeError):
+            shard.parse(text)
+
+
+def test_shards_cover_every_suite_once(history):
+    test_suites = suites(10)
+    chosen = [shard.select(test_suites, history, (index, 3)) for index in range(1, 4)]
+    names = sorted(s.test_names[0] for part in chosen for s in part)
+    assert names == sorted(s.test_names[0] for s in test_suites)
+    # longest processing time first: 55 s of tests spread as 19, 18, 18.
+    loads = sorted(sum(history.cost(s.test_names) for s in part) for part in chosen)
+    assert loads == [18.0, 18.0, 19.0]
+
+
+def test_split_does_not_depend_on_the_suite_order(history):
+    test_suites = suites(10)
+    first = [[s.test_names for s in part] for part in shard.split(test_suites, history, 4)]
+    second = [[s.test_names for s in part] for part in shard.split(test_suites[::-1], history, 4)]
+    assert first == second
+
+
+def test_select_keeps_the_run_order(history):
+    test_suites = suites(10)
+    chosen = shard.select(test_suites, history, (1, 2))
+    assert chosen == [s for s in test_suites if s in chosen]
+
+
+def xunit(path, tests, failures, time, wrapped=False):
+    suite = ElementTree.Element("testsuite", tests=str(len(tests)), failures=str(failures),
+                                errors="0", skipped="0", time=str(time))
+    for name in tests:
+        ElementTree.SubElement(suite, "testcase", name=name)
+    root = suite
+    if wrapped:
+        root = ElementTree.Element("testsuites")
+        root.append(suite)
+    ElementTree.ElementTree(root).write(str(path))
+    return str(path)
+
+
+def test_merge(tmp_path):
+    inputs = [xunit(tmp_path / "shard_1_of_2.xml", ["a", "b"], 1, 1.5),
+              xunit(tmp_path / "shard_2_of_2.xml", ["c"], 0, 2.25, wrapped=True)]
+    output = str(tmp_path / "report.xml")
+    totals = shard.merge(output, inputs)
+    assert totals == {"tests": 3, "failures": 1, "errors": 0, "skipped": 0}
+    merged = ElementTree.parse(output).getroot()
+    assert [case.get("name") for case in merged.findall("testcase")] == ["a", "b", "c"]
+    assert merged.get("time") == "3.750"
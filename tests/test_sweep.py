@@ -0,0 +1,61 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/sweep.py: matrix expansion, requirements and the configs VUnit gets.
+#--------------------------------------------------------------------------------
+from tools.sweep import Sweep, implies
+
+
+class Entity:
+    def __init__(self):
+        self.configs = {}
+
+    def add_config(self, name, generics, post_check=None):
+        self.configs[name] = (generics, post_check)
+
+
+def test_implies():
+    requirement = implies("cut_through", "packet_mode")
+    assert requirement({"cut_through": False, "packet_mode": False})
+    assert requirement({"cut_through": False, "packet_mode": True})
+    assert requirement({"cut_through": True, "packet_mode": True})
+    assert not requirement({"cut_through": True, "packet_mode": False})
+    assert not implies("a", "b")({"a": 1, "b": 0})
+
+
+def test_requirements_prune_the_matrix():
+    sweep = Sweep({"packet_mode": [False, True], "cut_through": [False, True], "depth": [4, 8]})
+    assert len(sweep) == 8
+    sweep.require(implies("cut_through", "packet_mode"))
+    assert len(sweep) == 6
+    assert all(generics["packet_mode"] or not generics["cut_through"] for generics in sweep)
+
+
+def test_add_configs_names_and_post_checks():
+    sweep = Sweep({"depth": [4, 8]}, post_check=lambda generics: generics["depth"])
+    test_tb = Entity()
+    sweep.add_configs(test_tb, base={"width": 8})
+    assert test_tb.configs == {
+        "width=8,depth=4": ({"width": 8, "depth": 4}, 4),
+        "width=8,depth=8": ({"width": 8, "depth": 8}, 8),
+    }
+
+
+def test_axis_fifo_sweep_meets_its_requirements():
+    from tools.cores import axis_fifo_sweep
+    configs = list(axis_fifo_sweep)
+    assert configs
+    for generics in configs:
+        assert generics["packet_mode"] or not generics["cut_through"]
+        assert generics["tlast_enable"] or not generics["packet_mode"]
@@ -0,0 +1,97 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# tools/trace.py on small binary traces written with NumPy, the layout of
+# verification_ip/axis_trace_monitor.vhd.
+#--------------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+from tools import trace
+
+
+def beats(count, first_cycle=10, step=1, stream=0):
+    rows = np.zeros(count, dtype=trace.beat_dtype)
+    rows["cycle"] = first_cycle + step * np.arange(count)
+    rows["tdata"] = np.arange(count) * 0x0101
+    rows["tuser"] = np.arange(count) % 3
+    rows["tlast"] = np.arange(count) % 4 == 3
+    rows["stream"] = stream
+    return rows
+
+
+def write(path, rows):
+    rows.tofile(str(path))
+    return str(path)
+
+
+def test_equal_payloads_pass_whatever_the_cycles(tmp_path):
+    expected = write(tmp_path / "s.trace", beats(100))
+    actual = write(tmp_path / "m.trace", beats(100, first_cycle=14, step=2))
+    result = trace.compare(actual, expected)
+    assert result.passed()
+    assert result.mismatch is None
+    assert result.stats.throughput() == {0: (100, 100 / 199)}
+
+
+def test_first_mismatch_is_reported(tmp_path):
+    rows = beats(100)
+    expected = write(tmp_path / "s.trace", rows)
+    rows["tuser"][40] = 7
+    rows["tdata"][60] = 1
+    actual = write(tmp_path / "m.trace", rows)
+    result = trace.compare(actual, expected)
+    assert not result.passed()
+    assert result.mismatch == (40, "tuser", 7, 40 % 3)
+    assert trace.compare(actual, expected, fields=["tdata"]).mismatch == (60, "tdata", 1, 60 * 0x0101)
+
+
+def test_short_and_long_traces(tmp_path):
+    expected = write(tmp_path / "s.trace", beats(100))
+    short = write(tmp_path / "m0.trace", beats(90))
+    result = trace.compare(short, expected)
+    assert result.missing == 10
+    assert not result.passed()
+    assert result.passed(allow_missing=True)
+    long = write(tmp_path / "m1.trace", beats(110))
+    assert trace.compare(long, expected).extra == 10
+    assert not trace.compare(long, expected).passed(allow_missing=True)
+    assert not trace.check_dir(str(tmp_path))
+    assert not trace.post_check(allow_missing=True)(output_path=str(tmp_path))
+
+
+def test_chunks_cover_the_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr(trace, "chunk_beats", 7)
+    rows = beats(50)
+    expected = write(tmp_path / "s.trace", rows)
+    rows["tlast"][45] = 1 - rows["tlast"][45]
+    actual = write(tmp_path / "m.trace", rows)
+    assert trace.compare(actual, expected).mismatch[0] == 45
+    assert [begin for begin, _ in trace.chunks(trace.open_trace(actual))] == list(range(0, 50, 7))
+
+
+def test_traces_are_whole_beats(tmp_path):
+    path = tmp_path / "s.trace"
+    path.write_bytes(bytes(trace.beat_dtype.itemsize + 1))
+    with pytest.raises(ValueError):
+        trace.open_trace(str(path))
+    (tmp_path / "m.trace").write_bytes(b"")
+    assert len(trace.open_trace(str(tmp_path / "m.trace"))) == 0
+
+
+def test_check_dir_needs_both_sides(tmp_path):
+    write(tmp_path / "s.trace", beats(10))
+    assert not trace.check_dir(str(tmp_path))
+    write(tmp_path / "m.trace", beats(10))
+    assert trace.check_dir(str(tmp_path))
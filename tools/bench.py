@@ -0,0 +1,182 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Throughput and latency figures of the AXIS benchmark (axis_bench/axis_bench_tb.vhd).
+#
+# From the s.trace and m.trace of one run:
+#   beats_per_cycle : output beats over the cycles from first to last output beat.
+#   ideal           : what the tvalid/tready duty cycles allow, min(valid, ready).
+#   latency         : cycles from the first input beat to the first output beat.
+#   stalls          : cycles the DUT held s_tready low while a beat was offered.
+#                     The testbench offers the next beat on the edge after the
+#                     first valid cycle from the last acceptance on, so the
+#                     offer cycles follow from s.trace (the first beat, offered
+#                     out of reset, is left out).
+#   bubbles         : cycles in the output window where m_tready was high and a
+#                     beat was inside the DUT, but none left.
+# Each run writes bench.json to its output path; write_table() gathers them into
+# <output path>/axis_bench.csv after the run, and --bench-update saves the measured
+# beats_per_cycle as the new baseline that later runs must not fall below.
+# A configuration missing from the baseline still fails under ideal_floor of its
+# ideal: a core may lose half of it (a register without skid buffer sends every
+# other cycle), not more.
+#--------------------------------------------------------------------------------
+from os.path import join, exists
+import csv
+import json
+import os
+
+import numpy as np
+
+metrics_file = "bench.json"
+
+ideal_floor = 0.5
+
+columns = ["test", "config", "dut", "valid", "ready", "beats", "cycles", "beats_per_cycle", "ideal",
+           "latency", "stalls", "bubbles", "baseline", "status"]
+
+
+def duty(on, period):
+    return "%dof%d" % (on, period)
+
+
+def pattern_on(cycles, on, period):
+    # cycles c with (c mod period) < on, as the testbench patterns.
+    return np.asarray(cycles) % period < on
+
+
+def offered(accepted, on, period):
+    # edges from which each beat but the first was offered: the first valid
+    # cycle at or after the previous acceptance, plus one.
+    previous = np.asarray(accepted[:-1], dtype=np.int64)
+    phase = previous % period
+    wait = np.where(phase < on, 0, period - phase)
+    return previous + wait + 1
+
+
+def measure(output_path, generics):
+    from tools import trace
+    s_trace = trace.open_trace(join(output_path, "s.trace"))
+    m_trace = trace.open_trace(join(output_path, "m.trace"))
+    if len(m_trace) == 0 or len(s_trace) == 0:
+        raise ValueError("%s: no beats traced" % output_path)
+    s_cycles = np.asarray(s_trace["cycle"], dtype=np.int64)
+    m_cycles = np.asarray(m_trace["cycle"], dtype=np.int64)
+    first = int(m_cycles[0])
+    last = int(m_cycles[-1])
+    cycles = last - first + 1
+    stalls = s_cycles[1:] - offered(s_cycles, generics["valid_on"], generics["valid_period"])
+    window = np.arange(first, last + 1)
+    inside = np.searchsorted(s_cycles, window, side="left") - np.searchsorted(m_cycles, window, side="left")
+    idle = ~np.isin(window, m_cycles, assume_unique=True)
+    ready = pattern_on(window, generics["ready_on"], generics["ready_period"])
+    return {
+        "dut": generics["dut"],
+        "valid": duty(generics["valid_on"], generics["valid_period"]),
+        "ready": duty(generics["ready_on"], generics["ready_period"]),
+        "beats": len(m_trace),
+        "cycles": cycles,
+        "beats_per_cycle": len(m_trace) / cycles,
+        "ideal": ideal(generics),
+        "latency": first - int(s_cycles[0]),
+        "stalls": int(stalls.sum()),
+        "bubbles": int(np.count_nonzero(ready & idle & (inside > 0))),
+    }
+
+
+def ideal(generics):
+    return min(generics["valid_on"] / generics["valid_period"], generics["ready_on"] / generics["ready_period"])
+
+
+class Baseline:
+    # {config name: beats_per_cycle}, failing below (1 - tolerance) of it.
+    def __init__(self, path, tolerance=0.02):
+        self.path = path
+        self.tolerance = tolerance
+        self.values = {}
+        if exists(path):
+            with open(path) as f:
+                self.values = json.load(f)
+
+    def get(self, name):
+        return self.values.get(name)
+
+    def passed(self, name, beats_per_cycle):
+        baseline = self.get(name)
+        return baseline is None or beats_per_cycle >= baseline * (1 - self.tolerance)
+
+    def update(self, rows):
+        for row in rows:
+            if row["status"] != "failed":
+                self.values[row["config"]] = round(row["beats_per_cycle"], 4)
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.values, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, self.path)
+
+
+def post_check(name, generics, baseline, output_path):
+    # VUnit post_check: payload must match, throughput must hold the baseline.
+    from tools import trace
+    metrics = measure(output_path, generics)
+    metrics["config"] = name
+    metrics["baseline"] = baseline.get(name)
+    with open(join(output_path, metrics_file), "w") as f:
+        json.dump(metrics, f, indent=2)
+
+    result = trace.compare(join(output_path, "m.trace"), join(output_path, "s.trace"))
+    print(result.report())
+    print("%.3f beats/cycle (ideal %.3f), latency %d, %d stalls, %d bubbles" % (
+        metrics["beats_per_cycle"], metrics["ideal"], metrics["latency"], metrics["stalls"], metrics["bubbles"]))
+    if metrics["beats_per_cycle"] < metrics["ideal"] * ideal_floor:
+        print("throughput below %.3f, %d%% of ideal" % (metrics["ideal"] * ideal_floor, 100 * ideal_floor))
+        return False
+    if not baseline.passed(name, metrics["beats_per_cycle"]):
+        print("throughput below baseline %.3f" % metrics["baseline"])
+        return False
+    return result.passed(allow_missing=False)
+
+
+def rows(report):
+    # one row per benchmark test that got as far as its post_check.
+    table = []
+    for test, result in sorted(report.tests.items()):
+        path = join(result.path, metrics_file)
+        if exists(path):
+            with open(path) as f:
+                row = json.load(f)
+            row["test"] = test
+            row["status"] = result.status.name
+            table.append(row)
+    return table
+
+
+def write_table(results, output_path, baseline=None):
+    table = rows(results.get_report())
+    if not table:
+        return None
+    path = join(output_path, "axis_bench.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(table)
+    print("Benchmark table: " + path)
+    if baseline is not None:
+        baseline.update(table)
+        baseline.save()
+        print("Benchmark baseline updated: " + baseline.path)
+    return path
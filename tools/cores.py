@@ -0,0 +1,356 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Registry of every core that has a VUnit testbench, and the helpers to load
+# one or more of them into a VUnit project. Only the files each testbench really
+# needs are added, as computed by tools.manifest.
+#--------------------------------------------------------------------------------
+from os.path import join, dirname, abspath, basename, splitext
+import glob
+import importlib.util
+import os
+
+from tools import profiles, shard
+from tools.explore import Coverage, Coverpoint, Exploration, Space
+from tools.manifest import Manifest
+from tools.sweep import Sweep, implies
+
+root = dirname(dirname(abspath(__file__)))
+stdblocks_path = join(root, "dependencies", "stdblocks")
+expert_path = join(stdblocks_path, "libraries", "stdexpert", "src")
+
+history_file = join(root, ".vunit_history.json")
+perf_db_file = join(root, ".vunit_perf.db")
+
+stdblocks_libs = ["sync_lib", "timer_lib", "ram_lib", "fifo_lib", "prbs_lib", "scheduler_lib"]
+
+
+class Core:
+    def __init__(self, name, osvvm=False, com=False, configs=None, sweeps=None, models=None,
+                 traced=False, waves=None, explore=None, profiles=None):
+        self.name = name
+        self.path = join(root, name)
+        self.osvvm = osvvm
+        self.com = com
+        self.configs = configs or {}
+        self.sweeps = sweeps or []
+        # python modules in the core directory with an add_configs(test_tb).
+        self.models = models or []
+        # testbench writes s.trace and m*.trace, compared after every test.
+        self.traced = traced
+        # GHDL wave option paths dumped when a test fails, see tools.ghdl.
+        self.waves = waves or []
+        # tools.explore.Exploration sampled by python -m tools.explore.
+        self.explore = explore
+        # {test name pattern: profile} run as that profile, see tools.profiles.
+        self.profiles = profiles or {}
+
+    def source_files(self):
+        return sorted(glob.glob(join(self.path, "*.vhd")))
+
+    def testbench_files(self):
+        return [f for f in self.source_files() if f.endswith("_tb.vhd")]
+
+    def testbenches(self):
+        return [splitext(basename(f))[0] for f in self.testbench_files()]
+
+    def load_model(self, name):
+        spec = importlib.util.spec_from_file_location(name, join(self.path, name + ".py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+
+def axis_fifo_trace_check(generics):
+    # disabled tuser/tlast/tdest do not go through the fifo. The free running
+    # and overflow tests stop with beats still inside it.
+    from tools import trace
+    fields = ["tdata"] + [f for f in ["tuser", "tlast", "tdest"] if generics[f + "_enable"]]
+    return trace.post_check(fields, allow_missing=True)
+
+
+axis_fifo_sweep = Sweep({
+    "ram_type":     ["blockram", "distributed"],
+    "fifo_size":    [4, 6],
+    "packet_mode":  [False, True],
+    "cut_through":  [False, True],
+    "sync_mode":    [False, True],
+    "tuser_enable": [True, False],
+    "tlast_enable": [True, False],
+    "tdest_enable": [True, False],
+}, requires=[
+    implies("cut_through", "packet_mode"),
+    implies("packet_mode", "tlast_enable"),
+], post_check=axis_fifo_trace_check)
+
+
+def port_bucket(ports):
+    return "2" if ports <= 2 else "3-4" if ports <= 4 else "5-8"
+
+
+def axis_exploration(ports, switch=None):
+    # tuser and tdest carry the port number, so they are never narrower than 4
+    # bits; the broadcast trace files hold at most 64/32/16 bits of them.
+    matrix = {
+        ports:        [2, 3, 4, 5, 8],
+        "tdata_byte": [1, 2, 4, 8],
+        "tdest_size": [4, 8, 16],
+        "tuser_size": [4, 8, 32],
+        "stall_prob": [0, 10, 50],
+    }
+    points = {
+        "ports":               Coverpoint(lambda run: port_bucket(run.generics[ports]), ["2", "3-4", "5-8"]),
+        "tdata_byte":          Coverpoint(lambda run: run.generics["tdata_byte"], [1, 2, 4, 8]),
+        "input backpressure":  Coverpoint(lambda run: run.stalls("s") > 0, [False, True]),
+        "output backpressure": Coverpoint(lambda run: run.stalls("m") > 0, [False, True]),
+        "ports x output backpressure": Coverpoint(
+            lambda run: (port_bucket(run.generics[ports]), run.stalls("m") > 0),
+            [(bucket, stalled) for bucket in ["2", "3-4", "5-8"] for stalled in [False, True]]),
+    }
+    if switch is not None:
+        matrix[switch] = [False, True]
+        points["tlast switching"] = Coverpoint(lambda run: run.generics[switch], [False, True])
+    return Exploration(Space(matrix), Coverage(points))
+
+
+# demux routes on a signed tdest, which must hold the highest port number.
+axis_demux_exploration = axis_exploration("controllers_num", "switch_tlast")
+axis_demux_exploration.space.require(lambda g: 2 ** (g["tdest_size"] - 1) > g["controllers_num"] - 1)
+
+
+# the run_time configs (and can_soak segments) are the long soaks, fast-run even
+# before any history.
+soak_profiles = {"*.run_time*": "fast-run"}
+
+
+# spi_axim and axis_s_spim are left out: their testbenches are free running
+# stimulus without runner_cfg or checks, so VUnit has nothing to run or judge.
+CORES = {core.name: core for core in [
+    Core("aximm_dpram",    osvvm=True, configs={"run_time": dict(run_time=100)}, models=["aximm_dpram_model"],
+                           profiles=soak_profiles),
+    Core("aximm_intercon", models=["aximm_intercon_model"]),
+    Core("aximm_ram",      osvvm=True, configs={"run_time": dict(run_time=100)}, models=["aximm_ram_model"],
+                           profiles=soak_profiles),
+    Core("axis_aligner",   explore=axis_exploration("peripherals_num", "switch_on_tlast")),
+    Core("axis_bench",     models=["axis_bench_model"]),
+    Core("axis_broadcast", traced=True, explore=axis_exploration("peripherals_num")),
+    Core("axis_demux",     explore=axis_demux_exploration),
+    Core("axis_fifo",      sweeps=[axis_fifo_sweep], waves=["/axis_fifo_tb/dut_u/*"]),
+    Core("axis_intercon",  models=["axis_intercon_model"]),
+    Core("axis_mux",       explore=axis_exploration("peripherals_num", "switch_tlast")),
+    Core("axis_reg",       traced=True),
+    Core("can_aximms",     osvvm=True, configs={"run_time": dict(run_time=100)}, models=["can_model", "can_regs_script"],
+                           waves=["/can_aximm_top_tb/dut_u/can_rx_u/*"],
+                           profiles=dict(soak_profiles, **{"*.soak_*": "fast-run"})),
+    Core("i2cs_axim",      com=True),
+]}
+
+
+def expert_files():
+    return sorted(glob.glob(join(expert_path, "*.vhd")))
+
+
+def stdblocks_files(libs=stdblocks_libs):
+    filelist = []
+    for lib in libs:
+        filelist = filelist + sorted(glob.glob(join(stdblocks_path, lib, "*.vhd")))
+    return [vhd_file for vhd_file in filelist if "_tb" not in vhd_file]
+
+
+def manifest():
+    stdcores_files = sorted(glob.glob(join(root, "verification_ip", "*.vhd")))
+    for core in CORES.values():
+        stdcores_files = stdcores_files + core.source_files()
+    return Manifest({
+        "expert": expert_files(),
+        "stdblocks": stdblocks_files(),
+        "stdcores": stdcores_files,
+    })
+
+
+def sources(cores):
+    top_files = []
+    for core in cores:
+        top_files = top_files + core.testbench_files()
+    return manifest().closure(top_files)
+
+
+def cli():
+    # VUnit command line with one simulation thread per CPU unless -p is given.
+    from vunit import VUnitCLI
+    vunit_cli = VUnitCLI()
+    vunit_cli.parser.add_argument(
+        "--history",
+        default=history_file,
+        help="JSON file with the wall time of previous runs, used to start the "
+             "longest tests first. Empty string disables it. Default: %(default)s"
+    )
+    vunit_cli.parser.add_argument(
+        "--perf-db",
+        default=perf_db_file,
+        help="SQLite file every run adds its per-test performance to, see "
+             "python -m tools.perf_db. Empty string disables it. Default: %(default)s"
+    )
+    vunit_cli.parser.add_argument(
+        "--shard",
+        type=shard.parse,
+        help="Run only shard i of N (i/N, 1 <= i <= N), balanced by the history. "
+             "Writes <output path>/shard_i_of_N.xml unless --xunit-xml is given."
+    )
+    vunit_cli.parser.add_argument(
+        "--changed",
+        nargs="+",
+        action="extend",
+        metavar="FILE",
+        help="Only run the testbenches that depend on these files."
+    )
+    vunit_cli.parser.add_argument(
+        "--git-diff",
+        metavar="REV",
+        help="Only run the testbenches that depend on files changed since REV "
+             "(committed, staged, unstaged or untracked)."
+    )
+    vunit_cli.parser.add_argument(
+        "--elab-run",
+        action="store_true",
+        help="With GHDL, elaborate every test again (ghdl --elab-run) instead of "
+             "reusing one executable per testbench and structural generics."
+    )
+    vunit_cli.parser.add_argument(
+        "--bench-update",
+        action="store_true",
+        help="Save the beats/cycle measured by axis_bench as its new baseline."
+    )
+    vunit_cli.parser.add_argument(
+        "--no-fail-waves",
+        action="store_true",
+        help="With GHDL, do not simulate failed tests again to dump their waveform."
+    )
+    vunit_cli.parser.add_argument(
+        "--wave-scope",
+        action="append",
+        metavar="PATH",
+        help="GHDL wave option path dumped when a test fails, e.g. "
+             "/axis_fifo_tb/dut_u/*. Can be used more than once. "
+             "Default: the core's hierarchies, else the testbench top level."
+    )
+    vunit_cli.parser.add_argument(
+        "--explore",
+        metavar="FILE",
+        help="Add the explored configurations of FILE to the \"PRBS simulation\" "
+             "tests, as written by python -m tools.explore."
+    )
+    vunit_cli.parser.add_argument(
+        "--profile",
+        choices=["auto"] + profiles.profile_names,
+        default="auto",
+        help="With GHDL, the backend/optimization profile of every test. auto picks "
+             "fast-run for the core soak patterns and the tests the history recorded "
+             "as long, fast-compile for the rest. Default: %(default)s"
+    )
+    vunit_cli.parser.add_argument(
+        "--fast-run-after",
+        type=float,
+        default=30.0,
+        metavar="SECONDS",
+        help="Recorded wall time from which a test goes to the fast-run profile. "
+             "0 disables it. Default: %(default)s"
+    )
+    vunit_cli.parser.add_argument(
+        "--fast-run-ghdl",
+        default=os.environ.get("GHDL_FAST_RUN"),
+        metavar="DIR",
+        help="bin directory of the llvm or gcc GHDL for the fast-run profile. "
+             "Default: $GHDL_FAST_RUN, else the GHDL VUnit uses (no fast-run with mcode)."
+    )
+    vunit_cli.parser.set_defaults(num_threads=os.cpu_count() or 1)
+    return vunit_cli
+
+
+def bench_baseline(args):
+    # baseline to update after the run, None unless --bench-update.
+    if not args.bench_update:
+        return None
+    from tools import bench
+    return bench.Baseline(CORES["axis_bench"].load_model("axis_bench_model").baseline_file)
+
+
+def add_vunit_libraries(vu, cores):
+    vu.add_verification_components()
+    if any(core.osvvm for core in cores):
+        vu.add_osvvm()
+    if any(core.com for core in cores):
+        vu.add_com()
+
+
+def add_shared_libraries(vu, files, cache=None):
+    # with a cache (tools.lib_cache.LibraryCache) a library that was already
+    # compiled is added as external and None is returned in its place.
+    expert_list = files.get("expert", [])
+    stdblocks_list = files.get("stdblocks", [])
+    if cache is not None:
+        expert = cache.add_library(vu, "expert", expert_list)
+        stdblocks = cache.add_library(vu, "stdblocks", stdblocks_list, depends=["expert"])
+        return expert, stdblocks
+
+    expert = vu.add_library("expert")
+    expert.add_source_files(expert_list)
+
+    stdblocks = vu.add_library("stdblocks")
+    stdblocks.add_source_files(stdblocks_list)
+    return expert, stdblocks
+
+
+def add_cores(vu, cores, files, library="stdcores"):
+    # every core goes to the same library (as add_lib.tcl does), so cores that
+    # use each other (axis_intercon, aximm_intercon) find their dependencies.
+    lib = vu.add_library(library)
+    lib.add_source_files(files.get(library, []))
+
+    for core in cores:
+        for tb_name, tb_file in zip(core.testbenches(), core.testbench_files()):
+            test_tb = lib.entity(tb_name)
+            test_tb.scan_tests_from_file(tb_file)
+            clock_periods = getattr(vu, "clock_periods", None)
+            if clock_periods is not None:
+                from tools import perf_db
+                clock_periods[tb_name] = perf_db.clock_period_ns(tb_file)
+            profile_patterns = getattr(vu, "profile_patterns", None)
+            if core.profiles and profile_patterns is not None:
+                profile_patterns[tb_name] = core.profiles
+            fail_waves = getattr(vu, "fail_waves", None)
+            if core.waves and fail_waves is not None:
+                fail_waves[tb_name] = core.waves
+            base_check = None
+            if core.traced:
+                from tools import trace
+                base_check = trace.post_check()
+                test_tb.set_post_check(base_check)
+            explore = getattr(vu, "explore", None)
+            if core.explore is not None and explore and tb_name in explore:
+                core.explore.add_configs(test_tb, explore[tb_name]["configs"], explore[tb_name]["token"], base_check)
+            for name, generics in core.configs.items():
+                test_tb.add_config(name=name, generics=generics)
+            for sweep in core.sweeps:
+                sweep.add_configs(test_tb)
+            for model in core.models:
+                core.load_model(model).add_configs(test_tb)
+    return lib
+
+
+def add_project(vu, cores, cache=None):
+    files = sources(cores)
+    add_vunit_libraries(vu, cores)
+    add_shared_libraries(vu, files, cache)
+    return add_cores(vu, cores, files)
@@ -0,0 +1,248 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Coverage driven random exploration of testbench generics.
+#
+#   space = Space({"peripherals_num": [2, 4, 8], "stall_prob": [0, 50]})
+#   coverage = Coverage({
+#       "ports": Coverpoint(lambda run: run.generics["peripherals_num"], [2, 4, 8]),
+#       "output backpressure": Coverpoint(lambda run: run.stalls("m") > 0, [False, True]),
+#   })
+#   Core("axis_mux", explore=Exploration(space, coverage))
+#
+# Space is a Sweep that is sampled instead of expanded, each sample with its own
+# seed generic. Tests report through the axis_stall_monitor files in their
+# output path (s*.stall and m*.stall, "beats stalls lasts"), gathered by a
+# post_check into explore.json next to them.
+#
+#   python -m tools.explore axis_mux
+#
+# runs rounds of --batch random configurations of the "PRBS simulation" test,
+# one VUnit run per round, and folds what each test reported into the coverage
+# bins. It stops when every bin is hit, when --patience rounds in a row hit no
+# new bin, or after --max-configs configurations.
+#--------------------------------------------------------------------------------
+from os.path import join, basename
+import argparse
+import functools
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from tools.sweep import Sweep
+
+config_prefix = "explore,"
+explore_test = "PRBS simulation"
+record_file = "explore.json"
+
+
+class Space(Sweep):
+    def sample(self, rng, tries=1000):
+        names = list(self.matrix)
+        for _ in range(tries):
+            generics = {name: self.matrix[name][rng.integers(len(self.matrix[name]))] for name in names}
+            if all(requirement(generics) for requirement in self.requires):
+                generics["seed"] = int(rng.integers(1, 2**31 - 1))
+                return {name: value.item() if isinstance(value, np.generic) else value
+                        for name, value in generics.items()}
+        raise ValueError("no generic set meets the requirements after %d tries" % tries)
+
+
+class Run:
+    # what one test reported: its generics and the stall monitor counts.
+    def __init__(self, generics, monitors):
+        self.generics = generics
+        self.monitors = monitors
+
+    def count(self, prefix, column):
+        return sum(counts[column] for name, counts in self.monitors.items() if name.startswith(prefix))
+
+    def beats(self, prefix):
+        return self.count(prefix, 0)
+
+    def stalls(self, prefix):
+        return self.count(prefix, 1)
+
+    def lasts(self, prefix):
+        return self.count(prefix, 2)
+
+
+class Coverpoint:
+    # sample(run) returns the bin hit; bins, when given, are all the bins to hit.
+    def __init__(self, sample, bins=None):
+        self.sample = sample
+        self.bins = list(bins) if bins is not None else None
+        self.hits = {}
+
+    def hit(self, run):
+        value = self.sample(run)
+        new = value not in self.hits
+        self.hits[value] = self.hits.get(value, 0) + 1
+        return new
+
+    def missing(self):
+        if self.bins is None:
+            return []
+        return [value for value in self.bins if value not in self.hits]
+
+
+class Coverage:
+    def __init__(self, points):
+        self.points = dict(points)
+
+    def hit(self, run):
+        # number of bins hit for the first time.
+        return sum(point.hit(run) for point in self.points.values())
+
+    def complete(self):
+        declared = [point for point in self.points.values() if point.bins is not None]
+        return bool(declared) and len(declared) == len(self.points) and \
+            not any(point.missing() for point in declared)
+
+    def summary(self):
+        return {name: {str(value): hits for value, hits in sorted(point.hits.items(), key=str)}
+                for name, point in self.points.items()}
+
+    def lines(self):
+        lines = []
+        for name, point in self.points.items():
+            bins = ", ".join("%s: %d" % (value, hits) for value, hits in sorted(point.hits.items(), key=str))
+            missing = point.missing()
+            if missing:
+                bins = bins + "; missing " + ", ".join(str(value) for value in missing)
+            lines.append("  %s: %s" % (name, bins))
+        return lines
+
+
+def read_monitors(output_path):
+    monitors = {}
+    for path in sorted(glob.glob(join(output_path, "*.stall"))):
+        with open(path) as f:
+            monitors[basename(path)[:-len(".stall")]] = [int(field) for field in f.read().split()]
+    return monitors
+
+
+def post_check(token, generics, base_check, output_path):
+    # a test that fails its own check is recorded as failed, not as coverage.
+    passed = True if base_check is None else bool(base_check(output_path=output_path))
+    record = {"token": token, "generics": generics, "monitors": read_monitors(output_path), "passed": passed}
+    with open(join(output_path, record_file), "w") as f:
+        json.dump(record, f)
+    return passed
+
+
+class Exploration:
+    def __init__(self, space, coverage):
+        self.space = space
+        self.coverage = coverage
+
+    def sample(self, rng, count, seen):
+        configs = {}
+        for _ in range(count):
+            generics = self.space.sample(rng)
+            name = config_prefix + Sweep.config_name(generics)
+            if name not in seen:
+                seen.add(name)
+                configs[name] = generics
+        return configs
+
+    def add_configs(self, test_tb, configs, token, base_check=None):
+        test = test_tb.test(explore_test)
+        for name, generics in configs.items():
+            test.add_config(name=name, generics=generics,
+                            post_check=functools.partial(post_check, token, generics, base_check))
+
+
+def load_configs(path):
+    # {testbench: {"token": ..., "configs": {name: generics}}}, as main() writes.
+    with open(path) as f:
+        return json.load(f)
+
+
+def records(output_path, token):
+    found = []
+    for path in glob.glob(join(output_path, "test_output", "*", record_file)):
+        with open(path) as f:
+            record = json.load(f)
+        if record["token"] == token:
+            found.append(record)
+    return found
+
+
+def main():
+    from tools import cores
+    explorable = sorted(name for name, core in cores.CORES.items() if core.explore is not None)
+    parser = argparse.ArgumentParser(description="Coverage driven random exploration of testbench generics.")
+    parser.add_argument("core", choices=explorable)
+    parser.add_argument("--batch", type=int, default=8, help="configurations per round. Default: %(default)s")
+    parser.add_argument("--patience", type=int, default=3,
+                        help="stop after this many rounds without a new bin. Default: %(default)s")
+    parser.add_argument("--max-configs", type=int, default=200, help="Default: %(default)s")
+    parser.add_argument("--seed", type=int, default=0, help="sampler seed. Default: %(default)s")
+    parser.add_argument("-p", "--num-threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-o", "--output-path", help="Default: vunit_out/explore_<core>")
+    args = parser.parse_args()
+
+    core = cores.CORES[args.core]
+    exploration = core.explore
+    output_path = os.path.abspath(args.output_path or join("vunit_out", "explore_" + args.core))
+    os.makedirs(output_path, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    seen = set()
+    failed = []
+    total = 0
+    idle = 0
+    rnd = 0
+    while total < args.max_configs and idle < args.patience and not exploration.coverage.complete():
+        rnd = rnd + 1
+        configs = exploration.sample(rng, min(args.batch, args.max_configs - total), seen)
+        if not configs:
+            break
+        token = "%d-%d" % (os.getpid(), rnd)
+        round_file = join(output_path, "round_%d.json" % rnd)
+        with open(round_file, "w") as f:
+            json.dump({tb: {"token": token, "configs": configs} for tb in core.testbenches()}, f, indent=2)
+        subprocess.run([sys.executable, join(cores.root, "run_all.py"), "--core", args.core,
+                        "--explore", round_file, "-o", output_path, "-p", str(args.num_threads),
+                        "*." + config_prefix + "*"], check=False)
+        new = 0
+        passed = set()
+        for record in records(output_path, token):
+            if record["passed"]:
+                passed.add(config_prefix + Sweep.config_name(record["generics"]))
+                new = new + exploration.coverage.hit(Run(record["generics"], record["monitors"]))
+        # no record: the simulation failed before its post_check.
+        failed = failed + sorted(set(configs) - passed)
+        total = total + len(configs)
+        idle = 0 if new else idle + 1
+        print("explore round %d: %d configs, %d failed, %d new bins" % (
+            rnd, len(configs), len(set(configs) - passed), new))
+
+    print("Coverage after %d configurations:" % total)
+    for line in exploration.coverage.lines():
+        print(line)
+    for name in failed:
+        print("failed: " + name)
+    with open(join(output_path, "explore_report.json"), "w") as f:
+        json.dump({"configs": total, "rounds": rnd, "complete": exploration.coverage.complete(),
+                   "coverage": exploration.coverage.summary(), "failed": failed}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,456 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# GHDL simulator interface that elaborates each testbench once per run.
+#
+# VUnit starts every test with "ghdl --elab-run", so with the llvm and gcc
+# backends each test elaborates and links the design again, even when its
+# configuration only changes generics that the design structure does not
+# depend on (run_time, seeds, test selectors, runner_cfg). Here the executable
+# is built once per testbench and set of structural generics, under
+# <simulator output>/elab/. The structural generics are elaborated in with -g
+# options of ghdl -e, and every test runs the executable with its other
+# generics as -g run options.
+#
+# A testbench generic is structural when it is used in a generic map, a
+# generate statement or a declaration of the testbench architecture; see
+# structural_generics(). mcode keeps no executable and falls back to
+# --elab-run, as do GUI and coverage runs.
+#
+# No waveform is written unless --gtkwave-fmt asks for one. When a simulation
+# fails, the same command (same generics, so same seeds) runs again and dumps
+# <test output>/ghdl/wave_fail.vcd.gz, limited by a --read-wave-opt file to the
+# hierarchies in fail_waves[testbench] (the testbench top level by default).
+#
+# Tests that tools.profiles puts on the fast-run profile use another GHDL
+# and/or -O2, with their own copy of the libraries and executables, cached
+# external libraries included.
+#
+# Compile seconds per library, and elaboration, simulation wall time, peak
+# memory and simulated time per test are kept for tools.perf.
+#--------------------------------------------------------------------------------
+from os.path import join, exists
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from vunit.project import Project
+from vunit.sim_if.ghdl import GHDLInterface
+
+# runner_cfg changes with every test, VUnit never elaborates it in.
+runtime_always = ["runner_cfg"]
+
+comment_re = re.compile(r"--[^\n]*")
+architecture_re = re.compile(r"\barchitecture\s+\w+\s+of\s+\w+\s+is\b")
+generic_map_re = re.compile(r"\bgeneric\s+map\s*\(")
+generate_re = re.compile(r"\b\w+\s*:\s*(?:if|for)\b[^;]*?\bgenerate\b")
+declaration_re = re.compile(r"\b(?:signal|constant|variable|type|subtype|alias)\s[^;]*;")
+
+
+# GHDL reports "simulation stopped @2275ns" (std.env.stop) and "file:l:c:@1us:(report ...".
+sim_time_re = re.compile(r"@(\d+(?:\.\d+)?)(fs|ps|ns|us|ms|sec)\b")
+ns_per_unit = {"fs": 1e-6, "ps": 1e-3, "ns": 1.0, "us": 1e3, "ms": 1e6, "sec": 1e9}
+
+
+class Run:
+    # runs cmd to completion, echoing its output (VUnit captures it per test).
+    # Records wall seconds, the last simulation time printed and, where the OS
+    # reports it, the peak resident memory of the process.
+    #
+    # On Linux the peak is VmHWM polled from /proc, which starts over at exec;
+    # ru_maxrss from wait4 also counts the runner's own memory the child was
+    # forked from, so it is only the fallback for runs too short to poll.
+    poll_seconds = 0.2
+
+    def __init__(self, cmd, env=None):
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                universal_newlines=True, errors="replace")
+        self.peak_rss_kb = None
+        done = threading.Event()
+        watcher = threading.Thread(target=self.watch, args=(proc.pid, done), daemon=True)
+        watcher.start()
+        self.sim_ns = None
+        for line in proc.stdout:
+            print(line.rstrip("\n"))
+            times = sim_time_re.findall(line)
+            if times:
+                value, unit = times[-1]
+                self.sim_ns = float(value) * ns_per_unit[unit]
+        # stop polling before the pid is reaped and can be reused.
+        done.set()
+        watcher.join()
+        maxrss = None
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in bytes on macOS, kilobytes elsewhere.
+            maxrss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        else:
+            proc.wait()
+        if self.peak_rss_kb is None:
+            self.peak_rss_kb = maxrss
+        proc.stdout.close()
+        self.seconds = time.perf_counter() - start
+        self.passed = proc.returncode == 0
+
+    def watch(self, pid, done):
+        status_file = "/proc/%d/status" % pid
+        while True:
+            try:
+                with open(status_file) as f:
+                    hwm = [line.split()[1] for line in f if line.startswith("VmHWM:")]
+            except OSError:
+                return
+            if hwm:
+                self.peak_rss_kb = max(self.peak_rss_kb or 0, int(hwm[0]))
+            if done.wait(self.poll_seconds):
+                return
+
+
+def paren_block(text, start):
+    # text from start (just after an opening parenthesis) to its closing one.
+    depth = 1
+    for pos in range(start, len(text)):
+        if text[pos] == "(":
+            depth = depth + 1
+        elif text[pos] == ")":
+            depth = depth - 1
+            if depth == 0:
+                return text[start:pos]
+    return text[start:]
+
+
+def structural_generics(vhd_file, generic_names):
+    with open(vhd_file, encoding="latin-1") as f:
+        text = comment_re.sub("", f.read().lower())
+    match = architecture_re.search(text)
+    arch = text[match.end():] if match else text
+
+    regions = [paren_block(arch, m.end()) for m in generic_map_re.finditer(arch)]
+    regions = regions + generate_re.findall(arch) + declaration_re.findall(arch)
+    structural = []
+    for name in generic_names:
+        if name.lower() in runtime_always:
+            continue
+        name_re = re.compile(r"\b%s\b" % re.escape(name.lower()))
+        if any(name_re.search(region) for region in regions):
+            structural.append(name)
+    return structural
+
+
+class GHDL(GHDLInterface):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._structural = {}
+        self._built = {}
+        self._lock = threading.Lock()
+        # False runs every test with --elab-run, as GHDLInterface does.
+        self.reuse = True
+        self.elaborations = 0
+        self.reused = 0
+        # {testbench: [hierarchy, ...]} dumped on failure, None disables the rerun.
+        self.fail_waves = None
+        # {test suite: wave file} of the failed tests.
+        self.waves = {}
+        # {library: {"files", "seconds"}} and {test suite: {...}}, see tools.perf.
+        self.compile_stats = {}
+        self.test_stats = {}
+        # tools.profiles: fast_run is None when there is no faster backend.
+        self.selector = None
+        self.fast_run = None
+        self._profiles = {}
+        # {library: source files} of the external libraries tools.lib_cache
+        # handed to VUnit, compiled again for a profile.
+        self.external_sources = {}
+
+    def _entity(self, config):
+        library = self._project.get_library(config.library_name)
+        for entity in library.get_entities():
+            if entity.name.lower() == config.entity_name.lower():
+                return entity
+        return None
+
+    def structural(self, config):
+        key = (config.library_name, config.entity_name)
+        if key not in self._structural:
+            entity = self._entity(config)
+            if entity is None:
+                # unknown top, every generic counts as structural.
+                names = [name for name in config.generics if name not in runtime_always]
+            else:
+                names = structural_generics(entity.source_file.name, entity.generic_names)
+            self._structural[key] = names
+        return self._structural[key]
+
+    def elab_key(self, config, profile=None):
+        generics = {name.lower(): value for name, value in config.generics.items()}
+        sha = hashlib.sha256()
+        for item in [config.library_name, config.entity_name, config.architecture_name]:
+            sha.update(item.encode() + b"\0")
+        for name in sorted(name.lower() for name in self.structural(config)):
+            sha.update(("%s=%s\0" % (name, generics.get(name))).encode())
+        for flag in config.sim_options.get("ghdl.elab_flags", []):
+            sha.update(flag.encode() + b"\0")
+        key = "%s-%s" % (config.entity_name, sha.hexdigest()[:12])
+        return key if profile is None else join(profile.name, key)
+
+    def elab_generics(self, config):
+        # -g options of ghdl -e; the executable is built for these values.
+        structural = set(name.lower() for name in self.structural(config))
+        return ["-g%s=%s" % (name, value) for name, value in config.generics.items()
+                if name.lower() in structural]
+
+    def run_generics(self, config):
+        structural = set(name.lower() for name in self.structural(config))
+        return {name: value for name, value in config.generics.items() if name.lower() not in structural}
+
+    def reusable(self, config, elaborate_only, profile=None):
+        has_output_flag = self._has_output_flag() if profile is None else profile.has_output_flag()
+        return (self.reuse and has_output_flag and not elaborate_only
+                and not config.sim_options.get("enable_coverage", False))
+
+    def profile(self, test_suite_name, config):
+        # None for fast-compile, which is what VUnit itself compiled.
+        if self.selector is None or self.fast_run is None:
+            return None
+        if config.sim_options.get("enable_coverage", False):
+            return None
+        if self.selector.profile(test_suite_name) != self.fast_run.name:
+            return None
+        return self.fast_run
+
+    def retarget(self, cmd, profile, dirs):
+        # a VUnit ghdl command, run with the profile's GHDL and libraries.
+        cmd = list(cmd)
+        cmd[0] = join(profile.prefix, self.executable)
+        for pos, arg in enumerate(cmd):
+            if arg.startswith("--workdir="):
+                cmd[pos] = "--workdir=" + dirs.get(arg[len("--workdir="):], arg[len("--workdir="):])
+            elif arg.startswith("-P"):
+                cmd[pos] = "-P" + dirs.get(arg[2:], arg[2:])
+        return cmd
+
+    def profile_libraries(self, profile):
+        # compiled once per run by the first test that needs them; returns
+        # {VUnit library directory: profile library directory}, None on failure.
+        with self._lock:
+            entry = self._profiles.get(profile.name)
+            if entry is None:
+                entry = self._profiles[profile.name] = {"lock": threading.Lock(), "dirs": None, "done": False}
+        with entry["lock"]:
+            if not entry["done"]:
+                entry["dirs"] = self.compile_profile(profile)
+                entry["done"] = True
+        return entry["dirs"]
+
+    def external_files(self, base):
+        # sources of the external libraries that came from the library cache,
+        # in compile order, as files of libraries under base.
+        external = Project()
+        for library in self._project.get_libraries():
+            if library.is_external and library.name in self.external_sources:
+                external.add_library(library.name, join(base, library.name), library.vhdl_standard)
+                for file_name in self.external_sources[library.name]:
+                    external.add_source_file(file_name, library.name, vhdl_standard=library.vhdl_standard)
+        return external.get_files_in_compile_order(incremental=False)
+
+    def compile_profile(self, profile):
+        # files are analysed again from the first one whose source or command
+        # changed since the last run, in compile order, so dependents follow.
+        # Cached external libraries were built by the default GHDL and flags,
+        # so they are compiled again from their sources too; other external
+        # libraries are used as they are.
+        base = join(self._output_path, "profiles", profile.name)
+        dirs = {}
+        for library in self._project.get_libraries():
+            directory = str(library.directory)
+            if library.is_external and library.name not in self.external_sources:
+                dirs[directory] = directory
+            else:
+                dirs[directory] = join(base, library.name)
+            os.makedirs(dirs[directory], exist_ok=True)
+        stamps_file = join(base, "compiled.json")
+        old = {}
+        if exists(stamps_file):
+            with open(stamps_file) as f:
+                old = json.load(f)
+        stamps = {}
+        dirty = False
+        failed = False
+        source_files = self.external_files(base) + self._project.get_files_in_compile_order(incremental=False)
+        print("Compiling %d files for the %s profile" % (len(source_files), profile.name))
+        for source_file in source_files:
+            cmd = self.retarget(self.compile_vhdl_file_command(source_file), profile, dirs)
+            cmd = cmd[:-1] + profile.a_flags + cmd[-1:]
+            sha = hashlib.sha256("\0".join(cmd).encode())
+            with open(source_file.name, "rb") as f:
+                sha.update(f.read())
+            dirty = dirty or old.get(source_file.name) != sha.hexdigest()
+            if dirty:
+                start = time.perf_counter()
+                result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        universal_newlines=True, errors="replace")
+                self.record_compile("%s:%s" % (profile.name, source_file.library.name),
+                                    time.perf_counter() - start)
+                if result.returncode != 0:
+                    print(result.stdout)
+                    print("Failed to compile %s for the %s profile" % (source_file.name, profile.name))
+                    failed = True
+                    break
+            stamps[source_file.name] = sha.hexdigest()
+        with open(stamps_file, "w") as f:
+            json.dump(stamps, f, indent=2)
+        return None if failed else dirs
+
+    def command(self, config, output_path, elaborate_only, ghdl_e, wave_file, profile=None):
+        cmd = self._get_command(config, output_path, elaborate_only, ghdl_e, wave_file)
+        if profile is None:
+            return cmd
+        dirs = self.profile_libraries(profile)
+        if dirs is None:
+            return None
+        cmd = self.retarget(cmd, profile, dirs)
+        # the VUnit backend decided on -o, the profile's one may differ.
+        if "-o" in cmd:
+            pos = cmd.index("-o")
+            del cmd[pos:pos + 2]
+        elab = list(profile.elab_flags)
+        if profile.has_output_flag():
+            elab = ["-o", join(output_path, "%s-%s" % (config.entity_name, config.architecture_name))] + elab
+        pos = cmd.index(config.entity_name, 1)
+        return cmd[:pos] + elab + cmd[pos:]
+
+    def elaborated(self, config, profile=None):
+        # elaborates on first use in this run, later tests with the same key wait
+        # for it. Returns (binary, seconds spent elaborating), binary None when
+        # elaboration failed.
+        key = self.elab_key(config, profile)
+        with self._lock:
+            entry = self._built.get(key)
+            if entry is None:
+                entry = self._built[key] = {"lock": threading.Lock(), "binary": None, "done": False}
+        seconds = 0.0
+        with entry["lock"]:
+            if not entry["done"]:
+                path = join(self._output_path, "elab", key)
+                cmd = self.command(config, path, True, True, None, profile)
+                if cmd is not None:
+                    pos = cmd.index(config.entity_name, 1)
+                    cmd = cmd[:pos] + self.elab_generics(config) + cmd[pos:]
+                elab = Run(cmd) if cmd is not None else None
+                if elab is not None and elab.passed:
+                    entry["binary"] = join(path, "%s-%s" % (config.entity_name, config.architecture_name))
+                entry["done"] = True
+                seconds = elab.seconds if elab is not None else 0.0
+        with self._lock:
+            if seconds:
+                self.elaborations = self.elaborations + 1
+            else:
+                self.reused = self.reused + 1
+        return entry["binary"], seconds
+
+    def sim_flags(self, config, generics, wave_file=None):
+        sim = list(config.sim_options.get("ghdl.sim_flags", []))
+        sim = sim + ["-g%s=%s" % (name, value) for name, value in generics.items()]
+        sim.append("--assert-level=%s" % config.vhdl_assert_stop_level)
+        if config.sim_options.get("disable_ieee_warnings", False):
+            sim.append("--ieee-asserts=disable")
+        if wave_file:
+            sim.append(("--wave=%s" if self._gtkwave_fmt == "ghw" else "--vcd=%s") % wave_file)
+        return sim
+
+    def wave_scopes(self, config):
+        scopes = self.fail_waves.get("*") or self.fail_waves.get(config.entity_name.lower())
+        return scopes or ["/%s/*" % config.entity_name.lower()]
+
+    def wave_rerun(self, cmd, output_path, test_suite_name, config):
+        script_path = join(output_path, self.name)
+        os.makedirs(script_path, exist_ok=True)
+        opt_file = join(script_path, "wave_fail.opt")
+        wave_file = join(script_path, "wave_fail.vcd.gz")
+        with open(opt_file, "w") as f:
+            f.write("$ version 1.1\n")
+            for scope in self.wave_scopes(config):
+                f.write(scope + "\n")
+        print("Failed, simulating again with waves of " + ", ".join(self.wave_scopes(config)))
+        Run(cmd + ["--read-wave-opt=" + opt_file, "--vcdgz=" + wave_file])
+        if exists(wave_file):
+            print("Waveform: " + wave_file)
+            with self._lock:
+                self.waves[test_suite_name] = wave_file
+
+    def _compile_source_file(self, source_file, printer):
+        start = time.perf_counter()
+        status = super()._compile_source_file(source_file, printer)
+        self.record_compile(source_file.library.name, time.perf_counter() - start)
+        return status
+
+    def record_compile(self, library, seconds):
+        with self._lock:
+            lib = self.compile_stats.setdefault(library, {"files": 0, "seconds": 0.0})
+            lib["files"] = lib["files"] + 1
+            lib["seconds"] = lib["seconds"] + seconds
+
+    def simulate(self, output_path, test_suite_name, config, elaborate_only):
+        if self._gui:
+            return super().simulate(output_path, test_suite_name, config, elaborate_only)
+
+        script_path = join(output_path, self.name)
+        os.makedirs(script_path, exist_ok=True)
+        wave_file = None
+        if self._gtkwave_fmt is not None:
+            wave_file = join(script_path, "wave." + self._gtkwave_fmt)
+            if exists(wave_file):
+                os.remove(wave_file)
+        env = None
+        if config.sim_options.get("enable_coverage", False):
+            coverage_dir = join(output_path, "coverage")
+            env = dict(os.environ, GCOV_PREFIX=coverage_dir)
+            self._coverage_test_dirs.add(coverage_dir)
+
+        profile = self.profile(test_suite_name, config)
+        profile_name = "fast-compile" if profile is None else profile.name
+        if self.reusable(config, elaborate_only, profile):
+            binary, elaborate = self.elaborated(config, profile)
+            if binary is None:
+                self.record(test_suite_name, profile=profile_name, elaborate=elaborate)
+                return False
+            cmd = [binary] + self.sim_flags(config, self.run_generics(config), wave_file)
+        else:
+            # --elab-run: elaboration is part of the simulation time.
+            elaborate = None
+            ghdl_e = elaborate_only and config.sim_options.get("ghdl.elab_e", False)
+            cmd = self.command(config, script_path, elaborate_only, ghdl_e, wave_file, profile)
+            if cmd is None:
+                self.record(test_suite_name, profile=profile_name)
+                return False
+
+        sim = Run(cmd, env)
+        if not elaborate_only:
+            self.record(test_suite_name, profile=profile_name, elaborate=elaborate, simulate=sim.seconds,
+                        peak_rss_kb=sim.peak_rss_kb, sim_ns=sim.sim_ns)
+        rerun = self.fail_waves is not None and not elaborate_only and self._gtkwave_fmt is None
+        if not sim.passed and rerun:
+            self.wave_rerun(cmd, output_path, test_suite_name, config)
+        return sim.passed
+
+    def record(self, test_suite_name, **stats):
+        with self._lock:
+            self.test_stats[test_suite_name] = stats
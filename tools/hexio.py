@@ -0,0 +1,83 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Fixed width hex text files, as read and written by VHDL textio hread/hwrite.
+#
+# One line per beat, one space separated hex field per column:
+#   "05 02 1 a7\n"
+# Every line has the same width, so whole files are encoded and decoded as a
+# single NumPy array without a Python loop per line.
+#--------------------------------------------------------------------------------
+import numpy as np
+
+hex_digits = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+
+hex_values = np.full(256, 255, dtype=np.uint8)
+for value, char in enumerate(b"0123456789abcdef"):
+    hex_values[char] = value
+    hex_values[ord(chr(char).upper())] = value
+
+
+def digits(bits):
+    return (bits + 3) // 4
+
+
+def encode(columns, widths):
+    # columns: unsigned integer arrays of the same length; widths: hex digits of each.
+    size = len(columns[0])
+    line_len = sum(widths) + len(widths)
+    lines = np.empty((size, line_len), dtype=np.uint8)
+    pos = 0
+    for values, width in zip(columns, widths):
+        values = np.asarray(values, dtype=np.uint64)
+        shifts = np.arange(width - 1, -1, -1, dtype=np.uint64) * np.uint64(4)
+        lines[:, pos:pos + width] = hex_digits[(values[:, None] >> shifts) & np.uint64(0xF)]
+        lines[:, pos + width] = ord(" ")
+        pos = pos + width + 1
+    lines[:, -1] = ord("\n")
+    return lines.tobytes()
+
+
+def decode(data, widths):
+    raw = np.frombuffer(data, dtype=np.uint8)
+    line_len = sum(widths) + len(widths)
+    if raw.size % line_len:
+        raise ValueError("hex file is not made of %d character lines" % line_len)
+    lines = raw.reshape(-1, line_len)
+
+    columns = []
+    pos = 0
+    for width in widths:
+        nibbles = hex_values[lines[:, pos:pos + width]]
+        bad = np.flatnonzero((nibbles == 255).any(axis=1))
+        if bad.size:
+            # usually an 'X' or 'U' written by hwrite.
+            line = lines[bad[0]].tobytes().decode(errors="replace").rstrip()
+            raise ValueError("line %d is not hex: '%s'" % (bad[0] + 1, line))
+        value = np.zeros(len(lines), dtype=np.uint64)
+        for j in range(width):
+            value = (value << np.uint64(4)) | nibbles[:, j].astype(np.uint64)
+        columns.append(value)
+        pos = pos + width + 1
+    return columns
+
+
+def write(path, columns, widths):
+    with open(path, "wb") as f:
+        f.write(encode(columns, widths))
+
+
+def read(path, widths):
+    with open(path, "rb") as f:
+        return decode(f.read(), widths)
@@ -0,0 +1,61 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Wall time of every test from previous runs, stored as a small JSON file:
+#   {"stdcores.can_aximm_top_tb.run_time.Simple Run": 16.02, ...}
+#--------------------------------------------------------------------------------
+from os.path import isfile, dirname, abspath
+import json
+import os
+
+recorded_status = ["passed", "failed"]
+
+
+class History:
+    def __init__(self, path):
+        self.path = abspath(path) if path else None
+        self.tests = {}
+        if self.path and isfile(self.path):
+            with open(self.path) as f:
+                self.tests = json.load(f)
+
+    @classmethod
+    def empty(cls):
+        # no durations known: every test costs the same and keeps VUnit's order.
+        return cls(None)
+
+    def duration(self, test_name, default=None):
+        return self.tests.get(test_name, default)
+
+    def cost(self, test_names):
+        # tests never seen before are scheduled as the longest known one.
+        unknown = max(self.tests.values(), default=0.0)
+        return sum(self.duration(name, unknown) for name in test_names)
+
+    def order(self, test_suites):
+        # longest first, so the slow tail starts early. Stable for equal costs.
+        test_suites.sort(key=lambda suite: -self.cost(suite.test_names))
+
+    def record(self, report):
+        # report: vunit.ui.results.Report, as given by results.get_report().
+        for name, result in report.tests.items():
+            if result.status.name in recorded_status:
+                self.tests[name] = round(result.time, 3)
+
+    def save(self):
+        os.makedirs(dirname(self.path), exist_ok=True)
+        temp = self.path + ".tmp"
+        with open(temp, "w") as f:
+            json.dump(self.tests, f, indent=2, sort_keys=True)
+        os.replace(temp, self.path)
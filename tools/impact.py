@@ -0,0 +1,78 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Change impact: which testbenches depend on a list of changed files.
+#
+# VHDL files are looked up in the VUnit dependency graph of the project, so
+# editing axis_mux.vhd selects axis_mux_tb, axis_intercon_tb and
+# aximm_intercon_tb. Python files inside a core directory select that core's
+# testbenches; any other Python file (run_all.py, tools/) selects everything,
+# and so does any other kind of file (stimulus, headers, requirements).
+#--------------------------------------------------------------------------------
+from os.path import join, isdir, realpath, dirname, basename, splitext
+import os
+import subprocess
+
+from tools.cores import root
+
+
+def git_changed_files(rev):
+    # committed, staged and unstaged changes since rev, plus untracked files.
+    def git(*cmd):
+        out = subprocess.run(["git"] + list(cmd), cwd=root, capture_output=True, text=True, check=True)
+        return [line for line in out.stdout.splitlines() if line]
+
+    top = git("rev-parse", "--show-toplevel")[0]
+    files = git("diff", "--name-only", rev) + git("ls-files", "--others", "--exclude-standard")
+    return [join(top, name) for name in files]
+
+
+def expand(paths):
+    # directories (e.g. a bumped dependencies/stdblocks submodule) count as all their files.
+    files = []
+    for path in paths:
+        if isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                files = files + [join(dirpath, name) for name in filenames]
+        else:
+            files.append(path)
+    return [realpath(path) for path in files]
+
+
+def affected_testbenches(vu, changed):
+    # returns {"library.testbench"}, or None when everything must run.
+    changed = expand(changed)
+    hdl_changed = set(path for path in changed if path.endswith((".vhd", ".vhdl")))
+    py_changed = [path for path in changed if path.endswith(".py")]
+    if any(not path.endswith((".vhd", ".vhdl", ".py")) for path in changed):
+        return None
+
+    testbenches = {}
+    for source_file in vu.get_source_files("*_tb.vhd"):
+        tb_name = source_file.library.name + "." + splitext(basename(source_file.name))[0]
+        testbenches[tb_name] = source_file
+
+    affected = set()
+    for path in py_changed:
+        tb_dirs = [tb for tb, source_file in testbenches.items()
+                   if realpath(dirname(source_file.name)) == dirname(path)]
+        if not tb_dirs:
+            return None
+        affected.update(tb_dirs)
+
+    for tb_name, source_file in testbenches.items():
+        compile_order = vu.get_compile_order([source_file])
+        if any(realpath(dep.name) in hdl_changed for dep in compile_order):
+            affected.add(tb_name)
+    return affected
@@ -0,0 +1,131 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Cache of precompiled VHDL libraries (expert, stdblocks).
+#
+# Each library is stored under <cache>/<name>-<key>, where key is a hash of
+# the source contents, the simulator (name and version), VHDL standard, compile
+# flags and the keys of the libraries it depends on. A hit is handed to VUnit as
+# an external library, so it is not compiled at all. A miss is compiled as usual
+# and copied to the cache after the run.
+#
+# Simulators such as GHDL record absolute source paths in the compiled library,
+# so those paths are part of the key: machines sharing one cache directory need
+# the same checkout path (CI runners usually have it).
+#--------------------------------------------------------------------------------
+from os.path import join, isdir, isfile, abspath
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+cache_env = "STDCORES_LIB_CACHE"
+done_marker = ".complete"
+
+version_cmd = {
+    "ghdl": ["ghdl", "--version"],
+    "nvc": ["nvc", "--version"],
+    "modelsim": ["vsim", "-version"],
+    "rivierapro": ["vsim", "-version"],
+    "activehdl": ["vsimsa", "-version"],
+}
+
+
+def simulator_version(simulator):
+    cmd = version_cmd.get(simulator)
+    if cmd is None or shutil.which(cmd[0]) is None:
+        return "unknown"
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=30).stdout
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    lines = out.strip().splitlines()
+    return lines[0] if lines else "unknown"
+
+
+def vunit_version():
+    try:
+        from vunit.about import version
+        return version()
+    except ImportError:
+        return "unknown"
+
+
+class LibraryCache:
+    def __init__(self, cache_path, simulator, flags=()):
+        self.path = abspath(cache_path)
+        self.simulator = simulator
+        self.flags = list(flags)
+        self.keys = {}
+        self.hits = []
+        self.pending = []
+        # {name: source files} of the hits, for the GHDL profiles to compile again.
+        self.sources = {}
+        self._context = "\n".join([
+            simulator,
+            simulator_version(simulator),
+            vunit_version(),
+            os.environ.get("VUNIT_VHDL_STANDARD", "2008"),
+        ] + self.flags)
+
+    def key(self, name, files, depends=()):
+        sha = hashlib.sha256()
+        sha.update(self._context.encode())
+        sha.update(name.encode())
+        for dep in depends:
+            sha.update(self.keys[dep].encode())
+        for vhd_file in sorted(abspath(f) for f in files):
+            sha.update(vhd_file.encode())
+            with open(vhd_file, "rb") as f:
+                sha.update(hashlib.sha256(f.read()).digest())
+        return sha.hexdigest()[:24]
+
+    def entry(self, name):
+        return join(self.path, name + "-" + self.keys[name])
+
+    def add_library(self, vu, name, files, depends=()):
+        self.keys[name] = self.key(name, files, depends)
+        entry = self.entry(name)
+        if isfile(join(entry, done_marker)):
+            vu.add_external_library(name, join(entry, "lib"))
+            self.hits.append(name)
+            self.sources[name] = list(files)
+            return None
+        lib = vu.add_library(name)
+        lib.add_source_files(files)
+        self.pending.append(name)
+        return lib
+
+    def store(self, output_path):
+        # output_path is VUnit's --output-path; compiled libraries live in
+        # <output_path>/<simulator>/libraries/<name>.
+        os.makedirs(self.path, exist_ok=True)
+        for name in self.pending:
+            compiled = join(abspath(output_path), self.simulator, "libraries", name)
+            entry = self.entry(name)
+            if not isdir(compiled) or isfile(join(entry, done_marker)):
+                continue
+            if isdir(entry):
+                # left behind by an interrupted store.
+                shutil.rmtree(entry, ignore_errors=True)
+            staging = tempfile.mkdtemp(prefix=name + "-", dir=self.path)
+            shutil.copytree(compiled, join(staging, "lib"))
+            open(join(staging, done_marker), "w").close()
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                # another run stored the same entry first.
+                shutil.rmtree(staging, ignore_errors=True)
+        self.pending = []
@@ -0,0 +1,111 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Dependency manifest for expert, stdblocks and stdcores sources.
+#
+# Every candidate file is scanned once for the design units it declares and the
+# ones it uses (use/context clauses, entity and component instantiations). From
+# there, closure() returns the smallest set of files, per library, needed to
+# compile a list of top level files (usually testbenches).
+#--------------------------------------------------------------------------------
+import re
+
+# libraries that come from the simulator or from VUnit itself.
+external_libs = ["ieee", "std", "vunit_lib", "osvvm"]
+
+comment_re = re.compile(r"--[^\n]*")
+entity_re = re.compile(r"\bentity\s+(\w+)\s+is\b")
+package_re = re.compile(r"\bpackage\s+(?!body\b)(\w+)\s+is\b")
+body_re = re.compile(r"\bpackage\s+body\s+(\w+)\s+is\b")
+context_decl_re = re.compile(r"\bcontext\s+(\w+)\s+is\b")
+architecture_re = re.compile(r"\barchitecture\s+\w+\s+of\s+(\w+)\s+is\b")
+use_re = re.compile(r"\buse\s+(\w+)\.(\w+)")
+context_use_re = re.compile(r"\bcontext\s+(\w+)\.(\w+)\s*;")
+instance_new_re = re.compile(r"\bis\s+new\s+(\w+)\.(\w+)")
+entity_inst_re = re.compile(r"\bentity\s+(\w+)\.(\w+)")
+component_inst_re = re.compile(r"\b\w+\s*:\s*(?:component\s+)?(\w+)\s+(?:generic|port)\s+map\b")
+
+
+class DesignFile:
+    def __init__(self, path, library):
+        self.path = path
+        self.library = library
+        with open(path, encoding="latin-1") as f:
+            text = comment_re.sub("", f.read().lower())
+
+        self.entities = entity_re.findall(text)
+        self.packages = package_re.findall(text) + context_decl_re.findall(text)
+        self.bodies = body_re.findall(text)
+        self.architectures = architecture_re.findall(text)
+
+        # (library, unit); library None means "any library, own library first".
+        refs = use_re.findall(text) + context_use_re.findall(text) + instance_new_re.findall(text)
+        refs = refs + entity_inst_re.findall(text)
+        refs = refs + [(None, name) for name in component_inst_re.findall(text)]
+        refs = refs + [(None, name) for name in self.architectures + self.bodies]
+        self.refs = [(lib, unit) for lib, unit in refs if lib not in external_libs]
+
+
+class Manifest:
+    def __init__(self, sources):
+        # sources: {library: [files]}, in compile order preference.
+        self.files = {}
+        self.units = {}
+        self.extras = {}
+        for library, filelist in sources.items():
+            self.units[library] = {}
+            self.extras[library] = {}
+            for path in filelist:
+                self.add_file(DesignFile(path, library))
+
+    def add_file(self, design_file):
+        self.files[design_file.path] = design_file
+        units = self.units[design_file.library]
+        extras = self.extras[design_file.library]
+        for name in design_file.entities + design_file.packages:
+            units.setdefault(name, []).append(design_file.path)
+        # architectures and package bodies come along with what they implement.
+        for name in design_file.architectures + design_file.bodies:
+            extras.setdefault(name, []).append(design_file.path)
+
+    def resolve(self, design_file, lib, unit):
+        if lib == "work":
+            lib = design_file.library
+        if lib is not None:
+            search = [lib]
+        else:
+            search = [design_file.library] + [l for l in self.units if l != design_file.library]
+        for library in search:
+            if unit in self.units.get(library, {}):
+                return self.units[library][unit] + self.extras[library].get(unit, [])
+        return []
+
+    def closure(self, top_files):
+        needed = set()
+        pending = list(top_files)
+        while pending:
+            path = pending.pop()
+            if path in needed or path not in self.files:
+                continue
+            needed.add(path)
+            design_file = self.files[path]
+            for lib, unit in design_file.refs:
+                pending = pending + self.resolve(design_file, lib, unit)
+
+        result = {}
+        for path, design_file in self.files.items():
+            if path in needed:
+                result.setdefault(design_file.library, []).append(path)
+        return result
+
@@ -0,0 +1,137 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# RAM images for the backdoor of aximm_ram and aximm_dpram (see
+# verification_ip/ram_backdoor_pkg.vhd): one word per RAM address, in a
+# "*.bin" file (little endian, whole bytes per word) or hex text otherwise.
+#
+# A backdoor test writes a random image before the simulation, the testbench
+# preloads the RAM with it and dumps the RAM at the end; compare() then checks
+# every word at once, with only the words the bus traffic touched patched in.
+#--------------------------------------------------------------------------------
+from os.path import join
+import argparse
+import functools
+
+import numpy as np
+
+from tools import hexio
+
+image_name = "ram_image.hex"
+dump_name = "ram_dump.hex"
+tested_count = 4
+
+
+def mask(width):
+    return np.uint64((1 << width) - 1)
+
+
+def write(path, words, width):
+    words = np.asarray(words, dtype=np.uint64) & mask(width)
+    if path.endswith(".bin"):
+        size = (width + 7) // 8
+        raw = words.astype("<u8").view(np.uint8).reshape(-1, 8)[:, :size]
+        with open(path, "wb") as f:
+            f.write(raw.tobytes())
+    else:
+        hexio.write(path, [words], [hexio.digits(width)])
+
+
+def read(path, width):
+    if path.endswith(".bin"):
+        size = (width + 7) // 8
+        raw = np.fromfile(path, dtype=np.uint8)
+        if raw.size % size:
+            raise ValueError("%s is not made of %d byte words" % (path, size))
+        words = np.zeros((raw.size // size, 8), dtype=np.uint8)
+        words[:, :size] = raw.reshape(-1, size)
+        return words.view("<u8").ravel().astype(np.uint64) & mask(width)
+    with open(path, "rb") as f:
+        return hexio.decode(f.read(), [hexio.digits(width)])[0]
+
+
+def random_image(size, width, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 1 << width, size, dtype=np.uint64, endpoint=False)
+
+
+class Diff:
+    def __init__(self, actual, expected):
+        self.size = len(expected)
+        if len(actual) != self.size:
+            raise ValueError("dump has %d words, expected %d" % (len(actual), self.size))
+        self.address = np.flatnonzero(actual != expected)
+        self.actual = actual[self.address]
+        self.expected = expected[self.address]
+
+    def passed(self):
+        return self.address.size == 0
+
+    def lines(self, limit=20):
+        yield "%d of %d words differ" % (self.address.size, self.size)
+        for address, actual, expected in list(zip(self.address, self.actual, self.expected))[:limit]:
+            yield "  @%04X: %X, expected %X" % (address, actual, expected)
+
+
+def compare(dump, image, width, writes=None):
+    # writes: {address: word} of the bus traffic, on top of the preloaded image.
+    expected = np.asarray(image, dtype=np.uint64).copy()
+    if writes:
+        expected[np.fromiter(writes.keys(), dtype=np.int64)] = np.fromiter(writes.values(), dtype=np.uint64)
+    return Diff(read(dump, width), expected & mask(width))
+
+
+def tested_words(image, width, count=tested_count):
+    # what the backdoor tests write: count words spread over the RAM, inverted.
+    # TESTED_WORDS and TESTED_STEP of the testbenches.
+    address = np.arange(count) * (len(image) // count)
+    return dict(zip(address.tolist(), (~image[address] & mask(width)).tolist()))
+
+
+def pre_config(size, width, seed, output_path):
+    write(join(output_path, image_name), random_image(size, width, seed), width)
+    return True
+
+
+def post_check(size, width, seed, output_path):
+    image = random_image(size, width, seed)
+    diff = compare(join(output_path, dump_name), image, width, tested_words(image, width))
+    if not diff.passed():
+        for line in diff.lines():
+            print(line)
+    return diff.passed()
+
+
+def add_backdoor(test_tb, test, addr_width, width, seed=0):
+    test = test_tb.test(test)
+    test.set_generic("backdoor", True)
+    test.set_pre_config(functools.partial(pre_config, 2**addr_width, width, seed))
+    test.set_post_check(functools.partial(post_check, 2**addr_width, width, seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a RAM dump against a RAM image.")
+    parser.add_argument("dump", help="dump written at the end of the simulation.")
+    parser.add_argument("image", help="expected content, .bin or hex text.")
+    parser.add_argument("--width", type=int, default=32, help="word width, in bits.")
+    args = parser.parse_args()
+
+    diff = compare(args.dump, read(args.image, args.width), args.width)
+    for line in diff.lines():
+        print(line)
+    return 0 if diff.passed() else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,87 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Where the regression time goes, written after every run as JSON next to the
+# xunit report (<xunit name>_perf.json, or <output path>/perf.json without one):
+#
+#   "compile": {"stdblocks": {"files": 41, "seconds": 12.3}, "fast-run:stdblocks": {...}, ...}
+#   "tests": {"stdcores.axis_fifo_tb.<config>.<test>": {
+#       "status": "passed", "profile": "fast-compile", "wall": 3.1, "elaborate": 1.2, "simulate": 1.8,
+#       "peak_rss_kb": 51234, "sim_ns": 123450.0, "sim_ns_per_second": 68583.3}}
+#
+# Compile seconds add up the files of each library (they compile in parallel
+# with -p). elaborate is the ghdl -e time of the test that built the executable
+# it runs, 0 when it reused one and null with --elab-run, where elaboration is
+# part of simulate. wall is VUnit's figure for the test, including pre_config
+# and post_check. Tests that share one simulation share its figures. Only
+# tools.ghdl.GHDL measures; with other simulators just status and wall are set.
+#--------------------------------------------------------------------------------
+from os.path import join, splitext, dirname
+import json
+import os
+
+
+def report_file(args):
+    if args.xunit_xml:
+        return splitext(args.xunit_xml)[0] + "_perf.json"
+    return join(args.output_path, "perf.json")
+
+
+def suite_stats(test_stats, test_name):
+    # the simulation a test ran in: its own, or that of its same-sim suite.
+    if test_name in test_stats:
+        return test_stats[test_name]
+    suites = [suite for suite in test_stats if test_name.startswith(suite + ".")]
+    if not suites:
+        return {}
+    return test_stats[max(suites, key=len)]
+
+
+def rounded(value, digits=3):
+    return None if value is None else round(value, digits)
+
+
+def report(results, simulator_if):
+    compile_stats = getattr(simulator_if, "compile_stats", {})
+    test_stats = getattr(simulator_if, "test_stats", {})
+    tests = {}
+    for name, result in results.get_report().tests.items():
+        stats = suite_stats(test_stats, name)
+        simulate = stats.get("simulate")
+        sim_ns = stats.get("sim_ns")
+        rate = None
+        if simulate and sim_ns is not None:
+            rate = sim_ns / simulate
+        tests[name] = {
+            "status": result.status.name,
+            "profile": stats.get("profile"),
+            "wall": rounded(result.time),
+            "elaborate": rounded(stats.get("elaborate")),
+            "simulate": rounded(simulate),
+            "peak_rss_kb": stats.get("peak_rss_kb"),
+            "sim_ns": sim_ns,
+            "sim_ns_per_second": rounded(rate, 1),
+        }
+    return {
+        "compile": {lib: {"files": stats["files"], "seconds": rounded(stats["seconds"])}
+                    for lib, stats in sorted(compile_stats.items())},
+        "tests": tests,
+    }
+
+
+def write(path, perf):
+    os.makedirs(dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(perf, f, indent=2, sort_keys=True)
+        f.write("\n")
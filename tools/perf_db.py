@@ -0,0 +1,200 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Simulation performance history in a local SQLite file (.vunit_perf.db by
+# default, --perf-db). Every regression adds one run, keyed by commit (with a
+# dirty flag), simulator and host, and one row per test from tools.perf: wall
+# time, simulate time, simulated cycles per second and peak memory, with the
+# profile it ran on. Test names carry the VUnit config.
+#
+#   python -m tools.perf_db report                 -> last run against the 5 before
+#   python -m tools.perf_db report --window 10 --threshold 0.5 --metric simulate
+#   python -m tools.perf_db runs
+#
+# report flags a test when its cost rose more than --threshold (0.25 is 25%)
+# over the median of its last --window passed runs with the same simulator and
+# profile. Cost is the metric itself, except for cycles per second, where a
+# lower rate costs more. It exits 1 when something is flagged.
+#--------------------------------------------------------------------------------
+import argparse
+import datetime
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+
+from tools.cores import root, perf_db_file as db_file
+
+schema = """
+create table if not exists runs (
+    id        integer primary key,
+    commit_id text not null,
+    dirty     integer not null,
+    started   text not null,
+    simulator text,
+    host      text
+);
+create table if not exists tests (
+    run_id            integer not null references runs(id),
+    name              text not null,
+    status            text not null,
+    profile           text,
+    wall              real,
+    simulate          real,
+    cycles_per_second real,
+    peak_rss_kb       integer,
+    primary key (run_id, name)
+);
+create index if not exists tests_name on tests(name);
+"""
+
+# metric: (column, True when a higher value is a higher cost)
+metrics = {
+    "wall":     ("wall", True),
+    "simulate": ("simulate", True),
+    "cycles":   ("cycles_per_second", False),
+    "memory":   ("peak_rss_kb", True),
+}
+
+clock_re = re.compile(r"<=\s*not\s+(\w+)\s+after\s+(\d+(?:\.\d+)?)\s*ns", re.IGNORECASE)
+
+
+def clock_period_ns(vhd_file):
+    # twice the half period of the first "clk <= not clk after N ns", else None.
+    with open(vhd_file, encoding="latin-1") as f:
+        match = clock_re.search(f.read())
+    return 2 * float(match.group(2)) if match else None
+
+
+def git_commit():
+    # (commit, dirty), ("unknown", False) outside a git checkout.
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(status.strip())
+
+
+def testbench(test_name):
+    parts = test_name.split(".")
+    return parts[1] if len(parts) > 1 else test_name
+
+
+class PerfDB:
+    def __init__(self, path=db_file):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.executescript(schema)
+
+    def close(self):
+        self.conn.close()
+
+    def add_run(self, perf, simulator=None, clock_periods=None, commit=None):
+        # perf: tools.perf.report(); clock_periods: {testbench: ns}.
+        commit_id, dirty = commit or git_commit()
+        clock_periods = clock_periods or {}
+        with self.conn:
+            run_id = self.conn.execute(
+                "insert into runs (commit_id, dirty, started, simulator, host) values (?, ?, ?, ?, ?)",
+                (commit_id, int(dirty), datetime.datetime.now().isoformat(timespec="seconds"),
+                 simulator, platform.node())).lastrowid
+            rows = []
+            for name, stats in perf["tests"].items():
+                rate = stats.get("sim_ns_per_second")
+                period = clock_periods.get(testbench(name))
+                cycles = rate / period if rate is not None and period else None
+                rows.append((run_id, name, stats["status"], stats.get("profile"), stats.get("wall"),
+                             stats.get("simulate"), cycles, stats.get("peak_rss_kb")))
+            self.conn.executemany("insert into tests values (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return run_id
+
+    def runs(self, limit=20):
+        return self.conn.execute(
+            "select runs.id, commit_id, dirty, started, simulator, host, count(tests.name) "
+            "from runs left join tests on tests.run_id = runs.id "
+            "group by runs.id order by runs.id desc limit ?", (limit,)).fetchall()
+
+    def last_run(self):
+        row = self.conn.execute("select max(id) from runs").fetchone()
+        return row[0]
+
+    def regressions(self, run_id, metric="wall", window=5, threshold=0.25):
+        # [(name, latest, baseline, ratio)], ratio being the cost increase factor.
+        column, higher_costs = metrics[metric]
+        run = self.conn.execute("select simulator from runs where id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise ValueError("no run %s in %s" % (run_id, self.path))
+        flagged = []
+        latest = self.conn.execute(
+            "select name, profile, %s from tests where run_id = ? and status = 'passed' "
+            "and %s is not null" % (column, column), (run_id,)).fetchall()
+        for name, profile, value in latest:
+            history = [row[0] for row in self.conn.execute(
+                "select tests.%s from tests join runs on runs.id = tests.run_id "
+                "where tests.name = ? and tests.run_id < ? and tests.status = 'passed' "
+                "and tests.profile is ? and runs.simulator is ? and tests.%s is not null "
+                "order by tests.run_id desc limit ?" % (column, column),
+                (name, run_id, profile, run[0], window))]
+            if not history:
+                continue
+            baseline = statistics.median(history)
+            if higher_costs:
+                ratio = value / baseline if baseline else None
+            else:
+                ratio = baseline / value if value else None
+            if ratio is not None and ratio > 1 + threshold:
+                flagged.append((name, value, baseline, ratio))
+        flagged.sort(key=lambda row: -row[3])
+        return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stdcores simulation performance history.")
+    parser.add_argument("--db", default=db_file, help="Default: %(default)s")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="flag tests whose cost rose against a rolling baseline.")
+    report_parser.add_argument("--run", type=int, help="run id to check. Default: the last one.")
+    report_parser.add_argument("--metric", choices=sorted(metrics), default="wall", help="Default: %(default)s")
+    report_parser.add_argument("--window", type=int, default=5,
+                               help="previous runs the baseline is the median of. Default: %(default)s")
+    report_parser.add_argument("--threshold", type=float, default=0.25,
+                               help="relative cost increase flagged, 0.25 is 25%%. Default: %(default)s")
+    runs_parser = subparsers.add_parser("runs", help="list the last runs.")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    db = PerfDB(args.db)
+    if args.command == "runs":
+        for run_id, commit_id, dirty, started, simulator, host, tests in db.runs(args.limit):
+            print("%5d  %s%s  %s  %s  %s  %d tests" % (
+                run_id, commit_id[:12], "+" if dirty else " ", started, simulator, host, tests))
+        return 0
+
+    run_id = args.run if args.run is not None else db.last_run()
+    if run_id is None:
+        print("No runs in " + args.db)
+        return 0
+    flagged = db.regressions(run_id, args.metric, args.window, args.threshold)
+    for name, value, baseline, ratio in flagged:
+        print("%s: %s %.4g, baseline %.4g, cost x%.2f" % (name, args.metric, value, baseline, ratio))
+    print("Run %d: %d tests over +%d%% %s cost" % (run_id, len(flagged), round(args.threshold * 100), args.metric))
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    exit(main())
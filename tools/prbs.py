@@ -0,0 +1,210 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# PRBS sequences and packet lengths of verification_ip, bit for bit, in NumPy.
+#
+# The generators are the Fibonacci LFSRs of verification_ip_MAXIS/SAXIS:
+#   prbs := prbs(n-1 downto 1) & (prbs(n) xor prbs(tap));  bit out = prbs(n)
+# with the ITU-T O.150 taps below (verification_ip itself only has PRBS23). The
+# state starts at all ones unless a seed is given; seed bit i-1 is prbs(i).
+#
+# The bit shifted in follows b[k] = b[k-n] xor b[k-tap], and so, squaring the
+# polynomial, b[k] = b[k-n*2^m] xor b[k-tap*2^m] too. Blocks of tap*2^m bits are
+# then one NumPy xor each, so long sequences come out at memory speed.
+#
+# What verification_ip really drives:
+#   tdata        : the LFSR restarts at all ones on every clock edge, so every
+#                  test_sel = prbs beat is the first width bits, first bit in
+#                  tdata'left. See tdata().
+#   packet sizes : a free running PRBS23 (no reset) steps on every rising edge;
+#                  on the edge that samples tlast the next packet takes
+#                  state mod packet_size_max (0 -> max, below min -> min) of the
+#                  edge before, the first packet is packet_size_max.
+#                  See PacketLengths.
+#
+#   python -m tools.prbs --order 23 --bits 1000000000 -o prbs23.bin
+#--------------------------------------------------------------------------------
+import argparse
+import sys
+
+import numpy as np
+
+taps = {7: 6, 15: 14, 23: 18, 31: 28}
+
+# largest block xored at once, in bits.
+max_block = 1 << 20
+
+
+class Prbs:
+    def __init__(self, order=23, seed=None):
+        if order not in taps:
+            raise ValueError("PRBS order must be one of %s" % sorted(taps))
+        self.order = order
+        self.tap = taps[order]
+        seed = (1 << order) - 1 if seed is None else seed
+        if not 0 < seed < (1 << order):
+            raise ValueError("PRBS%d seed must be a non zero %d bit value" % (order, order))
+        # b[k-n+1] .. b[k]: prbs(n) first, prbs(1) last.
+        self.history = np.array([(seed >> (i - 1)) & 1 for i in range(order, 0, -1)], dtype=np.uint8)
+        # the n-1 bits already in the register come out before the first new one.
+        self.pending = self.history[1:].copy()
+
+    def extend(self, count):
+        # the next count bits shifted in, keeping enough history for the widest lag.
+        hist = len(self.history)
+        buf = np.empty(hist + count, dtype=np.uint8)
+        buf[:hist] = self.history
+        pos = hist
+        end = hist + count
+        n, t = self.order, self.tap
+        while pos < end:
+            scale = 1
+            while n * scale * 2 <= pos and t * scale * 2 <= max_block:
+                scale = scale * 2
+            block = min(t * scale, end - pos)
+            far = pos - n * scale
+            near = pos - t * scale
+            np.bitwise_xor(buf[far:far + block], buf[near:near + block], out=buf[pos:pos + block])
+            pos = pos + block
+        keep = min(len(buf), n * max_block // t)
+        self.history = buf[-keep:].copy()
+        return buf[hist:]
+
+    def bits(self, count):
+        # the next count output bits, one per uint8.
+        out = self.pending[:count]
+        self.pending = self.pending[count:]
+        if len(out) < count:
+            out = np.concatenate([out, self.extend(count - len(out))])
+        return out
+
+    def stream(self, count, chunk=1 << 26):
+        # count bits in chunks, for sequences that do not fit in memory at once.
+        while count > 0:
+            size = min(chunk, count)
+            yield self.bits(size)
+            count = count - size
+
+    def words(self, count, width):
+        # count words of width bits, first bit in the MSB (word'left): uint64 up
+        # to 64 bits, else (count, bytes) big endian rows.
+        return pack(self.bits(count * width).reshape(count, width))
+
+
+def pack(bits):
+    # rows of bits, MSB first, into uint64 values or big endian byte rows.
+    width = bits.shape[1]
+    pad = -width % 8
+    rows = np.packbits(np.pad(bits, ((0, 0), (pad, 0))), axis=1, bitorder="big")
+    if width > 64:
+        return rows
+    rows = np.pad(rows, ((0, 0), (8 - rows.shape[1], 0)))
+    return rows.view(">u8")[:, 0].astype(np.uint64)
+
+
+def tdata(width, order=23):
+    # every verification_ip test_sel = prbs beat of a width bit tdata.
+    return pack(Prbs(order).bits(width).reshape(1, width))[0]
+
+
+def values(bits, order, count):
+    # register value after each of the first count edges, bits holding the
+    # register at edge 0 (prbs(n) first) followed by every bit shifted in.
+    acc = np.zeros(count, dtype=np.int64)
+    for j in range(order):
+        acc = (acc << 1) | bits[j:j + count]
+    return acc
+
+
+def states(cycles, order=23):
+    # LFSR value (prbs(n) is the MSB) after each of the given rising edges,
+    # counted from 1 at the start of the simulation (0 is the initial value).
+    cycles = np.asarray(cycles, dtype=np.int64)
+    top = int(cycles.max()) if cycles.size else 0
+    prbs = Prbs(order)
+    table = values(np.concatenate([prbs.history, prbs.extend(top)]), order, top + 1)
+    return table[cycles]
+
+
+class PacketLengths:
+    # packet sizes of verification_ip_MAXIS with packet = true.
+    def __init__(self, size_min, size_max, random=True):
+        self.size_min = size_min
+        self.size_max = size_max
+        self.random = random
+
+    def size(self, state):
+        value = np.asarray(state, dtype=np.int64) % self.size_max
+        value = np.where(value == 0, self.size_max, value)
+        return np.where(value < self.size_min, self.size_min, value)
+
+    def after_tlast(self, edges):
+        # size taken on each rising edge that samples tlast high.
+        edges = np.asarray(edges, dtype=np.int64)
+        if not self.random:
+            return np.full(edges.shape, self.size_max, dtype=np.int64)
+        return self.size(states(edges - 1))
+
+    def sizes(self, count, start_edge):
+        # count packet sizes with tready always high, tvalid rising after edge
+        # start_edge (the one that first sees TEST_START): beat k is taken on
+        # edge start_edge + 1 + k.
+        if not self.random:
+            return np.full(count, self.size_max, dtype=np.int64)
+        order = 23
+        prbs = Prbs(order)
+        # register bits from the start of the simulation: edge c is bits[c:c+order].
+        bits = prbs.history
+        # size table for the edges [first, first + len(table)), refilled per chunk.
+        chunk = 1 << 20
+        first = 0
+        table = np.empty(0, dtype=np.int64)
+        lengths = np.empty(count, dtype=np.int64)
+        last = -1
+        size = self.size_max
+        for packet in range(count):
+            lengths[packet] = size
+            last = last + size
+            edge = start_edge + last
+            while edge >= first + len(table):
+                first = first + len(table)
+                bits = np.concatenate([bits[len(table):], prbs.extend(chunk)])
+                table = self.size(values(bits, order, chunk))
+            size = int(table[edge - first])
+        return lengths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a PRBS bit sequence, 8 bits per byte, first bit in the MSB.")
+    parser.add_argument("--order", type=int, default=23, choices=sorted(taps))
+    parser.add_argument("--seed", type=lambda text: int(text, 0), help="start state, default all ones.")
+    parser.add_argument("--bits", type=int, required=True, help="sequence length, a multiple of 8.")
+    parser.add_argument("-o", "--output", help="output file, default stdout.")
+    args = parser.parse_args()
+    if args.bits % 8:
+        parser.error("--bits must be a multiple of 8")
+
+    prbs = Prbs(args.order, args.seed)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for bits in prbs.stream(args.bits):
+            out.write(np.packbits(bits, bitorder="big").tobytes())
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,89 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# GHDL backend/optimization profiles, chosen per test.
+#
+#   fast-compile  the GHDL VUnit found, with the libraries VUnit compiles: quick
+#                 to analyse and elaborate (best with mcode), for short tests.
+#   fast-run      an llvm or gcc GHDL (--fast-run-ghdl, $GHDL_FAST_RUN, else the
+#                 same one) at -O2, with every library compiled again under
+#                 <simulator output>/profiles/fast-run/.
+#
+# A test runs as fast-run when a pattern of its core says so (Core(profiles=)),
+# or when tools.history recorded at least --fast-run-after seconds for it.
+# Both pools run in the same regression: the first fast-run test compiles the
+# optimized libraries while the other threads go on with fast-compile tests.
+# Libraries from --lib-cache were built by the fast-compile GHDL, so fast-run
+# compiles them again from their sources.
+#--------------------------------------------------------------------------------
+import fnmatch
+
+from vunit.sim_if.ghdl import GHDLInterface
+
+profile_names = ["fast-compile", "fast-run"]
+optimize_flags = ["-O2"]
+
+
+class Profile:
+    def __init__(self, name, prefix, backend, a_flags=(), elab_flags=()):
+        self.name = name
+        self.prefix = prefix
+        self.backend = backend
+        self.a_flags = list(a_flags)
+        self.elab_flags = list(elab_flags)
+
+    def has_output_flag(self):
+        return self.backend in ("llvm", "gcc")
+
+
+def fast_run(prefix, simulator_if):
+    # None when it would be fast-compile again: mcode has no optimizer.
+    if prefix is None or prefix == simulator_if._prefix:
+        prefix = simulator_if._prefix
+        backend = simulator_if._backend
+    else:
+        backend = GHDLInterface.determine_backend(prefix)
+    if backend == "mcode":
+        return None
+    return Profile("fast-run", prefix, backend, optimize_flags, optimize_flags)
+
+
+class Selector:
+    def __init__(self, history=None, after=None, patterns=None, forced="auto"):
+        self.history = history
+        # seconds, 0 or None keeps every unnamed test on fast-compile.
+        self.after = after
+        # {testbench: {test name pattern: profile}}
+        self.patterns = patterns or {}
+        self.forced = forced
+
+    def seconds(self, test_suite_name):
+        # the suite of a same-sim testbench costs all of its tests.
+        tests = self.history.tests if self.history is not None else {}
+        if test_suite_name in tests:
+            return tests[test_suite_name]
+        prefix = test_suite_name + "."
+        return sum(seconds for name, seconds in tests.items() if name.startswith(prefix))
+
+    def profile(self, test_suite_name):
+        if self.forced != "auto":
+            return self.forced
+        parts = test_suite_name.split(".")
+        tb_name = parts[1] if len(parts) > 1 else ""
+        for pattern, name in self.patterns.get(tb_name, {}).items():
+            if fnmatch.fnmatchcase(test_suite_name, pattern):
+                return name
+        if self.after and self.seconds(test_suite_name) >= self.after:
+            return "fast-run"
+        return "fast-compile"
@@ -0,0 +1,258 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Named field access to a register bank, over any backend with
+# read(address) and write(address, data, strobe):
+#   MemoryBackend   : a plain dict, also the shadow of StimulusBackend.
+#   StimulusBackend : records the accesses to a hex file; a testbench replays
+#                     it through VUnit com (write_bus/read_bus), see
+#                     "Replay register stimulus" in can_aximm_top_tb.
+#   MmapBackend     : an mmap'd window, e.g. /dev/uioN or a plain file.
+#
+# Field masks and shifts come precomputed from the generated <bank>_regs.py.
+# Updates to fields of one register are merged into a single write; the
+# register is only read first when bits that must be kept share its written
+# byte lanes, otherwise the write strobe leaves them alone.
+#
+#   regs = CanAximm(MmapBackend.open("/dev/uio0", 4096))
+#   with regs.transaction() as t:
+#       t.set("rx_data_mask", 1)
+#       t.set("tx_data_mask", 1)
+#   dlc = regs.read("rx_size")
+#--------------------------------------------------------------------------------
+import mmap
+
+import numpy as np
+
+from tools import hexio
+
+
+class Backend:
+    data_width = 32
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+
+    def check(self, address, data, mask):
+        actual = self.read(address)
+        if (actual ^ data) & mask:
+            raise AssertionError("@%02X: %08X, expected %08X (mask %08X)" % (address, actual, data, mask))
+
+
+class MemoryBackend(Backend):
+    def __init__(self, reset=None):
+        super().__init__()
+        self.memory = dict(reset or {})
+
+    def read(self, address):
+        self.reads = self.reads + 1
+        return self.memory.get(address, 0)
+
+    def write(self, address, data, strobe):
+        self.writes = self.writes + 1
+        bits = strobe_mask(strobe)
+        self.memory[address] = (self.memory.get(address, 0) & ~bits) | (data & bits)
+
+
+class StimulusBackend(Backend):
+    # op, address, data, mask. op 1 writes data with mask as byte strobes, op 0
+    # reads and checks the bits set in mask (none: a plain read).
+    widths = [1, 8, 8, 8]
+    read_op = 0
+    write_op = 1
+
+    def __init__(self, path, reset=None):
+        super().__init__()
+        self.path = path
+        self.shadow = MemoryBackend(reset)
+        self.lines = []
+
+    def read(self, address):
+        # the value is not known before the simulation, the shadow holds what
+        # was written (or the reset value).
+        self.reads = self.reads + 1
+        self.lines.append((self.read_op, address, 0, 0))
+        return self.shadow.read(address)
+
+    def check(self, address, data, mask):
+        self.reads = self.reads + 1
+        self.lines.append((self.read_op, address, data, mask))
+
+    def write(self, address, data, strobe):
+        self.writes = self.writes + 1
+        self.lines.append((self.write_op, address, data, strobe_mask(strobe)))
+        self.shadow.write(address, data, strobe)
+
+    def close(self):
+        columns = np.array(self.lines, dtype=np.uint64).reshape(-1, 4).T
+        hexio.write(self.path, list(columns), self.widths)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class MmapBackend(Backend):
+    # addresses are byte offsets in the window. Whole words go through a 32 bit
+    # view; a partial strobe writes only its bytes.
+    def __init__(self, buffer, offset=0):
+        super().__init__()
+        self.buffer = buffer
+        self.bytes = memoryview(buffer)[offset:]
+        self.words = self.bytes[:len(self.bytes) // 4 * 4].cast("I")
+
+    @classmethod
+    def open(cls, path, size, offset=0):
+        with open(path, "r+b") as f:
+            return cls(mmap.mmap(f.fileno(), size, offset=offset))
+
+    def read(self, address):
+        self.reads = self.reads + 1
+        return self.words[address // 4]
+
+    def write(self, address, data, strobe):
+        self.writes = self.writes + 1
+        if strobe == 0xF:
+            self.words[address // 4] = data
+            return
+        for lane in range(4):
+            if strobe >> lane & 1:
+                self.bytes[address + lane] = (data >> (8 * lane)) & 0xFF
+
+    def close(self):
+        self.words.release()
+        self.bytes.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+def strobe_mask(strobe):
+    mask = 0
+    for lane in range(4):
+        if strobe >> lane & 1:
+            mask = mask | (0xFF << (8 * lane))
+    return mask
+
+
+def lanes(bits):
+    strobe = 0
+    for lane in range(4):
+        if bits >> (8 * lane) & 0xFF:
+            strobe = strobe | (1 << lane)
+    return strobe
+
+
+class Transaction:
+    def __init__(self, block):
+        self.block = block
+        self.pending = {}
+
+    def set(self, name, value):
+        address, shift, mask, kind = self.block.field(name)
+        if value << shift & ~mask:
+            raise ValueError("%s: %d does not fit in %d bits" % (name, value, bin(mask).count("1")))
+        data, touched = self.pending.get(address, (0, 0))
+        self.pending[address] = ((data & ~mask) | (value << shift), touched | mask)
+        return self
+
+    def commit(self):
+        for address, (data, touched) in sorted(self.pending.items()):
+            self.block.merge_write(address, data, touched)
+        self.pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        if kind is None:
+            self.commit()
+
+
+class RegisterBlock:
+    # set by the generated <bank>_regs.py.
+    fields = {}
+    registers = {}
+    data_width = 32
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def field(self, name):
+        try:
+            return self.fields[name]
+        except KeyError:
+            raise KeyError("%s has no field %s" % (type(self).__name__, name)) from None
+
+    def address(self, register):
+        if isinstance(register, int):
+            return register
+        for address, (name, keep, reset) in self.registers.items():
+            if name == register:
+                return address
+        raise KeyError("%s has no register %s" % (type(self).__name__, register))
+
+    def reset_values(self):
+        return {address: reset for address, (name, keep, reset) in self.registers.items()}
+
+    def read_register(self, register):
+        return self.backend.read(self.address(register))
+
+    def write_register(self, register, data):
+        self.backend.write(self.address(register), data, 0xF)
+
+    def read(self, name):
+        address, shift, mask, kind = self.field(name)
+        return (self.backend.read(address) & mask) >> shift
+
+    def read_fields(self, *names):
+        # one read per register, however many of its fields are asked for.
+        words = {}
+        values = {}
+        for name in names:
+            address, shift, mask, kind = self.field(name)
+            if address not in words:
+                words[address] = self.backend.read(address)
+            values[name] = (words[address] & mask) >> shift
+        return values
+
+    def write(self, name, value):
+        self.transaction().set(name, value).commit()
+
+    def update(self, **values):
+        with self.transaction() as t:
+            for name, value in values.items():
+                t.set(name, value)
+
+    def transaction(self):
+        return Transaction(self)
+
+    def check(self, **values):
+        # one check per register, like read_fields.
+        expected = {}
+        for name, value in values.items():
+            address, shift, mask, kind = self.field(name)
+            data, bits = expected.get(address, (0, 0))
+            expected[address] = (data | (value << shift), bits | mask)
+        for address, (data, bits) in sorted(expected.items()):
+            self.backend.check(address, data, bits)
+
+    def merge_write(self, address, data, touched):
+        strobe = lanes(touched)
+        keep = self.registers[address][1] & strobe_mask(strobe) & ~touched
+        if keep:
+            data = (self.backend.read(address) & keep) | data
+        self.backend.write(address, data, strobe)
@@ -0,0 +1,188 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Incremental hdltools register bank generation.
+#
+# A spec is a python file (e.g. can_aximms/can_regbank.py) that builds one or
+# more hdltools.RegisterBank objects at module level. Generation is skipped when
+# the hash of the spec and generators matches the stamp (.<spec>.stamp, next to the spec) and the
+# outputs were not touched since. Otherwise the banks are generated in a
+# temporary directory and the outputs are only copied when they differ by more
+# than the version stamp hdltools puts in every file, so the VHDL that depends
+# on them is not recompiled for nothing. All outputs of a spec share one
+# version, so they are always written together. The register access outputs of
+# tools/regmap.py are generated from the bank markdown in the same pass.
+#
+#   python -m tools.regbank                 -> every */*regbank.py, one process each
+#   python -m tools.regbank can_aximms/can_regbank.py --force
+#--------------------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor
+from os.path import join, dirname, basename, abspath, exists, splitext
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import runpy
+import shutil
+import tempfile
+
+from tools import regmap
+
+root = dirname(dirname(abspath(__file__)))
+
+version_re = re.compile(rb"\d{8}_\d{4}")
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def hdltools_version():
+    try:
+        from importlib.metadata import version
+        return version("hdltools")
+    except Exception:
+        return "unknown"
+
+
+# generator sources the outputs depend on, besides hdltools and the spec (which
+# also holds the regmap blocks).
+generators = [join(root, "tools", "regbank.py"), join(root, "tools", "regmap.py")]
+
+
+def spec_key(spec):
+    key = hashlib.sha256()
+    key.update(hdltools_version().encode())
+    for path in [spec] + generators:
+        with open(path, "rb") as f:
+            key.update(f.read())
+    return key.hexdigest()
+
+
+def stamp_file(spec):
+    return join(dirname(spec), "." + splitext(basename(spec))[0] + ".stamp")
+
+
+def read_stamp(spec):
+    try:
+        with open(stamp_file(spec)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def up_to_date(spec):
+    stamp = read_stamp(spec)
+    if stamp is None or stamp.get("key") != spec_key(spec):
+        return False
+    for name, digest in stamp["outputs"].items():
+        path = join(dirname(spec), name)
+        if not exists(path) or file_hash(path) != digest:
+            return False
+    return True
+
+
+def same_content(a, b):
+    # equal but for the hdltools version stamp.
+    if not exists(b):
+        return False
+    with open(a, "rb") as f:
+        new = version_re.sub(b"", f.read())
+    with open(b, "rb") as f:
+        old = version_re.sub(b"", f.read())
+    return new == old
+
+
+def build(spec, path):
+    # runs the spec with path as working directory, hdltools writes there.
+    # returns the register blocks of the spec, see tools/regmap.py.
+    import hdltools
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        spec_globals = runpy.run_path(spec, run_name="regbank_spec")
+        banks = [obj for obj in spec_globals.values() if isinstance(obj, hdltools.RegisterBank)]
+        if not banks:
+            raise ValueError("%s defines no hdltools.RegisterBank" % spec)
+        for bank in banks:
+            bank()
+    finally:
+        os.chdir(cwd)
+    return spec_globals.get("blocks", {})
+
+
+def generate(spec, force=False):
+    # returns (spec, list of written outputs) or (spec, None) when up to date.
+    spec = abspath(spec)
+    if not force and up_to_date(spec):
+        return spec, None
+
+    target = dirname(spec)
+    with tempfile.TemporaryDirectory() as tmp:
+        blocks = build(spec, tmp)
+        for markdown in glob.glob(join(tmp, "*.md")):
+            regmap.generate(markdown, blocks=blocks)
+        outputs = sorted(name for name in os.listdir(tmp) if not name.startswith("."))
+        changed = force or not all(same_content(join(tmp, name), join(target, name)) for name in outputs)
+        written = []
+        if changed:
+            for name in outputs:
+                shutil.copyfile(join(tmp, name), join(target, name))
+                written.append(name)
+
+    stamp = {
+        "key": spec_key(spec),
+        "outputs": {name: file_hash(join(target, name)) for name in outputs},
+    }
+    with open(stamp_file(spec), "w") as f:
+        json.dump(stamp, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return spec, written
+
+
+def find_specs():
+    return sorted(glob.glob(join(root, "*", "*regbank.py")))
+
+
+def batch(specs, jobs=None, force=False):
+    # one worker process per spec, hdltools and the spec run isolated there.
+    if len(specs) == 1:
+        return [generate(specs[0], force)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(generate, specs, [force] * len(specs)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate hdltools register banks when their spec changed.")
+    parser.add_argument("specs", nargs="*", help="register bank specs. Default: every */*regbank.py.")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="worker processes.")
+    parser.add_argument("--force", action="store_true", help="generate and write even when up to date.")
+    args = parser.parse_args(argv)
+
+    specs = args.specs or find_specs()
+    for spec, written in batch(specs, args.jobs, args.force):
+        if written is None:
+            print("%s: up to date" % spec)
+        elif written:
+            print("%s: wrote %s" % (spec, ", ".join(written)))
+        else:
+            print("%s: outputs unchanged" % spec)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,329 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Register map of an hdltools register bank, read back from the markdown
+# hdltools writes next to the VHDL (e.g. can_aximms/can_aximm.md), and the
+# outputs generated from it:
+#   <bank>_regs.py : field lookup tables, a tools.regaccess.RegisterBlock and
+#                    a NumPy structured dtype of the register window, one
+#                    little endian word per register at its address (see
+#                    tools/regwindow.py).
+#   <bank>_regs.h  : packed volatile struct overlay of the register window,
+#                    offsets checked with static asserts against the register
+#                    addresses, and block accessors.
+#
+# Blocks are runs of registers firmware copies together, e.g. a received frame;
+# a spec lists them in a module level "blocks" dict, name: (first, last). Their
+# accessors copy one volatile word per register, in address order, so the bus
+# sees the same accesses as register by register code (a struct assignment may
+# become wide or byte loads). Blocks with only read only fields get no write
+# accessor.
+#
+# tools/regbank.py runs this after hdltools, so the outputs follow the spec.
+#   python -m tools.regmap can_aximms/can_aximm.md --block rx_frame=RX_DLC:RX_DATA1
+#--------------------------------------------------------------------------------
+from os.path import join, dirname, basename, splitext
+import argparse
+import re
+
+register_re = re.compile(r"^## Register (\d+): (\S+)")
+address_re = re.compile(r"^Address: (0x[0-9a-fA-F]+)")
+width_re = re.compile(r"^Data Width: (\d+)")
+version_re = re.compile(r"^Version: v?(\S+)")
+row_re = re.compile(r"^\|(\d+)(?:-(\d+))?\|([^|]+)\|([^|]+)\|([^|]+)\|([^|]*)\|")
+
+read_write = "ReadWrite"
+read_only = "ReadOnly"
+
+
+class Field:
+    def __init__(self, name, offset, width, kind, reset=0, description=""):
+        self.name = name
+        self.offset = offset
+        self.width = width
+        self.kind = kind
+        self.reset = reset
+        self.description = description
+
+    @property
+    def mask(self):
+        return ((1 << self.width) - 1) << self.offset
+
+
+class Register:
+    def __init__(self, index, name, address):
+        self.index = index
+        self.name = name
+        self.address = address
+        self.fields = []
+
+    @property
+    def keep(self):
+        # bits written back unchanged on read-modify-write; write to clear and
+        # write to pulse fields must be written as zero instead.
+        keep = 0
+        for field in self.fields:
+            if field.kind == read_write:
+                keep = keep | field.mask
+        return keep
+
+    @property
+    def reset(self):
+        reset = 0
+        for field in self.fields:
+            reset = reset | (field.reset << field.offset)
+        return reset
+
+
+class RegisterMap:
+    def __init__(self, name, data_width=32, version=""):
+        self.name = name
+        self.data_width = data_width
+        self.version = version
+        self.registers = []
+
+    def fields(self):
+        names = {}
+        for register in self.registers:
+            for field in register.fields:
+                if field.name in names:
+                    raise ValueError("field %s is in both %s and %s" % (field.name, names[field.name].name, register.name))
+                names[field.name] = register
+                yield register, field
+
+    @classmethod
+    def from_markdown(cls, path):
+        regmap = cls(splitext(basename(path))[0])
+        register = None
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if width_re.match(line):
+                    regmap.data_width = int(width_re.match(line).group(1))
+                elif version_re.match(line):
+                    regmap.version = version_re.match(line).group(1)
+                elif register_re.match(line):
+                    index, name = register_re.match(line).groups()
+                    register = Register(int(index), name, None)
+                    regmap.registers.append(register)
+                elif register and address_re.match(line):
+                    register.address = int(address_re.match(line).group(1), 16)
+                elif register and row_re.match(line):
+                    high, low, name, kind, reset, description = row_re.match(line).groups()
+                    low = int(high if low is None else low)
+                    register.fields.append(Field(name.strip(), low, int(high) - low + 1, kind.strip(),
+                                                 int(reset, 0), description.strip()))
+        if not regmap.registers:
+            raise ValueError("%s has no hdltools register table" % path)
+        return regmap
+
+
+def python_module(regmap):
+    lines = [
+        "# Generated by tools/regmap.py from %s.md, version %s. Do not edit." % (regmap.name, regmap.version),
+        "import numpy as np",
+        "",
+        "from tools import regaccess",
+        "",
+        "data_width = %d" % regmap.data_width,
+        "",
+        "# field: (address, shift, mask, type)",
+        "fields = {",
+    ]
+    fields = list(regmap.fields())
+    pad = max(len(repr(field.name)) for register, field in fields) + 1
+    for register, field in fields:
+        lines.append("    %-*s (0x%02X, %2d, 0x%08X, %r)," % (
+            pad, repr(field.name) + ":", register.address, field.offset, field.mask, field.kind))
+    lines = lines + [
+        "}",
+        "",
+        "# address: (name, read-modify-write keep mask, reset)",
+        "registers = {",
+    ]
+    pad = max(len(repr(register.name)) for register in regmap.registers) + 1
+    for register in regmap.registers:
+        lines.append("    0x%02X: (%-*s 0x%08X, 0x%08X)," % (
+            register.address, pad, repr(register.name) + ",", register.keep, register.reset))
+    lines = lines + [
+        "}",
+        "",
+        "",
+        "class %s(regaccess.RegisterBlock):" % class_name(regmap.name),
+        "    fields = fields",
+        "    registers = registers",
+        "    data_width = data_width",
+        "",
+        "",
+        "# register window, unmapped words are padding.",
+        "dtype = np.dtype({",
+    ]
+    word = "<u%d" % (regmap.data_width // 8)
+    lines.append("    \"names\":    [%s]," % ", ".join(repr(r.name.lower()) for r in regmap.registers))
+    lines.append("    \"formats\":  [%r] * %d," % (word, len(regmap.registers)))
+    lines.append("    \"offsets\":  [%s]," % ", ".join("0x%02X" % r.address for r in regmap.registers))
+    lines.append("    \"itemsize\": 0x%02X," % window_size(regmap))
+    lines = lines + [
+        "})",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def c_header(regmap, blocks):
+    name = regmap.name
+    word = "uint%d_t" % regmap.data_width
+    size = regmap.data_width // 8
+    runs = block_runs(regmap, blocks)
+    starts = {run[0].name: block for block, run in runs.items()}
+    lines = [
+        "/* Generated by tools/regmap.py from %s.md, version %s. Do not edit. */" % (name, regmap.version),
+        "#ifndef %s_REGS_H" % name.upper(),
+        "#define %s_REGS_H" % name.upper(),
+        "",
+        "#include <stddef.h>",
+        "#include <stdint.h>",
+        "",
+    ]
+    for block, run in runs.items():
+        lines.append("/* %s to %s, copied together. */" % (run[0].name, run[-1].name))
+        lines.append("typedef struct __attribute__((packed, aligned(%d))) {" % size)
+        for register in run:
+            lines.append("    %s %s;" % (word, register.name.lower()))
+        lines.append("} %s_%s_t;" % (name, block))
+        lines.append("")
+
+    lines.append("/* Register window: %s_regs_t *regs = (%s_regs_t *)base; */" % (name, name))
+    lines.append("typedef volatile struct __attribute__((packed, aligned(%d))) {" % size)
+    address = 0
+    registers = iter(regmap.registers)
+    for register in registers:
+        if register.address > address:
+            lines.append("    %-30s /* 0x%02X */" % ("%s reserved_%02x[%d];" % (word, address, (register.address - address) // size), address))
+        if register.name in starts:
+            block = starts[register.name]
+            lines.append("    union {")
+            lines.append("        struct {")
+            for member in runs[block]:
+                lines.append("            %-22s /* 0x%02X */" % ("%s %s;" % (word, member.name.lower()), member.address))
+            lines.append("        };")
+            lines.append("        %s_%s_t %s;" % (name, block, block))
+            lines.append("    };")
+            for member in runs[block][1:]:
+                register = next(registers)
+            address = runs[block][-1].address + size
+            continue
+        lines.append("    %-30s /* 0x%02X */" % ("%s %s;" % (word, register.name.lower()), register.address))
+        address = register.address + size
+    lines.append("} %s_regs_t;" % name)
+    lines.append("")
+
+    for register in regmap.registers:
+        lines.append("_Static_assert(offsetof(%s_regs_t, %s) == 0x%02X, \"%s offset\");" % (
+            name, register.name.lower(), register.address, register.name))
+    for block, run in runs.items():
+        lines.append("_Static_assert(offsetof(%s_regs_t, %s) == 0x%02X, \"%s offset\");" % (
+            name, block, run[0].address, block))
+        lines.append("_Static_assert(sizeof(%s_%s_t) == %d, \"%s size\");" % (name, block, size * len(run), block))
+    lines.append("_Static_assert(sizeof(%s_regs_t) == 0x%02X, \"register window size\");" % (name, window_size(regmap)))
+
+    for block, run in runs.items():
+        lines = lines + [
+            "",
+            "static inline %s_%s_t %s_read_%s(%s_regs_t *regs)" % (name, block, name, block, name),
+            "{",
+            "    %s_%s_t %s;" % (name, block, block),
+        ]
+        for register in run:
+            lines.append("    %s.%s = regs->%s;" % (block, register.name.lower(), register.name.lower()))
+        lines = lines + [
+            "    return %s;" % block,
+            "}",
+        ]
+        if all(field.kind == read_only for register in run for field in register.fields):
+            continue
+        lines = lines + [
+            "",
+            "static inline void %s_write_%s(%s_regs_t *regs, const %s_%s_t *%s)" % (name, block, name, name, block, block),
+            "{",
+        ]
+        for register in run:
+            lines.append("    regs->%s = %s->%s;" % (register.name.lower(), block, register.name.lower()))
+        lines.append("}")
+    lines = lines + [
+        "",
+        "#endif",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def block_runs(regmap, blocks):
+    # block name: its registers, which must follow each other with no gap.
+    size = regmap.data_width // 8
+    by_name = {register.name: register for register in regmap.registers}
+    runs = {}
+    taken = set()
+    for block, (first, last) in sorted((blocks or {}).items(), key=lambda item: by_name[item[1][0]].address):
+        start = regmap.registers.index(by_name[first])
+        stop = regmap.registers.index(by_name[last]) + 1
+        run = regmap.registers[start:stop]
+        if not run or any(b.address - a.address != size for a, b in zip(run, run[1:])):
+            raise ValueError("block %s: %s to %s are not contiguous registers" % (block, first, last))
+        if taken & set(r.name for r in run):
+            raise ValueError("block %s overlaps another block" % block)
+        taken = taken | set(r.name for r in run)
+        runs[block] = run
+    return runs
+
+
+def window_size(regmap):
+    return max(register.address for register in regmap.registers) + regmap.data_width // 8
+
+
+def class_name(name):
+    return "".join(part.capitalize() for part in name.split("_"))
+
+
+def generate(markdown, path=None, blocks=None):
+    # writes the outputs of one register map, returns their names.
+    regmap = RegisterMap.from_markdown(markdown)
+    path = path or dirname(markdown)
+    outputs = {
+        regmap.name + "_regs.py": python_module(regmap),
+        regmap.name + "_regs.h": c_header(regmap, blocks),
+    }
+    for name, content in outputs.items():
+        with open(join(path, name), "w") as f:
+            f.write(content)
+    return sorted(outputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate register access outputs from hdltools markdown.")
+    parser.add_argument("markdown", nargs="+", help="register bank markdown written by hdltools.")
+    parser.add_argument("--block", action="append", default=[], metavar="NAME=FIRST:LAST",
+                        help="registers copied whole, e.g. rx_frame=RX_DLC:RX_DATA1.")
+    args = parser.parse_args()
+    blocks = {}
+    for block in args.block:
+        name, registers = block.split("=")
+        blocks[name] = tuple(registers.split(":"))
+    for markdown in args.markdown:
+        print("%s: wrote %s" % (markdown, ", ".join(generate(markdown, blocks=blocks))))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,91 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Register window driver: the structured dtype of a generated <bank>_regs.py
+# laid over an mmap'd window (/dev/uioN, or a plain file standing in for it).
+#
+# read() copies the span of the asked registers and returns it as a record;
+# write() packs a record and stores it, so it takes registers that tile a
+# contiguous span. Both go word by word through a 32 bit view, one aligned load
+# or store per register as the bus expects, never a wider or byte wise copy.
+# Stores within a span go out in address order, a write that must come last
+# (e.g. a go bit) is a write() of its own.
+#--------------------------------------------------------------------------------
+import mmap
+
+import numpy as np
+
+
+class RegisterWindow:
+    def __init__(self, dtype, buffer, offset=0):
+        self.dtype = dtype
+        self.buffer = buffer
+        if dtype.itemsize % 4 or offset % 4:
+            raise ValueError("register windows are made of 32 bit words")
+        self.words = np.frombuffer(buffer, dtype="<u4", count=dtype.itemsize // 4, offset=offset)
+        # zero copy view, regs.rx_id etc. read and write the window directly.
+        self.regs = self.words.view(dtype)[0]
+
+    @classmethod
+    def open(cls, path, dtype, offset=0):
+        return cls(dtype, map_file(path, dtype.itemsize, offset))
+
+    def span(self, names):
+        offsets = [self.dtype.fields[name][1] for name in names]
+        ends = [offset + self.dtype.fields[name][0].itemsize for name, offset in zip(names, offsets)]
+        start, stop = min(offsets), max(ends)
+        if start % 4 or stop % 4:
+            raise ValueError("%s are not whole 32 bit words" % ", ".join(names))
+        return start, stop
+
+    def span_dtype(self, names):
+        start, stop = self.span(names)
+        return np.dtype({
+            "names":    list(names),
+            "formats":  [self.dtype.fields[name][0] for name in names],
+            "offsets":  [self.dtype.fields[name][1] - start for name in names],
+            "itemsize": stop - start,
+        })
+
+    def read(self, *names):
+        start, stop = self.span(names)
+        words = np.empty((stop - start) // 4, dtype="<u4")
+        for n in range(words.size):
+            words[n] = self.words[start // 4 + n]
+        return words.view(self.span_dtype(names))[0]
+
+    def write(self, **values):
+        names = sorted(values, key=lambda name: self.dtype.fields[name][1])
+        start, stop = self.span(names)
+        size = sum(self.dtype.fields[name][0].itemsize for name in names)
+        if size != stop - start:
+            raise ValueError("%s do not cover 0x%X to 0x%X, write them apart" % (", ".join(names), start, stop))
+        record = np.zeros((), dtype=self.span_dtype(names))
+        for name in names:
+            record[name] = values[name]
+        words = record.reshape(1).view("<u4")
+        for n in range(words.size):
+            self.words[start // 4 + n] = words[n]
+
+    def close(self):
+        del self.regs
+        del self.words
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+
+def map_file(path, size, offset=0):
+    # offset: page aligned, e.g. N * PAGESIZE to reach map N of a uio device.
+    with open(path, "r+b") as f:
+        return mmap.mmap(f.fileno(), max(size, mmap.PAGESIZE), offset=offset)
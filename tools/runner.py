@@ -0,0 +1,135 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# VUnit with the stdcores run options (see tools.cores.cli()):
+# - tests are started longest first, using the durations of previous runs.
+# - the wall time of each test is saved back to the history after the run.
+# - with --shard i/N only that shard of the test suites is run.
+# - with --changed/--git-diff only the testbenches depending on those files run.
+# - GHDL elaborates each testbench once per set of structural generics and
+#   reuses the executable for the other configurations (see tools.ghdl), unless
+#   --elab-run is given.
+# - with GHDL, a failing test is simulated again dumping a compressed waveform
+#   of the core's wave hierarchies (or --wave-scope), unless --no-fail-waves.
+# - compile, elaboration and simulation figures go to a JSON report next to the
+#   xunit one (see tools.perf), and per test to the --perf-db SQLite history
+#   (see tools.perf_db).
+#--------------------------------------------------------------------------------
+from os.path import join, abspath
+
+from vunit import VUnit
+from vunit.sim_if.ghdl import GHDLInterface
+
+from tools import explore, impact, perf, profiles, shard
+from tools.ghdl import GHDL
+from tools.history import History
+from tools.perf_db import PerfDB
+
+
+class Runner(VUnit):
+    @classmethod
+    def from_args(cls, args, **kwargs):
+        shard_sel = getattr(args, "shard", None)
+        if shard_sel is not None and args.xunit_xml is None:
+            args.xunit_xml = join(args.output_path, "shard_%d_of_%d.xml" % shard_sel)
+        vu = super().from_args(args, **kwargs)
+        vu.shard = shard_sel
+        vu.changed = None
+        if getattr(args, "changed", None) or getattr(args, "git_diff", None):
+            vu.changed = [abspath(path) for path in args.changed or []]
+            if args.git_diff:
+                vu.changed = vu.changed + impact.git_changed_files(args.git_diff)
+        vu.history = None
+        if getattr(args, "history", None):
+            vu.history = History(args.history)
+        if vu._simulator_class is GHDLInterface:
+            vu._simulator_class = GHDL
+        vu.elab_run = getattr(args, "elab_run", False)
+        # {testbench: [hierarchy, ...]}, filled by tools.cores.add_cores; "*" applies to all.
+        vu.fail_waves = None
+        if not getattr(args, "no_fail_waves", True):
+            vu.fail_waves = {}
+            if args.wave_scope:
+                vu.fail_waves["*"] = args.wave_scope
+        # {testbench: {"token": ..., "configs": {name: generics}}}, see tools.explore.
+        vu.explore = None
+        if getattr(args, "explore", None):
+            vu.explore = explore.load_configs(args.explore)
+        # {testbench: {test name pattern: profile}}, filled by tools.cores.add_cores.
+        vu.profile_patterns = {}
+        vu.profile = getattr(args, "profile", "auto")
+        vu.fast_run_after = getattr(args, "fast_run_after", None)
+        vu.fast_run_ghdl = getattr(args, "fast_run_ghdl", None)
+        vu.simulator_if = None
+        # tools.lib_cache.LibraryCache, set by run_all.py with --lib-cache.
+        vu.lib_cache = None
+        vu.perf_file = perf.report_file(args)
+        vu.perf_db = getattr(args, "perf_db", None)
+        # {testbench: clock period ns}, filled by tools.cores.add_cores.
+        vu.clock_periods = {}
+        return vu
+
+    def _create_simulator_if(self):
+        simulator_if = super()._create_simulator_if()
+        if isinstance(simulator_if, GHDL):
+            simulator_if.reuse = not self.elab_run
+            simulator_if.fail_waves = self.fail_waves
+            simulator_if.fast_run = profiles.fast_run(self.fast_run_ghdl, simulator_if)
+            if self.lib_cache is not None:
+                simulator_if.external_sources = self.lib_cache.sources
+            if simulator_if.fast_run is None and self.profile == "fast-run":
+                print("No llvm or gcc GHDL for the fast-run profile, running fast-compile")
+            simulator_if.selector = profiles.Selector(self.history, self.fast_run_after,
+                                                      self.profile_patterns, self.profile)
+        self.simulator_if = simulator_if
+        return simulator_if
+
+    def _create_tests(self, simulator_if):
+        test_list = super()._create_tests(simulator_if)
+        if self.changed is not None:
+            affected = impact.affected_testbenches(self, self.changed)
+            if affected is not None:
+                test_list._test_suites[:] = [
+                    suite for suite in test_list._test_suites
+                    if ".".join(suite.test_names[0].split(".")[:2]) in affected
+                ]
+        history = self.history
+        if history is None:
+            history = History.empty()
+        # VUnit runs (and hands to its -p threads) suites in list order.
+        history.order(test_list._test_suites)
+        if self.shard is not None:
+            test_list._test_suites[:] = shard.select(test_list._test_suites, history, self.shard)
+        return test_list
+
+    def main(self, post_run=None):
+        def runner_post_run(results):
+            if self.history is not None:
+                self.history.record(results.get_report())
+                self.history.save()
+            perf_data = perf.report(results, self.simulator_if)
+            perf.write(self.perf_file, perf_data)
+            if self.perf_db:
+                db = PerfDB(self.perf_db)
+                db.add_run(perf_data, self.get_simulator_name(), self.clock_periods)
+                db.close()
+            waves = getattr(self.simulator_if, "waves", {})
+            if waves:
+                print("Waveforms of failed tests:")
+                for name in sorted(waves):
+                    print("  %s: %s" % (name, waves[name]))
+            if post_run is not None:
+                post_run(results=results)
+
+        super().main(post_run=runner_post_run)
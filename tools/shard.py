@@ -0,0 +1,92 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Split a regression over N independent nodes, no coordinator needed.
+#
+# Every node runs the same command with its own --shard i/N (1 <= i <= N). The
+# split only depends on the test names and the duration history, so all nodes
+# agree on it as long as they use the same history file. Each shard writes its
+# own xunit file; merge them afterwards with:
+#
+#   python -m tools.shard merge report.xml vunit_out/shard_*_of_4.xml
+#--------------------------------------------------------------------------------
+import argparse
+import xml.etree.ElementTree as ElementTree
+
+
+def parse(text):
+    try:
+        index, count = [int(value) for value in text.split("/")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected i/N, got '%s'" % text)
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError("shard index must be in 1..%d, got %d" % (count, index))
+    return index, count
+
+
+def split(test_suites, history, count):
+    # longest processing time first: biggest suite goes to the least loaded shard.
+    suites = sorted(test_suites, key=lambda suite: (-history.cost(suite.test_names), suite.test_names[0]))
+    shards = [[] for _ in range(count)]
+    load = [0.0] * count
+    for suite in suites:
+        target = load.index(min(load))
+        shards[target].append(suite)
+        load[target] = load[target] + history.cost(suite.test_names)
+    return shards
+
+
+def select(test_suites, history, shard):
+    index, count = shard
+    chosen = split(test_suites, history, count)[index - 1]
+    # keep the original (longest first) order inside the shard.
+    return [suite for suite in test_suites if suite in chosen]
+
+
+def merge(output_file, xunit_files):
+    merged = ElementTree.Element("testsuite", name="stdcores")
+    totals = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+    total_time = 0.0
+    for xunit_file in xunit_files:
+        suite = ElementTree.parse(xunit_file).getroot()
+        if suite.tag == "testsuites":
+            suite = suite.find("testsuite")
+        for name in totals:
+            totals[name] = totals[name] + int(suite.get(name, 0))
+        total_time = total_time + float(suite.get("time", 0))
+        for testcase in suite.findall("testcase"):
+            merged.append(testcase)
+    for name, value in totals.items():
+        merged.set(name, str(value))
+    merged.set("time", "%.3f" % total_time)
+    ElementTree.ElementTree(merged).write(output_file, encoding="utf-8", xml_declaration=True)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stdcores regression shards.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser("merge", help="merge shard xunit files into one report.")
+    merge_parser.add_argument("output", help="merged xunit file.")
+    merge_parser.add_argument("inputs", nargs="+", help="xunit files written by each shard.")
+    args = parser.parse_args()
+
+    totals = merge(args.output, args.inputs)
+    print("%d tests, %d failures, %d errors, %d skipped" % (
+        totals["tests"], totals["failures"], totals["errors"], totals["skipped"]))
+    return 1 if totals["failures"] or totals["errors"] else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,66 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Generic sweeps: a matrix of generic values expanded into VUnit configurations.
+#
+#   fifo_sweep = Sweep({
+#       "packet_mode": [False, True],
+#       "cut_through": [False, True],
+#   })
+#   fifo_sweep.require(lambda g: g["packet_mode"] or not g["cut_through"])
+#   fifo_sweep.add_configs(test_tb)
+#
+# Combinations that fail any requirement are pruned before VUnit sees them.
+# post_check, when given, is called with the generics of each configuration and
+# returns the VUnit post_check for it.
+#--------------------------------------------------------------------------------
+import itertools
+
+
+def implies(condition, consequence):
+    # requirement helper: when generic "condition" is true, "consequence" must be too.
+    return lambda generics: not generics[condition] or bool(generics[consequence])
+
+
+class Sweep:
+    def __init__(self, matrix, requires=(), post_check=None):
+        self.matrix = dict(matrix)
+        self.requires = list(requires)
+        self.post_check = post_check
+
+    def require(self, requirement):
+        self.requires.append(requirement)
+        return self
+
+    def __iter__(self):
+        names = list(self.matrix)
+        for values in itertools.product(*[self.matrix[name] for name in names]):
+            generics = dict(zip(names, values))
+            if all(requirement(generics) for requirement in self.requires):
+                yield generics
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    @staticmethod
+    def config_name(generics):
+        # dots would break VUnit test name patterns.
+        return ",".join("%s=%s" % (name, value) for name, value in generics.items())
+
+    def add_configs(self, test_tb, base=None):
+        for generics in self:
+            if base is not None:
+                generics = dict(base, **generics)
+            post_check = None if self.post_check is None else self.post_check(generics)
+            test_tb.add_config(name=self.config_name(generics), generics=generics, post_check=post_check)
@@ -0,0 +1,166 @@
+#--------------------------------------------------------------------------------
+# Copyright 2022 Ricardo F Tafas Jr
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy of
+# the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+# the specific language governing permissions and limitations under the License.
+#--------------------------------------------------------------------------------
+# Binary AXIS traces written by verification_ip/axis_trace_monitor.vhd.
+#
+# Traces are opened with mmap and compared chunk by chunk, so memory use does
+# not grow with the trace length. compare() stops at the first mismatch and
+# also reports the throughput (beats per cycle) of each stream seen.
+#
+#   python -m tools.trace vunit_out/test_output/<test>/m.trace <...>/s.trace
+#--------------------------------------------------------------------------------
+from os.path import getsize, join, basename, isfile
+import argparse
+import functools
+import glob
+
+import numpy as np
+
+beat_dtype = np.dtype([
+    ("cycle", "<u8"),
+    ("tdata", "<u8"),
+    ("tuser", "<u4"),
+    ("tdest", "<u2"),
+    ("tlast", "u1"),
+    ("stream", "u1"),
+])
+
+payload = ["tdata", "tuser", "tdest", "tlast"]
+
+chunk_beats = 1 << 20
+
+
+def open_trace(path):
+    if getsize(path) == 0:
+        return np.zeros(0, dtype=beat_dtype)
+    if getsize(path) % beat_dtype.itemsize:
+        raise ValueError("%s is not made of %d byte beats" % (path, beat_dtype.itemsize))
+    return np.memmap(path, dtype=beat_dtype, mode="r")
+
+
+def chunks(trace, start=0, stop=None):
+    stop = len(trace) if stop is None else stop
+    for begin in range(start, stop, chunk_beats):
+        yield begin, trace[begin:min(begin + chunk_beats, stop)]
+
+
+class StreamStats:
+    def __init__(self):
+        self.beats = np.zeros(256, dtype=np.uint64)
+        self.first = np.full(256, np.iinfo(np.uint64).max, dtype=np.uint64)
+        self.last = np.zeros(256, dtype=np.uint64)
+
+    def add(self, beats):
+        streams = beats["stream"]
+        self.beats += np.bincount(streams, minlength=256).astype(np.uint64)
+        np.minimum.at(self.first, streams, beats["cycle"])
+        np.maximum.at(self.last, streams, beats["cycle"])
+
+    def throughput(self):
+        # {stream: (beats, beats per cycle)} from first to last beat of the stream.
+        result = {}
+        for stream in np.flatnonzero(self.beats):
+            cycles = int(self.last[stream] - self.first[stream]) + 1
+            result[int(stream)] = (int(self.beats[stream]), int(self.beats[stream]) / cycles)
+        return result
+
+
+class Comparison:
+    def __init__(self, actual_beats, expected_beats, mismatch, stats):
+        self.actual_beats = actual_beats
+        self.expected_beats = expected_beats
+        # (beat index, field, actual value, expected value) or None.
+        self.mismatch = mismatch
+        self.stats = stats
+
+    @property
+    def missing(self):
+        return max(self.expected_beats - self.actual_beats, 0)
+
+    @property
+    def extra(self):
+        return max(self.actual_beats - self.expected_beats, 0)
+
+    def passed(self, allow_missing=False):
+        return self.mismatch is None and self.extra == 0 and (allow_missing or self.missing == 0)
+
+    def report(self):
+        lines = ["%d beats, %d expected" % (self.actual_beats, self.expected_beats)]
+        if self.mismatch is not None:
+            lines.append("first mismatch at beat %d: %s 0x%x, expected 0x%x" % self.mismatch)
+        for stream, (beats, rate) in sorted(self.stats.throughput().items()):
+            lines.append("stream %d: %d beats, %.3f beats/cycle" % (stream, beats, rate))
+        return "\n".join(lines)
+
+
+def compare(actual_path, expected_path, fields=payload):
+    # cycles differ between both sides of a DUT; only the payload is compared.
+    actual = open_trace(actual_path)
+    expected = open_trace(expected_path)
+    common = min(len(actual), len(expected))
+    stats = StreamStats()
+    mismatch = None
+
+    for begin, got in chunks(actual, 0, common):
+        want = expected[begin:begin + len(got)]
+        stats.add(got)
+        # first bad beat of the chunk, then the first field that differs in it.
+        firsts = [(int(bad[0]), field) for field in fields
+                  for bad in [np.flatnonzero(got[field] != want[field])] if bad.size]
+        if firsts:
+            index, field = min(firsts, key=lambda first: first[0])
+            mismatch = (begin + index, field, int(got[field][index]), int(want[field][index]))
+            break
+
+    if mismatch is None:
+        for _, got in chunks(actual, common):
+            stats.add(got)
+    return Comparison(len(actual), len(expected), mismatch, stats)
+
+
+def check_dir(output_path, fields=payload, allow_missing=False):
+    # every m*.trace of a test against its s.trace, both written by the testbench.
+    # allow_missing accepts outputs cut short, e.g. beats left inside a fifo.
+    expected = join(output_path, "s.trace")
+    actuals = sorted(glob.glob(join(output_path, "m*.trace")))
+    if not isfile(expected) or not actuals:
+        print("no s.trace and m*.trace in %s" % output_path)
+        return False
+    passed = True
+    for actual in actuals:
+        result = compare(actual, expected, fields)
+        print("%s: %s" % (basename(actual), result.report().replace("\n", "\n  ")))
+        passed = passed and result.passed(allow_missing)
+    return passed
+
+
+def post_check(fields=payload, allow_missing=False):
+    # VUnit post_check, only output_path is passed in.
+    return functools.partial(check_dir, fields=fields, allow_missing=allow_missing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two binary AXIS traces.")
+    parser.add_argument("actual", help="trace under test, e.g. the DUT output.")
+    parser.add_argument("expected", help="reference trace, e.g. the DUT input.")
+    parser.add_argument("--allow-missing", action="store_true", help="accept an actual trace cut short.")
+    args = parser.parse_args()
+
+    result = compare(args.actual, args.expected)
+    print(result.report())
+    return 0 if result.passed(allow_missing=args.allow_missing) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
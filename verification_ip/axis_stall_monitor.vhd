@@ -0,0 +1,73 @@
+----------------------------------------------------------------------------------
+--Copyright 2022 Ricardo F Tafas Jr
+
+--Licensed under the Apache License, Version 2.0 (the "License"); you may not
+--use this file except in compliance with the License. You may obtain a copy of
+--the License at
+
+--   http://www.apache.org/licenses/LICENSE-2.0
+
+--Unless required by applicable law or agreed to in writing, software distributed
+--under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+--OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+--the specific language governing permissions and limitations under the License.
+----------------------------------------------------------------------------------
+-- AXIS monitor, counts the cycles of one stream for coverage:
+--   beats  : tvalid and tready.
+--   stalls : tvalid and not tready, the sink pushing back.
+--   lasts  : beats with tlast.
+-- When done_i is seen high on a rising edge the counts are written once to
+-- file_name as "beats stalls lasts", read back by tools/explore.py.
+----------------------------------------------------------------------------------
+library ieee;
+  use ieee.std_logic_1164.all;
+  use std.textio.all;
+
+entity axis_stall_monitor is
+  generic (
+    file_name : string
+  );
+  port (
+    clk_i    : in std_logic;
+    done_i   : in boolean;
+    tvalid_i : in std_logic;
+    tready_i : in std_logic;
+    tlast_i  : in std_logic
+  );
+end axis_stall_monitor;
+
+architecture behavioral of axis_stall_monitor is
+
+begin
+
+  count_p : process
+    variable beats_v   : natural := 0;
+    variable stalls_v  : natural := 0;
+    variable lasts_v   : natural := 0;
+    variable written_v : boolean := false;
+    variable line_v    : line;
+    file     count_f   : text;
+  begin
+    wait until rising_edge(clk_i);
+    if tvalid_i = '1' and tready_i = '1' then
+      beats_v := beats_v + 1;
+      if tlast_i = '1' then
+        lasts_v := lasts_v + 1;
+      end if;
+    elsif tvalid_i = '1' then
+      stalls_v := stalls_v + 1;
+    end if;
+    if done_i and not written_v then
+      file_open(count_f, file_name, write_mode);
+      write(line_v, beats_v);
+      write(line_v, ' ');
+      write(line_v, stalls_v);
+      write(line_v, ' ');
+      write(line_v, lasts_v);
+      writeline(count_f, line_v);
+      file_close(count_f);
+      written_v := true;
+    end if;
+  end process;
+
+end behavioral;
@@ -0,0 +1,90 @@
+----------------------------------------------------------------------------------
+--Copyright 2022 Ricardo F Tafas Jr
+
+--Licensed under the Apache License, Version 2.0 (the "License"); you may not
+--use this file except in compliance with the License. You may obtain a copy of
+--the License at
+
+--   http://www.apache.org/licenses/LICENSE-2.0
+
+--Unless required by applicable law or agreed to in writing, software distributed
+--under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+--OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+--the specific language governing permissions and limitations under the License.
+----------------------------------------------------------------------------------
+-- AXIS monitor, writes every accepted beat (tvalid and tready) to a binary trace.
+-- Each beat is a 24 byte little endian record, read back by tools/trace.py:
+--   cycle  : 8 bytes, clock cycles since the start of the simulation.
+--   tdata  : 8 bytes, up to 64 bits.
+--   tuser  : 4 bytes.
+--   tdest  : 2 bytes.
+--   tlast  : 1 byte.
+--   stream : 1 byte, stream_id generic.
+----------------------------------------------------------------------------------
+library ieee;
+  use ieee.std_logic_1164.all;
+  use ieee.numeric_std.all;
+
+entity axis_trace_monitor is
+  generic (
+    file_name : string;
+    stream_id : natural := 0
+  );
+  port (
+    clk_i    : in std_logic;
+    enable_i : in boolean := true;
+    tdata_i  : in std_logic_vector;
+    tuser_i  : in std_logic_vector;
+    tdest_i  : in std_logic_vector;
+    tvalid_i : in std_logic;
+    tready_i : in std_logic;
+    tlast_i  : in std_logic
+  );
+end axis_trace_monitor;
+
+architecture behavioral of axis_trace_monitor is
+
+  type byte_file_t is file of character;
+
+  file trace_f : byte_file_t open write_mode is file_name;
+
+  procedure write_le ( value : unsigned; size : positive ) is
+    variable tmp : unsigned(8*size-1 downto 0);
+  begin
+    tmp := resize(to_01(value, '0'), 8*size);
+    for j in 0 to size-1 loop
+      write(trace_f, character'val(to_integer(tmp(8*j+7 downto 8*j))));
+    end loop;
+  end procedure;
+
+begin
+
+  assert tdata_i'length <= 64 and tuser_i'length <= 32 and tdest_i'length <= 16
+    report "axis_trace_monitor: tdata up to 64 bits, tuser up to 32, tdest up to 16."
+    severity failure;
+
+  trace_p : process
+    variable cycle_v  : unsigned(63 downto 0) := (others=>'0');
+    variable enable_v : boolean := false;
+  begin
+    wait until rising_edge(clk_i);
+    if enable_i and tvalid_i = '1' and tready_i = '1' then
+      write_le(cycle_v, 8);
+      write_le(unsigned(tdata_i), 8);
+      write_le(unsigned(tuser_i), 4);
+      write_le(unsigned(tdest_i), 2);
+      if tlast_i = '1' then
+        write_le(to_unsigned(1, 8), 1);
+      else
+        write_le(to_unsigned(0, 8), 1);
+      end if;
+      write_le(to_unsigned(stream_id, 8), 1);
+    end if;
+    if enable_v and not enable_i then
+      flush(trace_f);
+    end if;
+    enable_v := enable_i;
+    cycle_v := cycle_v + 1;
+  end process;
+
+end behavioral;
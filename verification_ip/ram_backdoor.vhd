@@ -0,0 +1,68 @@
+----------------------------------------------------------------------------------
+--Copyright 2022 Ricardo F Tafas Jr
+
+--Licensed under the Apache License, Version 2.0 (the "License"); you may not
+--use this file except in compliance with the License. You may obtain a copy of
+--the License at
+
+--   http://www.apache.org/licenses/LICENSE-2.0
+
+--Unless required by applicable law or agreed to in writing, software distributed
+--under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+--OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+--the specific language governing permissions and limitations under the License.
+----------------------------------------------------------------------------------
+-- Simulation only true dual port RAM with the port names of stdblocks tdp_ram,
+-- kept in the ram_image memory model of ram_backdoor_pkg. Testbenches bind it in
+-- place of the stdblocks RAM of a core with a configuration, so the core itself
+-- is left as it is. Both ports read first, one cycle of latency, like the
+-- blockram it stands in for.
+----------------------------------------------------------------------------------
+library ieee;
+  use ieee.std_logic_1164.all;
+  use ieee.numeric_std.all;
+
+use work.ram_backdoor_pkg.all;
+
+entity ram_backdoor is
+  generic (
+    mem_size  : positive;
+    port_size : positive
+  );
+  port (
+    clka_i  : in  std_logic;
+    clkb_i  : in  std_logic;
+    addra_i : in  std_logic_vector(mem_size-1 downto 0);
+    addrb_i : in  std_logic_vector(mem_size-1 downto 0);
+    dataa_i : in  std_logic_vector(port_size-1 downto 0);
+    datab_i : in  std_logic_vector(port_size-1 downto 0) := (others=>'0');
+    dataa_o : out std_logic_vector(port_size-1 downto 0);
+    datab_o : out std_logic_vector(port_size-1 downto 0);
+    wea_i   : in  std_logic;
+    web_i   : in  std_logic := '0'
+  );
+end ram_backdoor;
+
+architecture behavioral of ram_backdoor is
+
+begin
+
+  ram_p : process(clka_i, clkb_i)
+  begin
+    --first run, at elaboration: the model starts at zero.
+    ram_image.init(2**mem_size, port_size);
+    if rising_edge(clka_i) then
+      dataa_o <= ram_image.get(addra_i);
+      if wea_i = '1' then
+        ram_image.set(addra_i, dataa_i);
+      end if;
+    end if;
+    if rising_edge(clkb_i) then
+      datab_o <= ram_image.get(addrb_i);
+      if web_i = '1' then
+        ram_image.set(addrb_i, datab_i);
+      end if;
+    end if;
+  end process;
+
+end behavioral;
@@ -0,0 +1,166 @@
+----------------------------------------------------------------------------------
+--Copyright 2022 Ricardo F Tafas Jr
+
+--Licensed under the Apache License, Version 2.0 (the "License"); you may not
+--use this file except in compliance with the License. You may obtain a copy of
+--the License at
+
+--   http://www.apache.org/licenses/LICENSE-2.0
+
+--Unless required by applicable law or agreed to in writing, software distributed
+--under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+--OR CONDITIONS OF ANY KIND, either express or implied. See the License for
+--the specific language governing permissions and limitations under the License.
+----------------------------------------------------------------------------------
+-- Testbench memory model behind ram_backdoor, shared with tools/memimage.py.
+-- ram_image holds the content of the one ram_backdoor of a testbench; the
+-- testbench loads it from an image and dumps it to a file directly, in zero
+-- simulation time. Image files have one word per RAM address, by file name:
+--   *.bin : ceil(width/8) bytes per word, little endian.
+--   other : hex text, one word per line, ceil(width/4) digits.
+-- A short image leaves the remaining words at zero.
+----------------------------------------------------------------------------------
+library ieee;
+  use ieee.std_logic_1164.all;
+  use ieee.numeric_std.all;
+library std;
+  use std.textio.all;
+
+package ram_backdoor_pkg is
+
+  type ram_image_t is array (natural range <>) of std_logic_vector;
+
+  impure function ram_load ( file_name : string; size : positive; width : positive ) return ram_image_t;
+  procedure ram_dump ( file_name : string; image : ram_image_t );
+
+  type ram_model_t is protected
+    procedure init ( size : positive; width : positive );
+    procedure load ( file_name : string );
+    procedure dump ( file_name : string );
+    impure function get ( address : std_logic_vector ) return std_logic_vector;
+    procedure set ( address : std_logic_vector; data : std_logic_vector );
+  end protected ram_model_t;
+
+  shared variable ram_image : ram_model_t;
+
+end ram_backdoor_pkg;
+
+package body ram_backdoor_pkg is
+
+  type byte_file_t is file of character;
+  type ram_image_ptr is access ram_image_t;
+
+  function is_binary ( file_name : string ) return boolean is
+  begin
+    if file_name'length < 4 then
+      return false;
+    end if;
+    return file_name(file_name'high-3 to file_name'high) = ".bin";
+  end function;
+
+  impure function ram_load ( file_name : string; size : positive; width : positive ) return ram_image_t is
+    constant bytes_c  : positive := (width+7)/8;
+    constant digits_c : positive := (width+3)/4;
+    variable image_v  : ram_image_t(0 to size-1)(width-1 downto 0) := (others=>(others=>'0'));
+    variable word_v   : unsigned(8*bytes_c-1 downto 0);
+    variable hex_v    : std_logic_vector(4*digits_c-1 downto 0);
+    variable byte_v   : character;
+    variable line_v   : line;
+    variable good_v   : boolean;
+    file     bin_f    : byte_file_t;
+    file     hex_f    : text;
+  begin
+    if is_binary(file_name) then
+      file_open(bin_f, file_name, read_mode);
+      for j in image_v'range loop
+        exit when endfile(bin_f);
+        for k in 0 to bytes_c-1 loop
+          read(bin_f, byte_v);
+          word_v(8*k+7 downto 8*k) := to_unsigned(character'pos(byte_v), 8);
+        end loop;
+        image_v(j) := std_logic_vector(resize(word_v, width));
+      end loop;
+      file_close(bin_f);
+    else
+      file_open(hex_f, file_name, read_mode);
+      for j in image_v'range loop
+        exit when endfile(hex_f);
+        readline(hex_f, line_v);
+        hread(line_v, hex_v, good_v);
+        assert good_v
+          report "ram_load: " & file_name & " line " & integer'image(j+1) & " is not hex."
+          severity failure;
+        image_v(j) := hex_v(width-1 downto 0);
+      end loop;
+      file_close(hex_f);
+    end if;
+    return image_v;
+  end function;
+
+  procedure ram_dump ( file_name : string; image : ram_image_t ) is
+    constant width_c  : positive := image(image'low)'length;
+    constant bytes_c  : positive := (width_c+7)/8;
+    constant digits_c : positive := (width_c+3)/4;
+    variable word_v   : unsigned(8*bytes_c-1 downto 0);
+    variable line_v   : line;
+    file     bin_f    : byte_file_t;
+    file     hex_f    : text;
+  begin
+    if is_binary(file_name) then
+      file_open(bin_f, file_name, write_mode);
+      for j in image'range loop
+        word_v := resize(to_01(unsigned(image(j)), '0'), 8*bytes_c);
+        for k in 0 to bytes_c-1 loop
+          write(bin_f, character'val(to_integer(word_v(8*k+7 downto 8*k))));
+        end loop;
+      end loop;
+      file_close(bin_f);
+    else
+      file_open(hex_f, file_name, write_mode);
+      for j in image'range loop
+        hwrite(line_v, std_logic_vector(resize(unsigned(image(j)), 4*digits_c)));
+        writeline(hex_f, line_v);
+      end loop;
+      file_close(hex_f);
+    end if;
+  end procedure;
+
+  type ram_model_t is protected body
+    variable image_v : ram_image_ptr := null;
+
+    procedure init ( size : positive; width : positive ) is
+    begin
+      if image_v = null then
+        image_v := new ram_image_t(0 to size-1)(width-1 downto 0);
+        image_v.all := (others=>(others=>'0'));
+      end if;
+    end procedure;
+
+    procedure load ( file_name : string ) is
+    begin
+      assert image_v /= null
+        report "ram_image: load before any ram_backdoor."
+        severity failure;
+      image_v.all := ram_load(file_name, image_v.all'length, image_v.all(0)'length);
+    end procedure;
+
+    procedure dump ( file_name : string ) is
+    begin
+      assert image_v /= null
+        report "ram_image: dump before any ram_backdoor."
+        severity failure;
+      ram_dump(file_name, image_v.all);
+    end procedure;
+
+    impure function get ( address : std_logic_vector ) return std_logic_vector is
+    begin
+      return image_v(to_integer(to_01(unsigned(address), '0')));
+    end function;
+
+    procedure set ( address : std_logic_vector; data : std_logic_vector ) is
+    begin
+      image_v(to_integer(to_01(unsigned(address), '0'))) := data;
+    end procedure;
+  end protected body ram_model_t;
+
+end ram_backdoor_pkg;